@@ -0,0 +1,254 @@
+"""Benchmark des scrapers sur des réponses enregistrées, rejouées en local.
+
+    python bench.py record exo1 exo3          # une fois, avec accès réseau
+    python bench.py run --latency-ms 20       # autant de fois que nécessaire, hors ligne
+    python bench.py run --baseline results/20250101_120000.json
+
+Chaque run copie le dépôt dans un dossier temporaire, lance les outils l'un
+après l'autre (exo7 lit la sortie d'exo6) et sauvegarde les mesures en JSON.
+"""
+import argparse
+import csv
+import glob
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+sys.path.append(ROOT_DIR)
+from scrape import TOOLS
+from replay_server import start_replay_server
+
+FIXTURES_DIR = os.path.join(BENCH_DIR, 'fixtures')
+RESULTS_DIR = os.path.join(BENCH_DIR, 'results')
+
+# Fichiers produits par chaque outil (comptage des enregistrements), supprimés avant son
+# lancement avec `clean` (caches, reprise) ; `inputs` : fichiers copiés avant le lancement.
+BENCH_TOOLS = {
+    'exo1': {'outputs': ['exo1/books_scrape_*.json']},
+    'exo2': {'outputs': ['exo2/quotes_graph.graphml'], 'clean': ['exo2/quotes_cache.sqlite']},
+    'exo3': {'outputs': ['exo3/fake_jobs_results.csv']},
+    'exo4': {'outputs': ['exo4/livres_data.csv']},
+    'exo5': {'outputs': ['exo5/category_tree_*.json']},
+    'exo6': {'outputs': ['exo6/books_data_resilient.jsonl'], 'clean': ['exo6/scraper_progress.log']},
+    'exo7': {'outputs': ['exo7/books_data_clean.csv'],
+             'inputs': {'exo6/books_data_resilient.jsonl': 'exo7/books_data_resilient.jsonl'}},
+    'exo8': {'outputs': ['exo8/aggregated_data.json'], 'clean': ['exo8/http_cache.sqlite*']},
+    'exo9': {'outputs': []},
+}
+
+# Écart relatif au-delà duquel une métrique est signalée comme régression
+REGRESSION_THRESHOLD = 0.10
+# Métriques comparées à la baseline : True si une valeur plus haute est meilleure
+COMPARED_METRICS = {
+    'pages_per_sec': True,
+    'latency_p95_ms': False,
+    'parse_ms_per_page': False,
+    'peak_rss_mb': False,
+    'requests_per_record': False,
+}
+
+
+def percentile(values, q):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def count_records(path):
+    if path.endswith('.json'):
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return len(data) if isinstance(data, (list, dict)) else 1
+    if path.endswith(('.jsonl', '.ndjson')):
+        with open(path, 'r', encoding='utf-8') as f:
+            return sum(1 for line in f if line.strip())
+    if path.endswith('.csv'):
+        with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+            return max(0, sum(1 for _ in csv.reader(f)) - 1)
+    if path.endswith('.graphml'):
+        with open(path, 'r', encoding='utf-8') as f:
+            return f.read().count('<node ')
+    return 0
+
+
+def prepare_workspace():
+    workspace = tempfile.mkdtemp(prefix='bench_')
+    shutil.copytree(
+        ROOT_DIR, os.path.join(workspace, 'repo'),
+        ignore=shutil.ignore_patterns('.git', '__pycache__', 'fixtures', 'results')
+    )
+    return os.path.join(workspace, 'repo')
+
+
+def run_tool(name, repo_dir, env, timeout):
+    spec = BENCH_TOOLS[name]
+    for pattern in spec['outputs'] + spec.get('clean', []):
+        for path in glob.glob(os.path.join(repo_dir, pattern)):
+            os.remove(path)
+    for source, target in spec.get('inputs', {}).items():
+        if os.path.exists(os.path.join(repo_dir, source)):
+            shutil.copy(os.path.join(repo_dir, source), os.path.join(repo_dir, target))
+
+    script = os.path.join(repo_dir, TOOLS.spec(name))
+    stats_prefix = os.path.join(repo_dir, f".bench_stats_{name}")
+    log_path = os.path.join(repo_dir, f"bench_{name}.log")
+    tool_env = {**env, 'BENCH_STATS_FILE': stats_prefix}
+
+    start_time = time.time()
+    with open(log_path, 'w') as log:
+        try:
+            exit_code = subprocess.run(
+                [sys.executable, script], cwd=os.path.dirname(script), env=tool_env,
+                stdout=log, stderr=subprocess.STDOUT, timeout=timeout
+            ).returncode
+        except subprocess.TimeoutExpired:
+            exit_code = 'timeout'
+    wall_sec = time.time() - start_time
+
+    # Un fichier de mesures par processus (workers multiprocessing compris)
+    requests_count, errors, latencies, parse_ms, peak_rss_kb = 0, 0, [], [], 0
+    for stats_file in glob.glob(f"{stats_prefix}.*.json"):
+        with open(stats_file) as f:
+            stats = json.load(f)
+        requests_count += stats['requests']
+        errors += stats['errors']
+        latencies += stats['latencies_ms']
+        parse_ms += stats['parse_ms']
+        peak_rss_kb = max(peak_rss_kb, stats['peak_rss_kb'])
+
+    records = sum(
+        count_records(path)
+        for pattern in spec['outputs']
+        for path in glob.glob(os.path.join(repo_dir, pattern))
+    )
+    pages_ok = requests_count - errors
+    return {
+        "exit_code": exit_code,
+        "wall_sec": round(wall_sec, 3),
+        "requests": requests_count,
+        "errors": errors,
+        "records": records,
+        "pages_per_sec": round(pages_ok / wall_sec, 2) if wall_sec else None,
+        "latency_p50_ms": round(percentile(latencies, 0.50), 2) if latencies else None,
+        "latency_p95_ms": round(percentile(latencies, 0.95), 2) if latencies else None,
+        "parse_ms_per_page": round(sum(parse_ms) / len(parse_ms), 3) if parse_ms else None,
+        "peak_rss_mb": round(peak_rss_kb / 1024, 1),
+        "requests_per_record": round(requests_count / records, 2) if records else None,
+        "log": log_path,
+    }
+
+
+def compare_with_baseline(results, settings, baseline_path, threshold):
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline_run = json.load(f)
+    baseline = baseline_run['results']
+
+    regressions = []
+    print(f"\n--- Comparaison avec {baseline_path} ---")
+    if baseline_run['settings'] != settings:
+        print(f"Attention : paramètres différents de la baseline ({baseline_run['settings']})")
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        for metric, higher_is_better in COMPARED_METRICS.items():
+            old, new = previous.get(metric), current.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            worse = change < -threshold if higher_is_better else change > threshold
+            flag = "  <-- RÉGRESSION" if worse else ""
+            print(f"{name:6} {metric:20} {old:>10} -> {new:>10} ({change:+.1%}){flag}")
+            if worse:
+                regressions.append((name, metric))
+    return regressions
+
+
+def print_results(results):
+    print(f"\n{'outil':6} {'code':>7} {'req':>6} {'records':>8} {'pages/s':>8} {'p50 ms':>8} {'p95 ms':>8} "
+          f"{'parse ms':>9} {'RSS Mo':>7} {'req/rec':>8}")
+    for name, r in results.items():
+        cells = [r['exit_code'], r['requests'], r['records'], r['pages_per_sec'], r['latency_p50_ms'],
+                 r['latency_p95_ms'], r['parse_ms_per_page'], r['peak_rss_mb'], r['requests_per_record']]
+        cells = ['-' if c is None else (f"{c:.1f}" if isinstance(c, float) else c) for c in cells]
+        print(f"{name:6} {cells[0]:>7} {cells[1]:>6} {cells[2]:>8} {cells[3]:>8} {cells[4]:>8} {cells[5]:>8} "
+              f"{cells[6]:>9} {cells[7]:>7} {cells[8]:>8}")
+
+
+def record(tools, fixtures_dir, timeout, reset):
+    if reset and os.path.exists(fixtures_dir):
+        shutil.rmtree(fixtures_dir)
+    os.makedirs(os.path.join(fixtures_dir, 'bodies'), exist_ok=True)
+
+    repo_dir = prepare_workspace()
+    env = {**os.environ, 'PYTHONPATH': BENCH_DIR, 'BENCH_RECORD_DIR': os.path.abspath(fixtures_dir)}
+    for name in tools:
+        result = run_tool(name, repo_dir, env, timeout)
+        print(f"[{name}] {result['requests']} réponses enregistrées (code {result['exit_code']})")
+    print(f"Fixtures : {fixtures_dir}")
+
+
+def run(tools, fixtures_dir, latency_ms, bandwidth_kbps, timeout, output, baseline, threshold):
+    server, replay_url = start_replay_server(fixtures_dir, latency_ms, bandwidth_kbps)
+    repo_dir = prepare_workspace()
+    env = {**os.environ, 'PYTHONPATH': BENCH_DIR, 'BENCH_REPLAY_URL': replay_url}
+
+    results = {}
+    for name in tools:
+        print(f"[{name}] en cours...")
+        results[name] = run_tool(name, repo_dir, env, timeout)
+    server.shutdown()
+
+    print_results(results)
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    settings = {"latency_ms": latency_ms, "bandwidth_kbps": bandwidth_kbps, "fixtures": fixtures_dir}
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump({
+            "created": datetime.now().isoformat(timespec='seconds'),
+            "settings": settings,
+            "results": results,
+        }, f, indent=4)
+    print(f"\nRésultats sauvegardés dans {output} (logs des outils : {repo_dir})")
+
+    if baseline:
+        regressions = compare_with_baseline(results, settings, baseline, threshold)
+        if regressions:
+            print(f"{len(regressions)} régression(s) au-delà de {threshold:.0%}.")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark des scrapers sur des réponses HTTP enregistrées.")
+    parser.add_argument('command', choices=['record', 'run'], help="record : enregistrer les fixtures ; run : benchmark en rejeu")
+    parser.add_argument('tools', nargs='*', help=f"Outils à lancer (défaut: tous) : {', '.join(BENCH_TOOLS)}")
+    parser.add_argument('--fixtures', default=FIXTURES_DIR, help="Dossier des fixtures (défaut: bench/fixtures)")
+    parser.add_argument('--reset', action='store_true', help="record : efface les fixtures existantes")
+    parser.add_argument('--latency-ms', type=float, default=0, help="run : latence ajoutée par réponse (défaut: 0)")
+    parser.add_argument('--bandwidth-kbps', type=float, default=0, help="run : débit par connexion en Kio/s (défaut: illimité)")
+    parser.add_argument('--timeout', type=float, default=1800, help="Durée maximale par outil en secondes (défaut: 1800)")
+    parser.add_argument('-o', '--output', help="run : fichier de résultats (défaut: bench/results/<horodatage>.json)")
+    parser.add_argument('--baseline', help="run : résultats précédents à comparer (code de sortie 1 si régression)")
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD,
+                        help=f"run : écart signalé comme régression (défaut: {REGRESSION_THRESHOLD})")
+    args = parser.parse_args()
+
+    tools = args.tools or list(BENCH_TOOLS)
+    unknown = [name for name in tools if name not in BENCH_TOOLS]
+    if unknown:
+        parser.error(f"Outil(s) inconnu(s) : {', '.join(unknown)}")
+
+    if args.command == 'record':
+        record(tools, args.fixtures, args.timeout, args.reset)
+    else:
+        output = args.output or os.path.join(RESULTS_DIR, f"{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+        sys.exit(run(tools, args.fixtures, args.latency_ms, args.bandwidth_kbps, args.timeout,
+                     output, args.baseline, args.threshold))
@@ -0,0 +1,169 @@
+"""Injection de pannes : mesure le comportement des scrapers exo6 et exo8 face à un site instable.
+
+    python chaos.py                          # tous les scénarios, exo6 et exo8
+    python chaos.py --targets exo6 --scenarios random_5xx ban_403
+
+Pour chaque couple (cible, scénario), un serveur local neuf sert des pages de
+livres et injecte la panne pendant la fenêtre [--fault-start, --fault-end].
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+
+from chaos_server import SCENARIOS, BOOKS_PER_PAGE, ChaosState, start_chaos_server
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+RESULTS_DIR = os.path.join(BENCH_DIR, 'results')
+
+SUCCESS_OUTCOMES = (200, 'slow')
+
+
+def run_exo6(base_url, size):
+    """Fiches livres une à une, avec la session à retries d'exo6 : `size` livres attendus."""
+    sys.path.insert(0, os.path.join(ROOT_DIR, 'exo6'))
+    import exo6
+
+    session = exo6.create_resilient_session()
+    records = 0
+    for book_id in range(size):
+        try:
+            details = exo6.get_book_details(session, f"{base_url}/catalogue/book_{book_id}/index.html")
+        except SystemExit:
+            # exo6 abandonne tout le run au premier 403
+            break
+        records += details is not None
+    return records, size
+
+
+def run_exo8(base_url, size):
+    """Listing paginé par le BooksScraper d'exo8 (4 pages en parallèle) : `size` pages attendues."""
+    sys.path.insert(0, os.path.join(ROOT_DIR, 'exo8'))
+    from exo8 import PageScheduler
+    from scrapers import BooksScraper
+
+    scheduler = PageScheduler(4)
+    scraper = BooksScraper('chaos', {
+        'url': f"{base_url}/catalogue/page-1.html",
+        'max_pages': size,
+        'page_url_pattern': f"{base_url}/catalogue/page-{{page}}.html",
+        'concurrency': 4,
+    }, scheduler)
+    try:
+        return len(scraper.scrape()), size * BOOKS_PER_PAGE
+    finally:
+        scheduler.shutdown()
+
+
+TARGETS = {
+    'exo6': (run_exo6, 60),
+    'exo8': (run_exo8, 30),
+}
+
+
+def summarize(state, records, expected, wall_sec, status):
+    successes = [t for t, _, outcome in state.log if outcome in SUCCESS_OUTCOMES]
+    after_faults = [t for t in successes if t >= state.fault_end]
+    if after_faults:
+        time_to_recover = round(after_faults[0] - state.fault_end, 3)
+    else:
+        # Aucune réponse réussie après la panne : le scraper a abandonné ou est resté bloqué
+        time_to_recover = None
+
+    gaps = [b - a for a, b in zip(successes, successes[1:])]
+    return {
+        "status": status,
+        "records": records,
+        "expected": expected,
+        "completeness": round(records / expected, 3) if expected else None,
+        "wall_sec": round(wall_sec, 2),
+        "goodput_per_sec": round(records / wall_sec, 2) if wall_sec else None,
+        "requests": len(state.log),
+        "wasted_requests": len(state.log) - len(successes),
+        "time_to_recover_sec": time_to_recover,
+        "longest_stall_sec": round(max(gaps), 2) if gaps else None,
+    }
+
+
+def run_scenario(target, scenario, args):
+    run_target, default_size = TARGETS[target]
+    state = ChaosState(scenario, pages=args.size or default_size, latency_ms=args.latency_ms,
+                       fault_start=args.fault_start, fault_end=args.fault_end, seed=args.seed)
+    server, base_url = start_chaos_server(state)
+
+    outcome = {}
+
+    def work():
+        try:
+            outcome['records'], outcome['expected'] = run_target(base_url, args.size or default_size)
+        except Exception as e:
+            outcome['error'] = e
+
+    start_time = time.time()
+    worker = threading.Thread(target=work, daemon=True)
+    worker.start()
+    worker.join(args.max_seconds)
+    wall_sec = time.time() - start_time
+    # Arrêter le serveur coupe aussi un scraper resté bloqué (timeout)
+    server.shutdown()
+    server.server_close()
+
+    if worker.is_alive():
+        status = 'timeout'
+    elif 'error' in outcome:
+        status = f"erreur: {outcome['error']}"
+    else:
+        status = 'ok'
+    return summarize(state, outcome.get('records', 0), outcome.get('expected'), wall_sec, status)
+
+
+def print_results(results):
+    print(f"\n{'cible':6} {'scénario':17} {'statut':8} {'records':>11} {'goodput/s':>10} {'requêtes':>9} "
+          f"{'gaspillées':>11} {'TTR s':>7} {'pause max s':>12}")
+    for target, scenarios in results.items():
+        for scenario, r in scenarios.items():
+            ttr = '-' if r['time_to_recover_sec'] is None else r['time_to_recover_sec']
+            stall = '-' if r['longest_stall_sec'] is None else r['longest_stall_sec']
+            print(f"{target:6} {scenario:17} {r['status'][:8]:8} {str(r['records']) + '/' + str(r['expected']):>11} "
+                  f"{r['goodput_per_sec']:>10} {r['requests']:>9} {r['wasted_requests']:>11} {ttr:>7} {stall:>12}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scénarios de pannes contre les scrapers exo6 et exo8.")
+    parser.add_argument('--targets', nargs='+', choices=list(TARGETS), default=list(TARGETS))
+    parser.add_argument('--scenarios', nargs='+', choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument('--size', type=int, help="Taille de la charge (livres pour exo6, pages pour exo8)")
+    parser.add_argument('--latency-ms', type=float, default=50, help="Latence de base par réponse (défaut: 50)")
+    parser.add_argument('--fault-start', type=float, default=0.5, help="Début de la panne, en s (défaut: 0.5)")
+    parser.add_argument('--fault-end', type=float, default=3.0, help="Fin de la panne, en s (défaut: 3.0)")
+    parser.add_argument('--max-seconds', type=float, default=120, help="Durée maximale par scénario (défaut: 120)")
+    parser.add_argument('--seed', type=int, default=0, help="Graine des pannes aléatoires (défaut: 0)")
+    parser.add_argument('-o', '--output', help="Fichier de résultats (défaut: bench/results/chaos_<horodatage>.json)")
+    args = parser.parse_args()
+
+    # Les erreurs attendues des scrapers noieraient le tableau final
+    logging.basicConfig(level=logging.CRITICAL + 1, force=True)
+
+    results = {}
+    for target in args.targets:
+        results[target] = {}
+        for scenario in args.scenarios:
+            print(f"[{target}] scénario {scenario}...")
+            results[target][scenario] = run_scenario(target, scenario, args)
+
+    print_results(results)
+    output = args.output or os.path.join(RESULTS_DIR, f"chaos_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump({
+            "created": datetime.now().isoformat(timespec='seconds'),
+            "settings": {"latency_ms": args.latency_ms, "fault_start": args.fault_start,
+                         "fault_end": args.fault_end, "seed": args.seed},
+            "results": results,
+        }, f, indent=4)
+    print(f"\nRésultats sauvegardés dans {output}")
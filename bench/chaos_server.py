@@ -0,0 +1,163 @@
+import random
+import socket
+import struct
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+BOOKS_PER_PAGE = 20
+
+# Pannes injectées pendant la fenêtre [fault_start, fault_end] (secondes depuis le démarrage du serveur)
+SCENARIOS = {
+    'baseline': {},
+    'random_5xx': {'error_rate': 0.3},
+    'rate_limit_429': {'rate_limit_per_sec': 5, 'retry_after': 2},
+    'slow_loris': {'slow_rate': 0.2, 'slow_seconds': 3},
+    'connection_reset': {'reset_rate': 0.2},
+    'ban_403': {'ban': True},
+}
+
+
+def listing_page(page, pages):
+    articles = "".join(
+        f'<article class="product_pod"><h3><a href="book_{i}/index.html" title="Livre {i}">Livre {i}</a></h3>'
+        f'<p class="price_color">£{10 + i % 40}.50</p></article>'
+        for i in range((page - 1) * BOOKS_PER_PAGE, page * BOOKS_PER_PAGE)
+    )
+    next_link = f'<li class="next"><a href="page-{page + 1}.html">next</a></li>' if page < pages else ''
+    return f'<html><body>{articles}<ul class="pager">{next_link}</ul></body></html>'
+
+
+def detail_page(book_id):
+    return (
+        f'<html><body><ul class="breadcrumb"><li><a href="/">Home</a></li><li><a href="/books">Books</a></li>'
+        f'<li><a href="/cat">Catégorie {book_id % 5}</a></li></ul>'
+        f'<div class="item active"><img src="../../media/{book_id}.jpg"/></div>'
+        f'<div class="product_main"><h1>Livre {book_id}</h1><p class="price_color">£{10 + book_id % 40}.50</p>'
+        f'<p class="instock availability">In stock ({book_id % 20} available)</p>'
+        f'<p class="star-rating Three"></p></div>'
+        f'<div id="product_description"></div><p>Description du livre {book_id}.</p></body></html>'
+    )
+
+
+class ChaosState:
+    """Scénario courant et journal des requêtes servies (instant, chemin, issue)."""
+
+    def __init__(self, scenario, pages, latency_ms=50, fault_start=0.5, fault_end=3.0, seed=0):
+        self.scenario = SCENARIOS[scenario]
+        self.scenario_name = scenario
+        self.pages = pages
+        self.latency = latency_ms / 1000
+        self.fault_start = fault_start
+        self.fault_end = fault_end
+        self.started = time.time()
+        self.random = random.Random(seed)
+        self.log = []
+        self._lock = threading.Lock()
+        self._window_start = 0.0
+        self._window_count = 0
+
+    def elapsed(self):
+        return time.time() - self.started
+
+    def in_fault_window(self):
+        return self.fault_start <= self.elapsed() < self.fault_end
+
+    def draw(self, rate):
+        with self._lock:
+            return self.random.random() < rate
+
+    def over_rate_limit(self, limit):
+        with self._lock:
+            now = time.time()
+            if now - self._window_start >= 1.0:
+                self._window_start, self._window_count = now, 0
+            self._window_count += 1
+            return self._window_count > limit
+
+    def record(self, path, outcome):
+        with self._lock:
+            self.log.append((self.elapsed(), path, outcome))
+
+
+class ChaosHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    state = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _page(self):
+        path = self.path.split('?')[0]
+        if path.startswith('/catalogue/page-') and path.endswith('.html'):
+            page = int(path[len('/catalogue/page-'):-len('.html')])
+            return listing_page(page, self.state.pages) if 1 <= page <= self.state.pages else None
+        if path.startswith('/catalogue/book_') and path.endswith('/index.html'):
+            return detail_page(int(path[len('/catalogue/book_'):-len('/index.html')]))
+        return None
+
+    def _send(self, status, body=b'', headers=()):
+        self.send_response(status)
+        for name, value in headers:
+            self.send_header(name, value)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _reset_connection(self):
+        # SO_LINGER à 0 : la fermeture envoie un RST au lieu d'un FIN
+        self.connection.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack('ii', 1, 0))
+        self.connection.close()
+        self.close_connection = True
+
+    def _send_slowly(self, body, seconds):
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        chunk_size = max(1, len(body) // 20)
+        for i in range(0, len(body), chunk_size):
+            self.wfile.write(body[i:i + chunk_size])
+            self.wfile.flush()
+            time.sleep(seconds / 20)
+
+    def do_GET(self):
+        state, scenario = self.state, self.state.scenario
+        time.sleep(state.latency)
+        path = self.path
+
+        if state.in_fault_window():
+            if scenario.get('ban'):
+                state.record(path, 403)
+                return self._send(403, b'Forbidden')
+            if 'rate_limit_per_sec' in scenario and state.over_rate_limit(scenario['rate_limit_per_sec']):
+                state.record(path, 429)
+                return self._send(429, b'Too Many Requests', [('Retry-After', str(scenario['retry_after']))])
+            if state.draw(scenario.get('error_rate', 0)):
+                status = state.random.choice([500, 502, 503])
+                state.record(path, status)
+                return self._send(status, b'Server Error')
+            if state.draw(scenario.get('reset_rate', 0)):
+                state.record(path, 'reset')
+                return self._reset_connection()
+
+        page = self._page()
+        if page is None:
+            state.record(path, 404)
+            return self._send(404, b'Not Found')
+
+        if state.in_fault_window() and state.draw(scenario.get('slow_rate', 0)):
+            state.record(path, 'slow')
+            return self._send_slowly(page.encode('utf-8'), scenario['slow_seconds'])
+        state.record(path, 200)
+        self._send(200, page.encode('utf-8'))
+
+
+def start_chaos_server(state, port=0):
+    """Démarre le serveur dans un thread ; renvoie (serveur, URL de base)."""
+    handler = type('Handler', (ChaosHandler,), {'state': state})
+    server = ThreadingHTTPServer(('127.0.0.1', port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name='chaos-server', daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
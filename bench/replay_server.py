@@ -0,0 +1,115 @@
+import argparse
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FixtureStore:
+    """Réponses enregistrées (index.jsonl + bodies/), rejouées dans l'ordre d'enregistrement.
+
+    Une même URL enregistrée plusieurs fois (ex: page d'accueil avant et après
+    login) renvoie ses réponses successives, la dernière étant répétée ensuite.
+    """
+
+    def __init__(self, fixtures_dir):
+        self.fixtures_dir = fixtures_dir
+        self.responses = defaultdict(list)
+        self._cursor = defaultdict(int)
+        self._lock = threading.Lock()
+        with open(os.path.join(fixtures_dir, 'index.jsonl'), 'r', encoding='utf-8') as f:
+            for line in f:
+                entry = json.loads(line)
+                self.responses[(entry['method'], entry['url'])].append(entry)
+
+    def lookup(self, method, url):
+        key = (method, url)
+        if key not in self.responses:
+            return None
+        with self._lock:
+            entries = self.responses[key]
+            entry = entries[min(self._cursor[key], len(entries) - 1)]
+            self._cursor[key] += 1
+        with open(os.path.join(self.fixtures_dir, 'bodies', entry['body']), 'rb') as f:
+            return entry['status'], entry['headers'], f.read()
+
+
+class ReplayHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    store = None
+    latency = 0.0
+    bandwidth = 0  # octets/s ; 0 : illimité
+
+    def log_message(self, format, *args):
+        pass
+
+    def _original_url(self):
+        # /https/books.toscrape.com/catalogue/page-1.html -> https://books.toscrape.com/catalogue/page-1.html
+        scheme, _, rest = self.path.lstrip('/').partition('/')
+        return f"{scheme}://{rest}"
+
+    def _write_body(self, body):
+        if not self.bandwidth:
+            self.wfile.write(body)
+            return
+        # Débit limité : un bloc toutes les 100 ms
+        chunk_size = max(1, self.bandwidth // 10)
+        for i in range(0, len(body), chunk_size):
+            self.wfile.write(body[i:i + chunk_size])
+            self.wfile.flush()
+            time.sleep(0.1)
+
+    def _replay(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        if length:
+            self.rfile.read(length)
+        if self.latency:
+            time.sleep(self.latency)
+
+        found = self.store.lookup(self.command, self._original_url())
+        if found is None:
+            status, headers, body = 404, [['Content-Type', 'text/plain']], b'fixture absente'
+        else:
+            status, headers, body = found
+
+        self.send_response(status)
+        for name, value in headers:
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if self.command != 'HEAD':
+            self._write_body(body)
+
+    do_GET = do_POST = do_HEAD = _replay
+
+
+def start_replay_server(fixtures_dir, latency_ms=0, bandwidth_kbps=0, port=0):
+    """Démarre le serveur dans un thread ; renvoie (serveur, URL de base)."""
+    handler = type('Handler', (ReplayHandler,), {
+        'store': FixtureStore(fixtures_dir),
+        'latency': latency_ms / 1000,
+        'bandwidth': int(bandwidth_kbps * 1024),
+    })
+    server = ThreadingHTTPServer(('127.0.0.1', port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name='replay-server', daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serveur local qui rejoue les réponses enregistrées.")
+    parser.add_argument('--fixtures', default='fixtures', help="Dossier des fixtures (défaut: fixtures)")
+    parser.add_argument('--port', type=int, default=8900, help="Port d'écoute (défaut: 8900)")
+    parser.add_argument('--latency-ms', type=float, default=0, help="Latence ajoutée à chaque réponse")
+    parser.add_argument('--bandwidth-kbps', type=float, default=0, help="Débit par connexion en Kio/s (0 : illimité)")
+    args = parser.parse_args()
+
+    server, url = start_replay_server(args.fixtures, args.latency_ms, args.bandwidth_kbps, args.port)
+    print(f"Rejeu de {args.fixtures} sur {url} (URL réécrites en {url}/<schéma>/<hôte>/<chemin>)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,109 @@
+"""Chargé automatiquement (via PYTHONPATH) par les outils lancés depuis bench.py.
+
+BENCH_RECORD_DIR : chaque réponse HTTP réelle est enregistrée dans les fixtures.
+BENCH_REPLAY_URL : chaque requête est redirigée vers le serveur de rejeu local.
+BENCH_STATS_FILE : à la sortie, le processus écrit ses mesures (requêtes,
+latences, temps de parsing, pic de RSS) dans BENCH_STATS_FILE.<pid>.json.
+
+Sans ces variables, ce module ne fait rien.
+"""
+import os
+
+if os.environ.get('BENCH_STATS_FILE'):
+    import atexit
+    import hashlib
+    import json
+    import resource
+    import threading
+    import time
+    from urllib.parse import urlsplit
+
+    from requests.adapters import HTTPAdapter
+
+    REPLAY_URL = os.environ.get('BENCH_REPLAY_URL')
+    RECORD_DIR = os.environ.get('BENCH_RECORD_DIR')
+    # En-têtes liés au transport : le serveur de rejeu les recalcule
+    SKIPPED_HEADERS = {'content-encoding', 'transfer-encoding', 'content-length', 'connection', 'keep-alive'}
+
+    _stats = {"requests": 0, "errors": 0, "latencies_ms": [], "parse_ms": []}
+    _lock = threading.Lock()
+    _original_send = HTTPAdapter.send
+
+    def _replay_url(url):
+        parts = urlsplit(url)
+        query = f"?{parts.query}" if parts.query else ''
+        return f"{REPLAY_URL}/{parts.scheme}/{parts.netloc}{parts.path or '/'}{query}"
+
+    def _record(request, response):
+        body = response.content
+        digest = hashlib.sha256(body).hexdigest()
+        body_path = os.path.join(RECORD_DIR, 'bodies', digest)
+        if not os.path.exists(body_path):
+            with open(body_path, 'wb') as f:
+                f.write(body)
+        raw_headers = response.raw.headers.items() if response.raw is not None else response.headers.items()
+        entry = {
+            "method": request.method,
+            "url": request.url,
+            "status": response.status_code,
+            "headers": [[k, v] for k, v in raw_headers if k.lower() not in SKIPPED_HEADERS],
+            "body": digest,
+        }
+        with _lock, open(os.path.join(RECORD_DIR, 'index.jsonl'), 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry) + '\n')
+
+    def _send(self, request, *args, **kwargs):
+        sent = request
+        if REPLAY_URL:
+            sent = request.copy()
+            sent.url = _replay_url(request.url)
+        start = time.perf_counter()
+        try:
+            response = _original_send(self, sent, *args, **kwargs)
+        except Exception:
+            with _lock:
+                _stats['requests'] += 1
+                _stats['errors'] += 1
+            raise
+        latency_ms = (time.perf_counter() - start) * 1000
+
+        # Cookies et redirections sont résolus par rapport à l'URL d'origine
+        response.request = request
+        response.url = request.url
+        if RECORD_DIR:
+            _record(request, response)
+
+        with _lock:
+            _stats['requests'] += 1
+            _stats['errors'] += response.status_code >= 400
+            _stats['latencies_ms'].append(latency_ms)
+        return response
+
+    HTTPAdapter.send = _send
+
+    def _timed_parse(parse):
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return parse(*args, **kwargs)
+            finally:
+                with _lock:
+                    _stats['parse_ms'].append((time.perf_counter() - start) * 1000)
+        return wrapper
+
+    try:
+        import bs4
+        bs4.BeautifulSoup.__init__ = _timed_parse(bs4.BeautifulSoup.__init__)
+    except ImportError:
+        pass
+    try:
+        import lxml.html
+        lxml.html.fromstring = _timed_parse(lxml.html.fromstring)
+    except ImportError:
+        pass
+
+    @atexit.register
+    def _write_stats():
+        _stats['peak_rss_kb'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        with open(f"{os.environ['BENCH_STATS_FILE']}.{os.getpid()}.json", 'w') as f:
+            json.dump(_stats, f)
@@ -0,0 +1,358 @@
+"""Entrepôt SQLite des sorties de crawl et rapports prédéfinis, sans réseau ni chargement en mémoire.
+
+Chaque fichier chargé (JSON, JSONL, CSV, Parquet) est rattaché à un jeu de données
+(livres : exo1, exo4, exo6 ; offres : exo3) et ses lignes sont converties vers un
+schéma commun indexé. Le chargement est incrémental : un fichier inchangé est
+ignoré, un JSONL qui a grandi (exo6 ajoute à la fin) n'est lu qu'à partir de la
+dernière ligne chargée, un fichier réécrit est rechargé.
+
+Les rapports portent sur le dernier fichier chargé de chaque jeu (vues
+`current_books` et `current_jobs`) ou, avec `--all`, sur tout l'historique
+(tables `books` et `jobs`, colonne `file_id`).
+
+    python analytics.py analytics.sqlite load ../exo1/books_*.json ../exo4/livres_data.csv ../exo3/fake_jobs_results.csv
+    python analytics.py analytics.sqlite report prix-categorie
+    python analytics.py analytics.sqlite report historique-prix
+    python analytics.py analytics.sqlite sql "SELECT categorie, COUNT(*) FROM current_books GROUP BY 1"
+"""
+import argparse
+import csv
+import hashlib
+import itertools
+import json
+import math
+import os
+import sqlite3
+import sys
+import time
+from datetime import datetime
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    file_id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    dataset TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime REAL NOT NULL,
+    head_hash TEXT NOT NULL,
+    offset INTEGER NOT NULL DEFAULT 0,
+    rows INTEGER NOT NULL DEFAULT 0,
+    loaded_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS books (
+    file_id INTEGER NOT NULL,
+    titre TEXT,
+    url TEXT,
+    prix REAL,
+    note INTEGER,
+    en_stock INTEGER,
+    categorie TEXT
+);
+CREATE INDEX IF NOT EXISTS books_categorie ON books (file_id, categorie, prix);
+CREATE INDEX IF NOT EXISTS books_note ON books (file_id, note, prix);
+CREATE INDEX IF NOT EXISTS books_prix ON books (file_id, prix);
+CREATE TABLE IF NOT EXISTS jobs (
+    file_id INTEGER NOT NULL,
+    titre TEXT,
+    entreprise TEXT,
+    localisation TEXT,
+    date_publication TEXT,
+    url TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_localisation ON jobs (file_id, localisation);
+CREATE INDEX IF NOT EXISTS jobs_entreprise ON jobs (file_id, entreprise);
+"""
+
+BATCH_SIZE = 10_000
+# Octets hachés en tête de fichier pour reconnaître un JSONL réécrit (plutôt que complété)
+HEAD_BYTES = 4096
+
+BOOK_COLUMNS = ('titre', 'url', 'prix', 'note', 'en_stock', 'categorie')
+JOB_COLUMNS = ('titre', 'entreprise', 'localisation', 'date_publication', 'url')
+
+
+def _float(value):
+    return float(value) if value not in (None, '') else None
+
+
+def _int(value):
+    return int(float(value)) if value not in (None, '') else None
+
+
+def _bool(value):
+    if isinstance(value, str):
+        return value.strip().lower() in ('true', '1', 'yes')
+    return bool(value)
+
+
+def book_row(record):
+    """Livre exo1/exo6 (clés françaises en minuscules) ou exo4 (Titre, Prix, ...)."""
+    if 'url_detail' in record:
+        stock = record.get('stock_disponible')
+        return (record.get('titre'), record['url_detail'], _float(record.get('prix_gbp')), _int(record.get('note_sur_5')),
+                None if stock is None else int(_int(stock) > 0), record.get('categorie_principale'))
+    return (record.get('Titre'), None, _float(record.get('Prix')), _int(record.get('Note')),
+            int(_bool(record.get('En_Stock'))), record.get('Catégorie'))
+
+
+def job_row(record):
+    return (record.get('titre'), record.get('entreprise'), record.get('localisation'),
+            record.get('date_publication_std'), record.get('url_application'))
+
+
+DATASETS = {
+    'books': ('books', BOOK_COLUMNS, book_row),
+    'jobs': ('jobs', JOB_COLUMNS, job_row),
+}
+
+
+def detect_dataset(record):
+    if 'url_detail' in record or 'Titre' in record:
+        return 'books'
+    if 'entreprise' in record:
+        return 'jobs'
+    return None
+
+
+def _head_hash(path, size):
+    """Empreinte des min(HEAD_BYTES, size) premiers octets."""
+    with open(path, 'rb') as f:
+        return hashlib.sha1(f.read(min(HEAD_BYTES, size))).hexdigest()
+
+
+def iter_records(path, offset=0):
+    """(enregistrement, position après la ligne) ; seul un JSONL est repris à `offset`."""
+    if path.endswith('.jsonl'):
+        with open(path, 'rb') as f:
+            f.seek(offset)
+            for line in f:
+                # Ligne en cours d'écriture : reprise au prochain chargement
+                if not line.endswith(b'\n'):
+                    break
+                offset += len(line)
+                if line.strip():
+                    yield json.loads(line), offset
+    elif path.endswith('.csv'):
+        with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+            for record in csv.DictReader(f):
+                yield record, 0
+    elif path.endswith('.parquet'):
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=BATCH_SIZE):
+            for record in batch.to_pylist():
+                yield record, 0
+    else:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        for record in data if isinstance(data, list) else [data]:
+            yield record, 0
+
+
+class Warehouse:
+
+    def __init__(self, path):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+        try:
+            self.conn.execute("SELECT sqrt(1)")
+        except sqlite3.OperationalError:
+            # SQLite compilé sans les fonctions mathématiques
+            self.conn.create_function('sqrt', 1, lambda x: None if x is None else math.sqrt(x), deterministic=True)
+
+    def load(self, path):
+        """Charge (ou complète) un fichier ; renvoie (jeu de données, lignes ajoutées), ou None si déjà à jour."""
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        head_hash = _head_hash(path, stat.st_size)
+        known = self.conn.execute(
+            "SELECT file_id, dataset, size, mtime, head_hash, offset FROM files WHERE path = ?", (path,)
+        ).fetchone()
+        if known and (known[2], known[3]) == (stat.st_size, stat.st_mtime):
+            return None
+
+        offset = 0
+        # Tête comparée sur la longueur hachée au dernier chargement (fichier alors plus court que HEAD_BYTES)
+        if (known and path.endswith('.jsonl') and stat.st_size >= known[2]
+                and _head_hash(path, known[2]) == known[4]):
+            # JSONL complété : seules les nouvelles lignes sont lues
+            offset = known[5]
+        elif known:
+            with self.conn:
+                self.conn.execute(f"DELETE FROM {DATASETS[known[1]][0]} WHERE file_id = ?", (known[0],))
+
+        records = iter_records(path, offset)
+        first = next(records, None)
+        if first is None and not known:
+            return None
+        dataset = known[1] if known else detect_dataset(first[0])
+        if dataset is None:
+            raise ValueError(f"{path} : format d'enregistrement non reconnu (ni livres exo1/exo4/exo6, ni offres exo3)")
+        table, columns, to_row = DATASETS[dataset]
+
+        with self.conn:
+            if known:
+                file_id = known[0]
+            else:
+                file_id = self.conn.execute(
+                    "INSERT INTO files (path, dataset, size, mtime, head_hash, loaded_at) VALUES (?, ?, 0, 0, '', '')",
+                    (path, dataset)
+                ).lastrowid
+            insert = f"INSERT INTO {table} (file_id, {', '.join(columns)}) VALUES (?{', ?' * len(columns)})"
+            added = 0
+            batch = []
+            for record, offset in itertools.chain([first], records) if first else ():
+                batch.append((file_id,) + to_row(record))
+                if len(batch) >= BATCH_SIZE:
+                    self.conn.executemany(insert, batch)
+                    added += len(batch)
+                    batch = []
+            self.conn.executemany(insert, batch)
+            added += len(batch)
+            rows = self.conn.execute(f"SELECT COUNT(*) FROM {table} WHERE file_id = ?", (file_id,)).fetchone()[0]
+            self.conn.execute(
+                "UPDATE files SET size = ?, mtime = ?, head_hash = ?, offset = ?, rows = ?, loaded_at = ? WHERE file_id = ?",
+                (stat.st_size, stat.st_mtime, head_hash, offset, rows, datetime.now().isoformat(timespec='seconds'), file_id)
+            )
+        return dataset, added
+
+    def files(self):
+        columns = ('file_id', 'path', 'dataset', 'rows', 'loaded_at')
+        return [dict(zip(columns, row)) for row in self.conn.execute(f"SELECT {', '.join(columns)} FROM files ORDER BY file_id")]
+
+    def set_scope(self, all_files=False):
+        """Vues current_books / current_jobs : dernier fichier chargé de chaque jeu, ou tout l'historique."""
+        for dataset, (table, _, _) in DATASETS.items():
+            self.conn.execute(f"DROP VIEW IF EXISTS temp.current_{table}")
+            scope = "" if all_files else (
+                f" WHERE file_id = (SELECT file_id FROM files WHERE dataset = '{dataset}' ORDER BY mtime DESC LIMIT 1)"
+            )
+            self.conn.execute(f"CREATE TEMP VIEW current_{table} AS SELECT * FROM {table}{scope}")
+
+    def query(self, sql, params=()):
+        cursor = self.conn.execute(sql, params)
+        return [column[0] for column in cursor.description or ()], cursor.fetchall()
+
+    def close(self):
+        self.conn.close()
+
+
+# Rapports d'exo4 (livres) et d'exo3 (offres), sur les vues current_* ; les index
+# (file_id, colonne groupée, prix) les couvrent sans lire la table
+REPORTS = {
+    'prix-categorie': (
+        "Prix moyen par catégorie",
+        "SELECT categorie, ROUND(AVG(prix), 2) AS prix_moyen, COUNT(*) AS livres "
+        "FROM current_books GROUP BY categorie ORDER BY prix_moyen DESC"
+    ),
+    'prix-note': (
+        "Prix moyen par note",
+        "SELECT note, ROUND(AVG(prix), 2) AS prix_moyen, COUNT(*) AS livres FROM current_books GROUP BY note ORDER BY note"
+    ),
+    'prix-stats': (
+        "Tendances de prix (statistiques descriptives)",
+        "SELECT COUNT(prix) AS nombre, ROUND(AVG(prix), 2) AS moyenne, "
+        "ROUND(sqrt((SUM(prix * prix) - SUM(prix) * SUM(prix) / COUNT(prix)) / (COUNT(prix) - 1)), 2) AS ecart_type, "
+        "MIN(prix) AS min, "
+        # Moyenne des deux valeurs centrales si le nombre de prix est pair (comme pandas describe())
+        "(SELECT ROUND(AVG(prix), 2) FROM (SELECT prix FROM current_books WHERE prix IS NOT NULL ORDER BY prix "
+        "LIMIT 2 - (SELECT COUNT(prix) FROM current_books) % 2 "
+        "OFFSET ((SELECT COUNT(prix) FROM current_books) - 1) / 2)) AS mediane, "
+        "MAX(prix) AS max FROM current_books"
+    ),
+    'hors-stock': (
+        "Livres en rupture de stock",
+        "SELECT titre, categorie FROM current_books WHERE en_stock = 0 ORDER BY categorie, titre"
+    ),
+    'notes': (
+        "Distribution des notes",
+        "SELECT note, COUNT(*) AS livres FROM current_books GROUP BY note ORDER BY note"
+    ),
+    'historique-prix': (
+        "Prix moyen et nombre de livres par fichier chargé (tout l'historique)",
+        "SELECT f.file_id, f.loaded_at, f.path, COUNT(*) AS livres, ROUND(AVG(b.prix), 2) AS prix_moyen "
+        "FROM books b JOIN files f ON f.file_id = b.file_id GROUP BY f.file_id ORDER BY f.mtime"
+    ),
+    'offres-localisation': (
+        "Offres par localisation (Top 10)",
+        "SELECT localisation, COUNT(*) AS offres FROM current_jobs GROUP BY localisation ORDER BY offres DESC, localisation LIMIT 10"
+    ),
+    'offres-entreprise': (
+        "Offres par entreprise (Top 10)",
+        "SELECT entreprise, COUNT(*) AS offres FROM current_jobs GROUP BY entreprise ORDER BY offres DESC, entreprise LIMIT 10"
+    ),
+}
+
+
+def print_table(columns, rows, limit=None):
+    if not rows:
+        print("Aucune donnée.")
+        return
+    shown = rows[:limit]
+    cells = [[('' if value is None else str(value)) for value in row] for row in shown]
+    widths = [max([len(column)] + [len(row[i]) for row in cells]) for i, column in enumerate(columns)]
+    print("  ".join(column.ljust(width) for column, width in zip(columns, widths)))
+    for row in cells:
+        print("  ".join(value.ljust(width) for value, width in zip(row, widths)))
+    if limit is not None and len(rows) > limit:
+        print(f"... et {len(rows) - limit} autres lignes")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Analyses SQL des sorties de crawl (livres, offres) chargées dans SQLite.")
+    parser.add_argument('database', help="Entrepôt SQLite (créé si besoin)")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    load_parser = commands.add_parser('load', help="Charge ou complète des fichiers JSON, JSONL, CSV ou Parquet")
+    load_parser.add_argument('files', nargs='+')
+
+    report_parser = commands.add_parser('report', help=f"Rapport prédéfini : {', '.join(REPORTS)}")
+    report_parser.add_argument('name', choices=list(REPORTS) + ['all'])
+    report_parser.add_argument('--all', dest='all_files', action='store_true', help="Tout l'historique au lieu du dernier fichier")
+    report_parser.add_argument('-n', '--limit', type=int, help="Nombre maximal de lignes affichées")
+
+    sql_parser = commands.add_parser('sql', help="Requête libre (tables books, jobs, files ; vues current_books, current_jobs)")
+    sql_parser.add_argument('query')
+    sql_parser.add_argument('--all', dest='all_files', action='store_true', help="current_* couvrent tout l'historique")
+    sql_parser.add_argument('-n', '--limit', type=int)
+
+    commands.add_parser('files', help="Fichiers chargés")
+    args = parser.parse_args()
+
+    warehouse = Warehouse(args.database)
+    try:
+        if args.command == 'load':
+            for path in args.files:
+                start = time.perf_counter()
+                try:
+                    result = warehouse.load(path)
+                except (OSError, ValueError) as e:
+                    print(f"Fichier ignoré : {e}")
+                    continue
+                if result is None:
+                    print(f"{path} : déjà à jour")
+                else:
+                    print(f"{path} : {result[1]} lignes ajoutées ({result[0]}) en {time.perf_counter() - start:.2f}s")
+        elif args.command == 'files':
+            print_table(('file_id', 'dataset', 'rows', 'loaded_at', 'path'),
+                        [(f['file_id'], f['dataset'], f['rows'], f['loaded_at'], f['path']) for f in warehouse.files()])
+        else:
+            warehouse.set_scope(args.all_files)
+            if args.command == 'sql':
+                queries = [(None, args.query)]
+            else:
+                queries = list(REPORTS.values()) if args.name == 'all' else [REPORTS[args.name]]
+            for title, sql in queries:
+                if title:
+                    print(f"\n{title} :")
+                start = time.perf_counter()
+                try:
+                    columns, rows = warehouse.query(sql)
+                except sqlite3.Error as e:
+                    sys.exit(f"Erreur SQL : {e}")
+                print_table(columns, rows, args.limit)
+                print(f"({len(rows)} lignes en {(time.perf_counter() - start) * 1000:.1f} ms)")
+    finally:
+        warehouse.close()
@@ -0,0 +1,56 @@
+import os
+
+OUTPUT_FORMATS = ('csv', 'parquet')
+
+# Taille des row groups Parquet : chaque groupe porte ses statistiques min/max,
+# ce qui permet aux lecteurs d'ignorer les groupes hors filtre.
+ROW_GROUP_SIZE = 64_000
+
+
+def output_path(path, output_format):
+    root, _ = os.path.splitext(path)
+    return f"{root}.{output_format}"
+
+def write_dataframe(df, path, output_format='csv', dictionary_columns=(), sort_by=None):
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Format de sortie non supporté : {output_format}. Utilisez {' ou '.join(OUTPUT_FORMATS)}.")
+
+    if output_format == 'csv':
+        df.to_csv(path, index=False, encoding='utf-8-sig')
+        return
+
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    if sort_by:
+        # Des valeurs regroupées donnent des statistiques de row group plus sélectives
+        df = df.sort_values([col for col in sort_by if col in df.columns], kind='stable')
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    encoded_columns = [col for col in dictionary_columns if col in table.column_names]
+    for col in encoded_columns:
+        index = table.column_names.index(col)
+        table = table.set_column(index, col, table[col].dictionary_encode())
+
+    pq.write_table(
+        table,
+        path,
+        use_dictionary=encoded_columns or False,
+        write_statistics=True,
+        row_group_size=ROW_GROUP_SIZE,
+        compression='zstd'
+    )
+
+def read_columns(path, columns=None, filters=None):
+    """Lit uniquement les colonnes demandées ; `filters` est poussé au niveau des row groups.
+
+    Exemple : read_columns('jobs.parquet', ['titre', 'entreprise'], [('localisation', '==', 'Paris')])
+    """
+    if path.endswith('.parquet'):
+        import pyarrow.parquet as pq
+        return pq.read_table(path, columns=columns, filters=filters).to_pandas()
+
+    import pandas as pd
+    if filters:
+        raise ValueError("Les filtres ne sont supportés que pour les fichiers Parquet.")
+    return pd.read_csv(path, usecols=columns, encoding='utf-8-sig')
@@ -0,0 +1,155 @@
+"""Recrawl piloté par le taux de changement de chaque page.
+
+Les changements d'une page sont modélisés par un processus de Poisson de taux λ,
+estimé à partir des visites successives : n intervalles observés, X changements
+détectés (hash du contenu différent), durée moyenne I entre deux visites :
+
+    λ = -log((n - X + 0.5) / (n + 0.5)) / I     (estimateur de Cho & Garcia-Molina)
+
+L'estimation est tirée vers le taux moyen du site par PRIOR_WEIGHT observation
+fictive : sans elle, une page vue deux fois identique aurait λ = 0 et ne serait
+plus jamais revisitée.
+
+Pour un budget de N requêtes, on rafraîchit les N pages de plus forte priorité
+(les pages jamais vues d'abord). La priorité est le gain de fraîcheur attendu,
+t secondes après la dernière visite :
+
+    (1 - exp(-λt)) / λ - t·exp(-λt)
+
+Elle croît avec t pour toutes les pages, mais reste bornée (1/λ) pour une page qui
+change sans arrêt : la re-télécharger ne la garderait pas fraîche longtemps. Une
+simple probabilité de péremption (1 - exp(-λt)) gaspille au contraire le budget
+sur ces pages-là.
+"""
+import heapq
+import math
+import sqlite3
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    url TEXT PRIMARY KEY,
+    last_visit REAL NOT NULL,
+    last_hash TEXT NOT NULL,
+    intervals INTEGER NOT NULL DEFAULT 0,
+    changes INTEGER NOT NULL DEFAULT 0,
+    total_interval REAL NOT NULL DEFAULT 0
+);
+"""
+
+SECONDS_PER_DAY = 86400
+# Observations fictives au taux moyen du site ajoutées à celles de chaque page
+PRIOR_WEIGHT = 1
+
+
+def estimate_rate(intervals, changes, total_interval):
+    """Taux de changement (par seconde), ou None sans intervalle observé."""
+    if intervals <= 0 or total_interval <= 0:
+        return None
+    mean_interval = total_interval / intervals
+    return -math.log((intervals - changes + 0.5) / (intervals + 0.5)) / mean_interval
+
+
+def smoothed_rate(intervals, changes, mean_interval, prior_rate, prior_weight=PRIOR_WEIGHT):
+    """Estimateur de Cho & Garcia-Molina avec `prior_weight` observations fictives au taux `prior_rate`."""
+    if mean_interval <= 0:
+        return prior_rate
+    prior_changes = prior_weight * (1 - math.exp(-prior_rate * mean_interval))
+    return estimate_rate(intervals + prior_weight, changes + prior_changes, mean_interval * (intervals + prior_weight))
+
+
+def staleness_probability(rate, elapsed):
+    return 1 - math.exp(-rate * max(elapsed, 0))
+
+
+def refresh_priority(rate, elapsed):
+    """Gain de fraîcheur attendu d'une visite, `elapsed` secondes après la précédente."""
+    if rate <= 0:
+        return 0.0
+    decay = math.exp(-rate * max(elapsed, 0))
+    return (1 - decay) / rate - max(elapsed, 0) * decay
+
+
+class FreshnessTracker:
+
+    def __init__(self, path):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(SCHEMA)
+
+    def observe(self, url, content_hash, visited_at=None):
+        """Enregistre une visite ; renvoie True si le contenu a changé depuis la précédente."""
+        visited_at = visited_at or time.time()
+        row = self.conn.execute("SELECT last_visit, last_hash FROM pages WHERE url = ?", (url,)).fetchone()
+        with self.conn:
+            if row is None:
+                self.conn.execute("INSERT INTO pages (url, last_visit, last_hash) VALUES (?, ?, ?)", (url, visited_at, content_hash))
+                return False
+            last_visit, last_hash = row
+            changed = content_hash != last_hash
+            self.conn.execute(
+                "UPDATE pages SET last_visit = ?, last_hash = ?, intervals = intervals + 1, "
+                "changes = changes + ?, total_interval = total_interval + ? WHERE url = ?",
+                (visited_at, content_hash, int(changed), max(visited_at - last_visit, 0), url)
+            )
+        return changed
+
+    def site_rate(self):
+        """Taux agrégé de toutes les pages (a priori des pages peu observées)."""
+        intervals, changes, total_interval = self.conn.execute(
+            "SELECT SUM(intervals), SUM(changes), SUM(total_interval) FROM pages"
+        ).fetchone()
+        return estimate_rate(intervals or 0, changes or 0, total_interval or 0) or 0.0
+
+    def rates(self, now=None):
+        """{url: (taux estimé par seconde, dernière visite)} de toutes les pages connues."""
+        now = now or time.time()
+        prior_rate = self.site_rate()
+        rates = {}
+        for url, last_visit, intervals, changes, total_interval in self.conn.execute(
+            "SELECT url, last_visit, intervals, changes, total_interval FROM pages"
+        ):
+            # Page vue une seule fois : l'intervalle de référence est le temps écoulé depuis
+            mean_interval = total_interval / intervals if intervals else now - last_visit
+            rates[url] = (smoothed_rate(intervals, changes, mean_interval, prior_rate), last_visit)
+        return rates
+
+    def priorities(self, urls, now=None):
+        """[(priorité, secondes depuis la visite, url)] ; priorité infinie pour une page jamais vue."""
+        now = now or time.time()
+        known = self.rates(now)
+        priorities = []
+        for url in urls:
+            if url not in known:
+                priorities.append((math.inf, math.inf, url))
+                continue
+            rate, last_visit = known[url]
+            elapsed = now - last_visit
+            priorities.append((refresh_priority(rate, elapsed), elapsed, url))
+        return priorities
+
+    def plan(self, urls, budget, now=None):
+        """Les `budget` URLs à re-télécharger, et le nombre attendu de pages périmées parmi les autres."""
+        now = now or time.time()
+        selected = heapq.nlargest(budget, self.priorities(urls, now))
+        chosen = {url for _, _, url in selected}
+        known = self.rates(now)
+        left_stale = sum(
+            staleness_probability(known[url][0], now - known[url][1])
+            for url in urls if url not in chosen and url in known
+        )
+        return [url for _, _, url in selected], left_stale
+
+    def summary(self):
+        """Pages connues et répartition des taux estimés (changements par jour)."""
+        rates = sorted(rate * SECONDS_PER_DAY for rate, _ in self.rates().values())
+        if not rates:
+            return {"pages": 0}
+        return {
+            "pages": len(rates),
+            "median_changes_per_day": round(rates[len(rates) // 2], 3),
+            "max_changes_per_day": round(rates[-1], 3),
+        }
+
+    def close(self):
+        self.conn.close()
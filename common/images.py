@@ -0,0 +1,353 @@
+"""Téléchargement des images (couvertures) collectées par les scrapers.
+
+    python images.py ../exo1/books_scrape_20250101_120000.json ../exo6/books_data_resilient.jsonl
+    python images.py books.json --out covers --workers 16 --rate-per-host 4
+
+- Téléchargements concurrents (threads), écrits sur disque au fil du flux.
+- Stockage adressé par contenu : objects/ab/cd/<sha256>. Une image servie sous
+  plusieurs URLs n'est stockée qu'une fois ; manifest.sqlite relie URL et hash.
+- Reprise : un téléchargement interrompu reste dans partial/<sha1(url)>.part et
+  reprend par une requête Range (If-Range sur l'ETag/Last-Modified d'origine).
+- Hash perceptuel (dHash 64 bits, Pillow requis) calculé dans un pool de processus.
+- Limite de débit par hôte (token bucket) ; un 429 suspend l'hôte (Retry-After).
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import sys
+import threading
+import time
+from collections import Counter, namedtuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from urllib.parse import urlsplit
+
+import requests
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.transport import create_session
+
+CHUNK_SIZE = 64 * 1024
+DEFAULT_RATE_PER_HOST = 5
+MAX_ATTEMPTS = 3
+# Champs contenant l'URL de l'image dans les sorties des scrapers
+IMAGE_FIELDS = ('url_image_hd', 'image_url')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS images (
+    url TEXT PRIMARY KEY,
+    sha256 TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    content_type TEXT,
+    fetched TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS phashes (sha256 TEXT PRIMARY KEY, dhash TEXT);
+"""
+
+ImageResult = namedtuple('ImageResult', ['url', 'sha256', 'size', 'content_type', 'bytes_downloaded', 'resumed', 'deduplicated', 'seconds'])
+
+
+class DownloadError(Exception):
+    pass
+
+
+class HostRateLimiter:
+    """Token bucket par hôte : `rate` requêtes/s en moyenne, rafales jusqu'à `burst`."""
+
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.burst = burst or max(1, rate)
+        self._buckets = {}
+        self._paused_until = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, host):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                tokens, last = self._buckets.get(host, (self.burst, now))
+                tokens = min(self.burst, tokens + (now - last) * self.rate)
+                paused_until = self._paused_until.get(host, 0)
+                if now >= paused_until and tokens >= 1:
+                    self._buckets[host] = (tokens - 1, now)
+                    return
+                self._buckets[host] = (tokens, now)
+                wait = max(paused_until - now, (1 - tokens) / self.rate)
+            time.sleep(wait)
+
+    def pause(self, host, seconds):
+        with self._lock:
+            self._paused_until[host] = max(self._paused_until.get(host, 0), time.monotonic() + seconds)
+
+
+class DownloadMetrics:
+
+    def __init__(self):
+        self.started = time.time()
+        self.files = 0
+        self.bytes = 0
+        self.resumed = 0
+        self.deduplicated = 0
+        self.skipped = 0
+        self.failures = 0
+        self.latencies = []
+        self.hosts = Counter()
+
+    def record(self, result):
+        self.files += 1
+        self.bytes += result.bytes_downloaded
+        self.resumed += result.resumed
+        self.deduplicated += result.deduplicated
+        self.latencies.append(result.seconds)
+        self.hosts[urlsplit(result.url).netloc] += 1
+
+    def summary(self):
+        elapsed = time.time() - self.started
+        latencies = sorted(self.latencies)
+        return {
+            "files": self.files,
+            "skipped": self.skipped,
+            "failures": self.failures,
+            "resumed": self.resumed,
+            "deduplicated": self.deduplicated,
+            "mb_downloaded": round(self.bytes / 1e6, 2),
+            "elapsed_sec": round(elapsed, 2),
+            "files_per_sec": round(self.files / elapsed, 2) if elapsed else None,
+            "mb_per_sec": round(self.bytes / 1e6 / elapsed, 2) if elapsed else None,
+            "latency_p95_sec": round(latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))], 3) if latencies else None,
+            "hosts": dict(self.hosts),
+        }
+
+
+class ImageStore:
+
+    def __init__(self, root):
+        self.root = root
+        self.partial_dir = os.path.join(root, 'partial')
+        os.makedirs(self.partial_dir, exist_ok=True)
+        self.conn = sqlite3.connect(os.path.join(root, 'manifest.sqlite'))
+        self.conn.executescript(SCHEMA)
+
+    def object_path(self, digest):
+        return os.path.join(self.root, 'objects', digest[:2], digest[2:4], digest)
+
+    def partial_path(self, url):
+        return os.path.join(self.partial_dir, hashlib.sha1(url.encode('utf-8')).hexdigest() + '.part')
+
+    def pending(self, urls):
+        """URLs (dédoublonnées, ordre conservé) sans objet déjà stocké."""
+        known = dict(self.conn.execute("SELECT url, sha256 FROM images"))
+        pending = []
+        for url in dict.fromkeys(urls):
+            if url in known and os.path.exists(self.object_path(known[url])):
+                continue
+            pending.append(url)
+        return pending
+
+    def add(self, result):
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO images VALUES (?, ?, ?, ?, ?)",
+                (result.url, result.sha256, result.size, result.content_type, time.strftime('%Y-%m-%dT%H:%M:%S'))
+            )
+
+    def has_phash(self, digest):
+        return self.conn.execute("SELECT 1 FROM phashes WHERE sha256 = ?", (digest,)).fetchone() is not None
+
+    def set_phash(self, digest, dhash):
+        with self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO phashes VALUES (?, ?)", (digest, dhash))
+
+    def close(self):
+        self.conn.close()
+
+
+def _retry_after(response, default=5):
+    try:
+        return float(response.headers.get('Retry-After', default))
+    except ValueError:
+        return default
+
+
+class ImageDownloader:
+
+    def __init__(self, store, limiter, workers=8, timeout=30, http2=False):
+        self.store = store
+        self.limiter = limiter
+        self.timeout = timeout
+        # Transport partagé : pool de `workers` connexions par hôte, cache DNS, HTTP/2 en option.
+        # Octets identiques d'une requête à l'autre : indispensable pour reprendre par Range
+        self.session = create_session(
+            concurrency=workers, timeout=timeout, http2=http2,
+            headers={"User-Agent": "MultiSourceScraper-Bot-v1.0", "Accept-Encoding": "identity"}
+        )
+
+    def _validators(self, part_path):
+        try:
+            with open(part_path + '.json', 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _fetch_once(self, url):
+        part_path = self.store.partial_path(url)
+        offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        headers = {}
+        if offset:
+            headers['Range'] = f"bytes={offset}-"
+            validators = self._validators(part_path)
+            validator = validators.get('etag') or validators.get('last_modified')
+            if validator:
+                headers['If-Range'] = validator
+
+        host = urlsplit(url).netloc
+        self.limiter.acquire(host)
+        start_time = time.perf_counter()
+        with self.session.get(url, headers=headers, stream=True, timeout=self.timeout) as response:
+            if response.status_code == 429:
+                self.limiter.pause(host, _retry_after(response))
+                raise DownloadError("HTTP 429, hôte mis en pause")
+            if response.status_code >= 500:
+                raise DownloadError(f"HTTP {response.status_code}")
+            if response.status_code == 416:
+                # Fichier partiel plus long que la ressource : on repart de zéro
+                os.remove(part_path)
+                raise DownloadError("Range refusée (416), téléchargement recommencé")
+            response.raise_for_status()
+
+            digest = hashlib.sha256()
+            resumed = response.status_code == 206 and offset > 0
+            if resumed:
+                with open(part_path, 'rb') as f:
+                    for chunk in iter(lambda: f.read(1 << 20), b''):
+                        digest.update(chunk)
+            with open(part_path + '.json', 'w', encoding='utf-8') as f:
+                json.dump({"url": url, "etag": response.headers.get('ETag'), "last_modified": response.headers.get('Last-Modified')}, f)
+
+            downloaded = 0
+            with open(part_path, 'ab' if resumed else 'wb') as f:
+                for chunk in response.iter_content(CHUNK_SIZE):
+                    f.write(chunk)
+                    digest.update(chunk)
+                    downloaded += len(chunk)
+            content_type = response.headers.get('Content-Type')
+        seconds = time.perf_counter() - start_time
+
+        sha256 = digest.hexdigest()
+        final_path = self.store.object_path(sha256)
+        deduplicated = os.path.exists(final_path)
+        if deduplicated:
+            os.remove(part_path)
+        else:
+            os.makedirs(os.path.dirname(final_path), exist_ok=True)
+            os.replace(part_path, final_path)
+        os.remove(part_path + '.json')
+        return ImageResult(url, sha256, os.path.getsize(final_path), content_type, downloaded, resumed, deduplicated, seconds)
+
+    def fetch(self, url):
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            try:
+                return self._fetch_once(url)
+            except (DownloadError, requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError) as e:
+                # Le fichier partiel est conservé : la tentative suivante (ou le prochain run) reprend
+                if attempt == MAX_ATTEMPTS:
+                    raise
+                logging.warning(f"Image {url} : {e}, nouvelle tentative ({attempt}/{MAX_ATTEMPTS - 1})")
+                time.sleep(attempt)
+
+
+def dhash_file(path, size=8):
+    """dHash : signe du gradient horizontal d'une vignette (size+1)x(size) en niveaux de gris."""
+    from PIL import Image
+
+    try:
+        with Image.open(path) as image:
+            pixels = list(image.convert('L').resize((size + 1, size)).getdata())
+    except OSError:
+        return None
+    bits = 0
+    for row in range(size):
+        for col in range(size):
+            left, right = pixels[row * (size + 1) + col], pixels[row * (size + 1) + col + 1]
+            bits = (bits << 1) | (left > right)
+    return f"{bits:0{size * size // 4}x}"
+
+
+def _phash_available():
+    try:
+        import PIL  # noqa: F401
+        return True
+    except ImportError:
+        logging.warning("Pillow absent : hash perceptuel des images non calculé (pip install Pillow).")
+        return False
+
+
+def download_images(urls, root, workers=8, rate_per_host=DEFAULT_RATE_PER_HOST, phash_workers=None, timeout=30, http2=False):
+    """Télécharge les images de `urls` dans `root` ; renvoie les métriques du run."""
+    store = ImageStore(root)
+    metrics = DownloadMetrics()
+    pending = store.pending(urls)
+    metrics.skipped = len(set(urls)) - len(pending)
+    logging.info(f"Images : {len(pending)} à télécharger, {metrics.skipped} déjà stockées.")
+
+    downloader = ImageDownloader(store, HostRateLimiter(rate_per_host), workers, timeout, http2)
+    hashers = ProcessPoolExecutor(phash_workers) if pending and _phash_available() else None
+    hash_futures = {}
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='image') as executor:
+        futures = {executor.submit(downloader.fetch, url): url for url in pending}
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except (DownloadError, requests.RequestException, OSError) as e:
+                metrics.failures += 1
+                logging.error(f"Échec du téléchargement de {futures[future]}: {e}")
+                continue
+            metrics.record(result)
+            store.add(result)
+            # Le hash perceptuel avance en parallèle des téléchargements restants
+            if hashers and result.sha256 not in hash_futures.values() and not store.has_phash(result.sha256):
+                hash_futures[hashers.submit(dhash_file, store.object_path(result.sha256))] = result.sha256
+
+    if hashers:
+        for future in as_completed(hash_futures):
+            store.set_phash(hash_futures[future], future.result())
+        hashers.shutdown()
+    store.close()
+    return metrics.summary()
+
+
+def image_urls_from_file(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        if path.endswith(('.jsonl', '.ndjson')):
+            records = [json.loads(line) for line in f if line.strip()]
+        else:
+            records = json.load(f)
+    return [record[field] for record in records for field in IMAGE_FIELDS if record.get(field)]
+
+
+def print_summary(summary):
+    print(f"Images : {summary['files']} téléchargées ({summary['resumed']} reprises, {summary['deduplicated']} déjà "
+          f"présentes sous une autre URL), {summary['skipped']} déjà stockées, {summary['failures']} échecs.")
+    print(f"Débit : {summary['files_per_sec']} images/s, {summary['mb_per_sec']} Mo/s "
+          f"({summary['mb_downloaded']} Mo en {summary['elapsed_sec']} s, latence p95 {summary['latency_p95_sec']} s).")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Télécharge les images référencées par les sorties des scrapers.")
+    parser.add_argument('inputs', nargs='+', help=f"Fichiers JSON/JSONL contenant {' ou '.join(IMAGE_FIELDS)}")
+    parser.add_argument('--out', default='images', help="Dossier de stockage (défaut: images)")
+    parser.add_argument('--workers', type=int, default=8, help="Téléchargements simultanés (défaut: 8)")
+    parser.add_argument('--rate-per-host', type=float, default=DEFAULT_RATE_PER_HOST,
+                        help=f"Requêtes par seconde et par hôte (défaut: {DEFAULT_RATE_PER_HOST})")
+    parser.add_argument('--phash-workers', type=int, help="Processus de calcul du hash perceptuel (défaut: nombre de cœurs)")
+    parser.add_argument('--http2', action='store_true', help="HTTP/2 via httpx (si installé)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    urls = [url for path in args.inputs for url in image_urls_from_file(path)]
+    summary = download_images(urls, args.out, args.workers, args.rate_per_host, args.phash_workers, http2=args.http2)
+    print_summary(summary)
+    with open(os.path.join(args.out, 'last_run_metrics.json'), 'w', encoding='utf-8') as f:
+        json.dump(summary, f, indent=4)
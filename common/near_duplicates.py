@@ -0,0 +1,161 @@
+import re
+import zlib
+
+import numpy as np
+
+MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+MAX_HASH = np.uint64((1 << 32) - 1)
+
+WORD_PATTERN = re.compile(r'\w+')
+
+# Jusqu'à cette taille, toutes les paires d'un bucket sont comparées
+SMALL_BUCKET = 32
+# Probabilité minimale qu'une paire exactement au seuil soit comparée
+TARGET_RECALL = 0.95
+
+
+def shingles(text, size=3, unit='word'):
+    """Ensemble des k-grammes de mots (unit='word') ou de caractères (unit='char')."""
+    if not isinstance(text, str) or not text:
+        return set()
+    if unit == 'char':
+        normalized = " ".join(text.lower().split())
+        if len(normalized) <= size:
+            return {normalized} if normalized else set()
+        return {normalized[i:i + size] for i in range(len(normalized) - size + 1)}
+
+    words = WORD_PATTERN.findall(text.lower())
+    if len(words) <= size:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+def choose_bands(num_perm, threshold, target_recall=TARGET_RECALL):
+    """Choisit (bandes, lignes), bandes * lignes <= num_perm, pour ne pas rater les paires au seuil.
+
+    Une paire de similarité J devient candidate avec la probabilité 1 - (1 - J^lignes)^bandes.
+    On garde le plus grand nombre de lignes (le moins de faux positifs) qui atteint
+    `target_recall` à J = threshold ; la vérification des signatures écarte ensuite
+    les faux positifs.
+    """
+    for rows in range(num_perm, 0, -1):
+        bands = num_perm // rows
+        if 1 - (1 - threshold ** rows) ** bands >= target_recall:
+            return bands, rows
+    return num_perm, 1
+
+
+class MinHasher:
+
+    def __init__(self, num_perm=128, seed=1):
+        rng = np.random.RandomState(seed)
+        self.num_perm = num_perm
+        self.a = rng.randint(1, int(MERSENNE_PRIME), size=num_perm, dtype=np.uint64)
+        self.b = rng.randint(0, int(MERSENNE_PRIME), size=num_perm, dtype=np.uint64)
+
+    def signature(self, shingle_set):
+        if not shingle_set:
+            return None
+        hashes = np.fromiter(
+            (zlib.crc32(s.encode('utf-8')) for s in shingle_set),
+            dtype=np.uint64,
+            count=len(shingle_set)
+        )
+        # Le débordement uint64 est voulu : on ne garde que les 32 bits de poids faible
+        with np.errstate(over='ignore'):
+            permuted = (np.outer(hashes, self.a) + self.b) % MERSENNE_PRIME & MAX_HASH
+        return permuted.min(axis=0).astype(np.uint32)
+
+
+class LSHIndex:
+    """Index LSH par bandes : seuls les enregistrements partageant une bande sont comparés."""
+
+    def __init__(self, num_perm=128, threshold=0.8):
+        self.threshold = threshold
+        self.bands, self.rows = choose_bands(num_perm, threshold)
+        self.tables = [{} for _ in range(self.bands)]
+        self.signatures = {}
+
+    def insert(self, key, signature):
+        self.signatures[key] = signature
+        for band, table in enumerate(self.tables):
+            bucket = signature[band * self.rows:(band + 1) * self.rows].tobytes()
+            table.setdefault(bucket, []).append(key)
+
+    def similarity(self, key_a, key_b):
+        return float(np.mean(self.signatures[key_a] == self.signatures[key_b]))
+
+    def candidate_pairs(self, same_cluster):
+        """Paires à comparer, bucket par bucket.
+
+        Petit bucket : toutes les paires. Gros bucket (souvent des textes
+        identiques) : chaque membre est comparé aux représentants des clusters
+        déjà formés dans le bucket, jusqu'au premier qu'il rejoint ;
+        `same_cluster(a, b)` renseigne le générateur sur les fusions faites.
+        """
+        for table in self.tables:
+            for keys in table.values():
+                if len(keys) <= SMALL_BUCKET:
+                    for i, key_a in enumerate(keys):
+                        for key_b in keys[i + 1:]:
+                            yield key_a, key_b
+                    continue
+                representatives = [keys[0]]
+                for key in keys[1:]:
+                    for representative in representatives:
+                        yield representative, key
+                        if same_cluster(representative, key):
+                            break
+                    else:
+                        representatives.append(key)
+
+
+class _UnionFind:
+
+    def __init__(self, size):
+        self.parent = list(range(size))
+
+    def find(self, x):
+        while self.parent[x] != x:
+            self.parent[x] = self.parent[self.parent[x]]
+            x = self.parent[x]
+        return x
+
+    def union(self, a, b):
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a != root_b:
+            # La racine est toujours le plus petit index : le cluster porte l'id de sa première occurrence
+            if root_a < root_b:
+                self.parent[root_b] = root_a
+            else:
+                self.parent[root_a] = root_b
+
+
+def find_near_duplicates(texts, threshold=0.8, num_perm=128, shingle_size=3, unit='word', seed=1):
+    """Renvoie, pour chaque texte, l'id de son cluster de quasi-doublons.
+
+    L'id est l'index de la première occurrence du cluster : un texte sans
+    quasi-doublon a pour id son propre index.
+    """
+    hasher = MinHasher(num_perm, seed)
+    index = LSHIndex(num_perm, threshold)
+
+    count = 0
+    for i, text in enumerate(texts):
+        signature = hasher.signature(shingles(text, shingle_size, unit))
+        if signature is not None:
+            index.insert(i, signature)
+        count += 1
+
+    clusters = _UnionFind(count)
+    def same_cluster(key_a, key_b):
+        return clusters.find(key_a) == clusters.find(key_b)
+
+    for key_a, key_b in index.candidate_pairs(same_cluster):
+        if not same_cluster(key_a, key_b) and index.similarity(key_a, key_b) >= threshold:
+            clusters.union(key_a, key_b)
+
+    return [clusters.find(i) for i in range(count)]
+
+def is_near_duplicate(cluster_ids):
+    """True pour tout enregistrement qui n'est pas la première occurrence de son cluster."""
+    return [cluster_id != i for i, cluster_id in enumerate(cluster_ids)]
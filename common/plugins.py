@@ -0,0 +1,61 @@
+import importlib
+
+
+def load_object(spec):
+    """'module.sous_module:Attribut' -> objet, le module n'étant importé qu'à cet appel."""
+    module_name, _, attribute = spec.partition(':')
+    if not module_name or not attribute:
+        raise ValueError(f"Cible de plugin invalide : '{spec}'. Format attendu : 'module:Attribut'")
+    obj = importlib.import_module(module_name)
+    for part in attribute.split('.'):
+        obj = getattr(obj, part)
+    return obj
+
+
+class PluginRegistry:
+    """Registre de plugins nommés, chargés paresseusement.
+
+    Les entrées intégrées sont de simples chaînes 'module:Attribut' ; les paquets
+    installés peuvent en ajouter via le groupe d'entry points `group`. Rien n'est
+    importé avant le premier `load(nom)`.
+    """
+
+    def __init__(self, group, builtins=None):
+        self.group = group
+        self._specs = dict(builtins or {})
+        self._loaded = {}
+        self._entry_points = None
+
+    def register(self, name, spec):
+        self._specs[name] = spec
+        self._loaded.pop(name, None)
+
+    def _discovered(self):
+        if self._entry_points is None:
+            from importlib import metadata
+            self._entry_points = {ep.name: ep for ep in metadata.entry_points(group=self.group)}
+        return self._entry_points
+
+    def __contains__(self, name):
+        return name in self._specs or name in self._discovered()
+
+    def names(self):
+        return sorted(set(self._specs) | set(self._discovered()))
+
+    def spec(self, name):
+        """Cible déclarée pour `name` ('module:Attribut' ou valeur de l'entry point), sans l'importer."""
+        if name in self._specs:
+            return self._specs[name]
+        if name in self._discovered():
+            return self._discovered()[name].value
+        raise KeyError(f"Plugin '{name}' inconnu (groupe {self.group}).")
+
+    def load(self, name):
+        if name not in self._loaded:
+            if name in self._specs:
+                self._loaded[name] = load_object(self._specs[name])
+            elif name in self._discovered():
+                self._loaded[name] = self._discovered()[name].load()
+            else:
+                raise KeyError(f"Plugin '{name}' inconnu (groupe {self.group}).")
+        return self._loaded[name]
@@ -0,0 +1,279 @@
+"""Stockage compact d'enregistrements en colonnes, à la place d'une liste de dicts.
+
+Un dict par enregistrement coûte plusieurs centaines d'octets avant même les
+valeurs (table de hachage, float et int boxés). Ici chaque champ est une colonne :
+
+- 'float', 'int', 'bool' : array.array (8, 8 et 1 octet par valeur) ;
+- 'category' : encodage par dictionnaire, un code entier par ligne et chaque
+  valeur distincte stockée une seule fois (catégories, devises, villes...) ;
+- 'text' : chaînes UTF-8 concaténées et tableau d'offsets (titres, URLs).
+
+`to_dataframe()` expose ces buffers à pandas sans copie (np.frombuffer, codes
+de Categorical, chaînes Arrow si pyarrow est installé). Tant qu'une DataFrame
+issue du store est vivante, ses buffers sont partagés : `append` lève alors
+BufferError. Un enregistrement refusé (type invalide, BufferError) laisse le
+store inchangé.
+
+    python records.py -n 1000000     # empreinte mémoire (tracemalloc) vs. liste de dicts
+"""
+import argparse
+import gc
+import math
+import random
+import time
+import tracemalloc
+from array import array
+
+COLUMN_KINDS = ('float', 'int', 'bool', 'category', 'text')
+ARRAY_TYPECODES = {'float': 'd', 'int': 'q', 'bool': 'b'}
+NUMPY_DTYPES = {'d': 'float64', 'q': 'int64', 'b': 'bool'}
+
+# Largeur des codes de catégorie selon le nombre de valeurs distinctes : mêmes seuils
+# que pandas, qui réutilise alors les codes tels quels (sans conversion ni copie)
+CODE_WIDTHS = ((127, 'b'), (32767, 'h'), (2**31 - 1, 'i'))
+CODE_DTYPES = {'b': 'int8', 'h': 'int16', 'i': 'int32'}
+
+
+class RecordStore:
+    """Enregistrements de schéma fixe, p. ex. {'Titre': 'text', 'Prix': 'float', 'Catégorie': 'category'}."""
+
+    def __init__(self, schema):
+        unknown = {field: kind for field, kind in schema.items() if kind not in COLUMN_KINDS}
+        if unknown:
+            raise ValueError(f"Types de colonnes inconnus : {unknown}. Types possibles : {', '.join(COLUMN_KINDS)}.")
+        self.schema = dict(schema)
+        self.columns = {}
+        for field, kind in self.schema.items():
+            if kind in ARRAY_TYPECODES:
+                self.columns[field] = array(ARRAY_TYPECODES[kind])
+            elif kind == 'category':
+                self.columns[field] = _CategoryColumn()
+            else:
+                self.columns[field] = _TextColumn()
+        self._length = 0
+        self._appenders = self._build_appenders()
+
+    def _build_appenders(self):
+        appenders = []
+        for field, kind in self.schema.items():
+            column = self.columns[field]
+            if kind == 'float':
+                appenders.append((field, lambda value, column=column: column.append(math.nan if value is None else value)))
+            elif kind == 'bool':
+                appenders.append((field, lambda value, column=column: column.append(bool(value))))
+            else:
+                appenders.append((field, column.append))
+        return appenders
+
+    def append(self, record):
+        """Ajoute un enregistrement (dict) ; None n'est accepté que pour 'float' (NaN) et 'category'."""
+        self.extend((record,))
+
+    def extend(self, records):
+        for record in records:
+            missing = self.schema.keys() - record.keys()
+            if missing:
+                raise KeyError(f"Champs manquants : {', '.join(sorted(missing))}")
+            try:
+                for field, append in self._appenders:
+                    append(record[field])
+            except Exception:
+                # Colonnes déjà écrites ramenées à la longueur du store : elles restent alignées
+                self._rollback()
+                raise
+            self._length += 1
+
+    def _rollback(self):
+        for column in self.columns.values():
+            # Colonne non écrite : rien à annuler (et ses buffers peuvent être partagés)
+            if len(column) <= self._length:
+                continue
+            if isinstance(column, array):
+                del column[self._length:]
+            else:
+                column.truncate(self._length)
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("Indice hors du store")
+        record = {}
+        for field, kind in self.schema.items():
+            value = self.columns[field][index]
+            if kind == 'bool':
+                value = bool(value)
+            elif kind == 'float' and math.isnan(value):
+                value = None
+            record[field] = value
+        return record
+
+    def __iter__(self):
+        for index in range(self._length):
+            yield self[index]
+
+    def column(self, field):
+        """Colonne sous forme de tableau NumPy / Categorical / chaînes, sans copie."""
+        import numpy as np
+
+        column = self.columns[field]
+        if isinstance(column, array):
+            return np.frombuffer(column, dtype=NUMPY_DTYPES[column.typecode])
+        return column.to_pandas()
+
+    def to_dataframe(self):
+        import pandas as pd
+
+        return pd.DataFrame({field: self.column(field) for field in self.schema}, copy=False)
+
+
+class _CategoryColumn:
+
+    def __init__(self):
+        self.codes = array('b')
+        self.values = []
+        self.index = {}
+        self._last_new = False
+
+    def append(self, value):
+        if value is None:
+            self.codes.append(-1)
+            self._last_new = False
+            return
+        code = self.index.get(value)
+        new = code is None
+        if new:
+            code = len(self.values)
+            self._widen(code + 1)
+        self.codes.append(code)
+        if new:
+            # Les objets stockés sont les premières occurrences : les suivantes sont libérées
+            self.index[value] = code
+            self.values.append(value)
+        self._last_new = new
+
+    def __len__(self):
+        return len(self.codes)
+
+    def truncate(self, length):
+        """Annule le dernier ajout (enregistrement refusé par une autre colonne)."""
+        if self._last_new:
+            del self.index[self.values.pop()]
+        del self.codes[length:]
+        self._last_new = False
+
+    def _widen(self, categories):
+        for limit, typecode in CODE_WIDTHS:
+            if categories < limit:
+                break
+        if typecode != self.codes.typecode:
+            self.codes = array(typecode, self.codes)
+
+    def __getitem__(self, index):
+        code = self.codes[index]
+        return None if code < 0 else self.values[code]
+
+    def to_pandas(self):
+        import numpy as np
+        import pandas as pd
+
+        codes = np.frombuffer(self.codes, dtype=CODE_DTYPES[self.codes.typecode])
+        # Codes valides par construction : pas de validation (qui allouerait un masque par ligne)
+        return pd.Categorical.from_codes(codes, dtype=pd.CategoricalDtype(self.values), validate=False)
+
+
+class _TextColumn:
+
+    def __init__(self):
+        self.data = bytearray()
+        self.offsets = array('q', [0])
+
+    def append(self, value):
+        self.data += value.encode('utf-8')
+        self.offsets.append(len(self.data))
+
+    def __getitem__(self, index):
+        return self.data[self.offsets[index]:self.offsets[index + 1]].decode('utf-8')
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def truncate(self, length):
+        del self.data[self.offsets[length]:]
+        del self.offsets[length + 1:]
+
+    def to_pandas(self):
+        try:
+            import pyarrow as pa
+        except ImportError:
+            # Sans pyarrow, pandas a besoin d'un objet str par ligne : copie inévitable
+            import numpy as np
+            return np.array([self[index] for index in range(len(self))], dtype=object)
+
+        import pandas as pd
+
+        strings = pa.LargeStringArray.from_buffers(len(self), pa.py_buffer(self.offsets), pa.py_buffer(self.data))
+        return pd.arrays.ArrowStringArray(strings)
+
+
+BOOK_SCHEMA = {'Titre': 'text', 'Prix': 'float', 'Note': 'int', 'En_Stock': 'bool', 'Catégorie': 'category'}
+
+
+def generate_books(count, categories=50, seed=42):
+    """Enregistrements de la forme de exo4 ; chaque chaîne est un nouvel objet, comme après parsing."""
+    rng = random.Random(seed)
+    for i in range(count):
+        yield {
+            'Titre': f"Livre numéro {i} : {'une histoire ' * rng.randint(1, 4)}",
+            'Prix': round(rng.uniform(10, 60), 2),
+            'Note': rng.randint(1, 5),
+            'En_Stock': rng.random() < 0.9,
+            'Catégorie': f"categorie_{rng.randrange(categories)}",
+        }
+
+
+def measure(build):
+    """(résultat, octets alloués encore vivants, pic, secondes) pour `build()`."""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build()
+    duration = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current, peak, duration
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Empreinte mémoire (tracemalloc) du RecordStore face à une liste de dicts (schéma exo4)."
+    )
+    parser.add_argument('-n', '--records', type=int, default=1_000_000, help="Nombre d'enregistrements synthétiques (défaut: 1 000 000)")
+    parser.add_argument('--categories', type=int, default=50, help="Nombre de catégories distinctes (défaut: 50)")
+    args = parser.parse_args()
+
+    print(f"{args.records} enregistrements synthétiques, {args.categories} catégories...")
+    dicts, dicts_bytes, dicts_peak, dicts_duration = measure(lambda: list(generate_books(args.records, args.categories)))
+    print(f"Liste de dicts : {dicts_bytes / 1e6:8.1f} Mo ({dicts_bytes / args.records:.0f} o/enregistrement, "
+          f"pic {dicts_peak / 1e6:.1f} Mo) en {dicts_duration:.2f}s")
+
+    def build_store():
+        store = RecordStore(BOOK_SCHEMA)
+        store.extend(generate_books(args.records, args.categories))
+        return store
+
+    store, store_bytes, store_peak, store_duration = measure(build_store)
+    print(f"RecordStore    : {store_bytes / 1e6:8.1f} Mo ({store_bytes / args.records:.0f} o/enregistrement, "
+          f"pic {store_peak / 1e6:.1f} Mo) en {store_duration:.2f}s")
+    print(f"Gain mémoire : x{dicts_bytes / store_bytes:.1f}")
+
+    import pandas as pd
+
+    df, df_bytes, _, df_duration = measure(store.to_dataframe)
+    print(f"to_dataframe() : {df_bytes / 1e6:.2f} Mo alloués en {df_duration * 1000:.1f} ms (buffers partagés)")
+
+    identical = df.astype(object).equals(pd.DataFrame(dicts).astype(object))
+    print(f"DataFrame identique à pd.DataFrame(dicts) : {identical}")
@@ -0,0 +1,157 @@
+"""Re-parse des pages archivées (WARC) avec les extracteurs des scrapers, sans réseau.
+
+    python reparse.py ../exo1/books.warc.gz --extractor exo1
+    python reparse.py ../exo8/archive.warc.gz --extractor exo8:books --workers 4
+    python reparse.py archive.warc.gz --extractor ../mon_script.py:extraire --match '/catalogue/'
+
+Un changement de schéma (nouveau champ dans get_book_details ou parse_page) se
+paie alors en temps CPU local : les pages sont réparties par lots entre les
+cœurs, chaque processus relisant ses enregistrements directement à leur offset.
+"""
+import argparse
+import logging
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from urllib.parse import urlsplit
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+from common.warc import ArchiveSession, load_index
+
+# Fiches livres de books.toscrape.com (hors pages de catégories)
+BOOK_DETAIL_PAGE = r'/catalogue/(?!category/)[^/]+/index\.html$'
+
+
+def _add_path(directory):
+    if directory not in sys.path:
+        sys.path.insert(0, directory)
+
+
+def load_extractor(spec):
+    """Extracteur `(session, url) -> item(s) ou None` et motif des URLs qu'il sait traiter.
+
+    'exo1', 'exo6' : get_book_details ; 'exo8:<source>' : parse_page de la source
+    dans exo8/config.yaml ; 'chemin/script.py:fonction' : fonction(session, url).
+    """
+    if spec == 'exo1':
+        _add_path(os.path.join(ROOT_DIR, 'exo1'))
+        import exo1
+        return (lambda session, url: exo1.get_book_details(url, session)), BOOK_DETAIL_PAGE
+
+    if spec == 'exo6':
+        _add_path(os.path.join(ROOT_DIR, 'exo6'))
+        import exo6
+        return exo6.get_book_details, BOOK_DETAIL_PAGE
+
+    if spec.startswith('exo8:'):
+        source = spec.partition(':')[2]
+        _add_path(os.path.join(ROOT_DIR, 'exo8'))
+        import exo8
+        config = exo8.load_config(os.path.join(ROOT_DIR, 'exo8', 'config.yaml'))
+        if not config or source not in config['scrapers']:
+            raise ValueError(f"Source '{source}' absente de exo8/config.yaml")
+        scraper_config = config['scrapers'][source]
+        scraper = exo8.resolve_scraper_class(source, scraper_config)(scraper_config['name'], scraper_config)
+
+        def extract(session, url):
+            scraper.session = session
+            return scraper._fetch_and_parse(url)
+
+        parts = urlsplit(scraper_config['url'])
+        return extract, f"^{re.escape(f'{parts.scheme}://{parts.netloc}')}/"
+
+    script, _, function = spec.rpartition(':')
+    if not script.endswith('.py'):
+        raise ValueError(f"Extracteur inconnu : '{spec}'. Utilisez exo1, exo6, exo8:<source> ou chemin/script.py:fonction")
+    _add_path(os.path.dirname(os.path.abspath(script)))
+    module = __import__(os.path.splitext(os.path.basename(script))[0])
+    return getattr(module, function), '.'
+
+
+_worker = {}
+
+def _init_worker(archive, offsets, extractor):
+    # Pas de logs d'initialisation des scrapers dans chaque processus
+    logging.getLogger().setLevel(logging.WARNING)
+    _worker['session'] = ArchiveSession(archive, offsets)
+    _worker['extract'], _ = load_extractor(extractor)
+
+def _reparse_batch(urls):
+    items, failed = [], 0
+    for url in urls:
+        try:
+            result = _worker['extract'](_worker['session'], url)
+        except (Exception, SystemExit) as e:
+            # exo6 lève SystemExit sur un 403 : seule cette URL compte comme échouée, pas tout le re-parse
+            logging.error(f"Erreur d'extraction sur {url}: {e}")
+            result = None
+        if result is None:
+            failed += 1
+        elif isinstance(result, list):
+            items.extend(result)
+        else:
+            items.append(result)
+    return items, failed
+
+
+def reparse_archive(archive, extractor, match, workers, batch_size, output):
+    entries = load_index(archive)
+    # Une URL archivée plusieurs fois : seule la réponse la plus récente est re-parsée
+    offsets = {entry['url']: entry['offset'] for entry in entries}
+    pattern = re.compile(match)
+    urls = [url for url in offsets if pattern.search(url)]
+    batches = [urls[i:i + batch_size] for i in range(0, len(urls), batch_size)]
+    print(f"[{archive}] {len(entries)} réponses archivées, {len(urls)} pages à re-parser ({len(batches)} lots).")
+
+    items_count, failed = 0, 0
+    if workers == 1:
+        _init_worker(archive, offsets, extractor)
+        results = map(_reparse_batch, batches)
+    else:
+        executor = ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(archive, offsets, extractor))
+        results = executor.map(_reparse_batch, batches)
+    for items, batch_failed in results:
+        for item in items:
+            output.write(json.dumps(item, ensure_ascii=False) + '\n')
+        items_count += len(items)
+        failed += batch_failed
+    if workers != 1:
+        executor.shutdown()
+    return len(urls), items_count, failed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Re-parse des réponses archivées (WARC) sans aucune requête réseau.")
+    parser.add_argument('archives', nargs='+', help="Archives .warc.gz (index .idx reconstruit si absent)")
+    parser.add_argument(
+        '-e', '--extractor',
+        required=True,
+        help="exo1, exo6, exo8:<source> (ex: exo8:books) ou chemin/script.py:fonction(session, url)"
+    )
+    parser.add_argument('--match', help="Regex des URLs à re-parser (défaut: selon l'extracteur)")
+    parser.add_argument('-w', '--workers', type=int, default=os.cpu_count(), help="Processus de parsing (défaut: nombre de cœurs)")
+    parser.add_argument('--batch-size', type=int, default=50, help="Pages par lot envoyé à un processus (défaut: 50)")
+    parser.add_argument('-o', '--output', help="Fichier JSONL de sortie (défaut: reparse_<extracteur>_<horodatage>.jsonl)")
+    args = parser.parse_args()
+
+    _, default_match = load_extractor(args.extractor)
+    output_path = args.output or f"reparse_{re.sub(r'[^A-Za-z0-9]+', '_', args.extractor)}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl"
+
+    start_time = time.time()
+    pages, items, failed = 0, 0, 0
+    with open(output_path, 'w', encoding='utf-8') as output:
+        for archive in args.archives:
+            archive_pages, archive_items, archive_failed = reparse_archive(
+                archive, args.extractor, args.match or default_match, max(1, args.workers), args.batch_size, output
+            )
+            pages, items, failed = pages + archive_pages, items + archive_items, failed + archive_failed
+    duration = time.time() - start_time
+
+    print(f"{pages} pages re-parsées en {duration:.2f} s ({pages / duration if duration else 0:.0f} pages/s), "
+          f"{items} items, {failed} échecs.")
+    print(f"Résultats sauvegardés dans {output_path}")
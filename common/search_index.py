@@ -0,0 +1,340 @@
+"""Index plein texte (SQLite FTS5) des descriptions de livres, citations et biographies.
+
+Les documents sont ajoutés au fil de l'eau (JSONL et graphml lus en flux, commit
+par lots) et mis à jour par clé : un document inchangé n'est pas réindexé. Le
+classement est BM25 (titre pondéré), les filtres prix / note / tag / auteur
+passent par des colonnes indexées ; rien n'est chargé en mémoire à la recherche.
+
+Sources reconnues : livres exo1/exo6 (JSON/JSONL), enregistrements unifiés exo8
+(JSON/JSONL), graphe exo2 (citations et auteurs, graphml).
+
+    python search_index.py index.sqlite index ../exo1/books_*.json ../exo2/quotes_graph.graphml
+    python search_index.py index.sqlite search '"light in the attic" OR poetry' --max-price 30
+    python search_index.py index.sqlite search 'love' --kind citation --tag love -n 5
+
+Syntaxe des requêtes (FTS5) : mots (tous requis), "phrase exacte", OR, NOT,
+préfixe*, NEAR(a b, 5). Les accents sont ignorés.
+"""
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import time
+import xml.etree.ElementTree as ET
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    doc_id INTEGER PRIMARY KEY,
+    key TEXT NOT NULL UNIQUE,
+    kind TEXT NOT NULL,
+    title TEXT,
+    url TEXT,
+    price REAL,
+    rating INTEGER,
+    author TEXT,
+    hash TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS documents_kind ON documents (kind);
+CREATE INDEX IF NOT EXISTS documents_price ON documents (price);
+CREATE INDEX IF NOT EXISTS documents_rating ON documents (rating);
+CREATE INDEX IF NOT EXISTS documents_author ON documents (author);
+CREATE TABLE IF NOT EXISTS tags (
+    tag TEXT NOT NULL,
+    doc_id INTEGER NOT NULL,
+    PRIMARY KEY (tag, doc_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS tags_doc ON tags (doc_id);
+CREATE VIRTUAL TABLE IF NOT EXISTS fts USING fts5(title, body, tokenize='unicode61 remove_diacritics 2');
+"""
+
+BATCH_SIZE = 5000
+# Poids BM25 des colonnes (titre, corps) : un mot du titre compte plus qu'un mot de la description
+TITLE_WEIGHT = 5.0
+BODY_WEIGHT = 1.0
+SNIPPET_TOKENS = 16
+
+GRAPHML_NS = '{http://graphml.graphdrawing.org/xmlns}'
+
+
+def _hash(*values):
+    return hashlib.sha1(json.dumps(values, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+
+def document_from_record(record):
+    """Document indexable d'un livre (exo1/exo6) ou d'un enregistrement unifié (exo8), sinon None."""
+    if 'url_detail' in record:
+        category = record.get('categorie_principale')
+        return {
+            "key": record['url_detail'],
+            "kind": "livre",
+            "title": record.get('titre'),
+            "body": record.get('description') or "",
+            "url": record['url_detail'],
+            "price": record.get('prix_gbp'),
+            "rating": record.get('note_sur_5'),
+            "author": None,
+            "tags": [category] if category else [],
+        }
+    if 'source' in record and 'content' in record:
+        metadata = record.get('metadata') or {}
+        key = record.get('url')
+        # Les citations exo8 pointent vers la page de l'auteur : plusieurs documents par URL
+        if metadata.get('author'):
+            key = f"{key}#{_hash(record['content'])[:16]}"
+        return {
+            "key": f"{record['source']}:{key}",
+            "kind": record['source'],
+            "title": record.get('title'),
+            "body": record.get('content') or "",
+            "url": record.get('url'),
+            "price": metadata.get('price_gbp'),
+            "rating": None,
+            "author": metadata.get('author'),
+            "tags": metadata.get('tags') or [],
+        }
+    return None
+
+
+class SearchIndex:
+
+    def __init__(self, path, batch_size=BATCH_SIZE):
+        self.path = path
+        self.batch_size = batch_size
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self.pending = 0
+        self.counts = {"ajoutés": 0, "modifiés": 0, "inchangés": 0}
+
+    def add(self, document):
+        """Ajoute ou met à jour un document ; renvoie son doc_id (commit tous les `batch_size` documents)."""
+        document_hash = _hash(document['title'], document['body'], document['price'], document['rating'],
+                              document['author'], sorted(document['tags']))
+        row = self.conn.execute("SELECT doc_id, hash FROM documents WHERE key = ?", (document['key'],)).fetchone()
+        if row and row[1] == document_hash:
+            self.counts["inchangés"] += 1
+            return row[0]
+
+        values = (document['kind'], document['title'], document['url'], document['price'],
+                  document['rating'], document['author'], document_hash)
+        if row:
+            doc_id = row[0]
+            self.conn.execute(
+                "UPDATE documents SET kind = ?, title = ?, url = ?, price = ?, rating = ?, author = ?, hash = ? "
+                "WHERE doc_id = ?", values + (doc_id,)
+            )
+            self.conn.execute("DELETE FROM fts WHERE rowid = ?", (doc_id,))
+            self.conn.execute("DELETE FROM tags WHERE doc_id = ?", (doc_id,))
+            self.counts["modifiés"] += 1
+        else:
+            doc_id = self.conn.execute(
+                "INSERT INTO documents (key, kind, title, url, price, rating, author, hash) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (document['key'],) + values
+            ).lastrowid
+            self.counts["ajoutés"] += 1
+        self.conn.execute("INSERT INTO fts (rowid, title, body) VALUES (?, ?, ?)", (doc_id, document['title'] or "", document['body']))
+        self.add_tags(doc_id, document['tags'])
+
+        self.pending += 1
+        if self.pending >= self.batch_size:
+            self.commit()
+        return doc_id
+
+    def add_tags(self, doc_id, tags):
+        self.conn.executemany("INSERT OR IGNORE INTO tags VALUES (?, ?)", [(tag, doc_id) for tag in tags])
+
+    def add_records(self, records):
+        for record in records:
+            document = document_from_record(record)
+            if document:
+                self.add(document)
+        self.commit()
+
+    def add_graphml(self, path):
+        """Citations (tags et auteur via les arêtes) et auteurs (biographie) d'un graphe exo2, lu en flux."""
+        keys = {}
+        doc_ids = {}
+        for _, element in ET.iterparse(path):
+            tag = element.tag.replace(GRAPHML_NS, '')
+            if tag == 'key':
+                keys[element.get('id')] = element.get('attr.name')
+            elif tag == 'node':
+                data = {keys.get(d.get('key')): d.text for d in element.iter(f'{GRAPHML_NS}data')}
+                if data.get('type') == 'Citation':
+                    text = data.get('text') or ""
+                    doc_ids[element.get('id')] = self.add({
+                        "key": f"citation:{_hash(text)[:16]}", "kind": "citation", "title": None, "body": text,
+                        "url": None, "price": None, "rating": None, "author": None, "tags": [],
+                    })
+                elif data.get('type') == 'Auteur':
+                    name = element.get('id')
+                    doc_ids[name] = self.add({
+                        "key": f"auteur:{name}", "kind": "auteur", "title": name, "body": data.get('bio') or "",
+                        "url": None, "price": None, "rating": None, "author": name, "tags": [],
+                    })
+                element.clear()
+            elif tag == 'edge':
+                relation = {keys.get(d.get('key')): d.text for d in element.iter(f'{GRAPHML_NS}data')}.get('relation')
+                doc_id = doc_ids.get(element.get('source'))
+                if doc_id is not None and relation == 'A_POUR_TAG':
+                    self.add_tags(doc_id, [element.get('target')])
+                elif doc_id is not None and relation == 'CITÉ_PAR':
+                    self.conn.execute("UPDATE documents SET author = ? WHERE doc_id = ?", (element.get('target'), doc_id))
+                element.clear()
+        self.commit()
+
+    def add_file(self, path):
+        if path.endswith('.graphml'):
+            self.add_graphml(path)
+        elif path.endswith('.jsonl'):
+            with open(path, 'r', encoding='utf-8') as f:
+                self.add_records(json.loads(line) for line in f if line.strip())
+        else:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.add_records(data if isinstance(data, list) else [data])
+
+    def commit(self):
+        self.conn.commit()
+        self.pending = 0
+
+    def search(self, query=None, kind=None, min_price=None, max_price=None, min_rating=None,
+               tags=(), author=None, limit=10):
+        """Documents correspondant à `query` (syntaxe FTS5) et aux filtres, les plus pertinents (BM25) d'abord."""
+        conditions, params = [], []
+        if kind:
+            conditions.append("d.kind = ?")
+            params.append(kind)
+        if min_price is not None:
+            conditions.append("d.price >= ?")
+            params.append(min_price)
+        if max_price is not None:
+            conditions.append("d.price <= ?")
+            params.append(max_price)
+        if min_rating is not None:
+            conditions.append("d.rating >= ?")
+            params.append(min_rating)
+        if author:
+            conditions.append("d.author = ?")
+            params.append(author)
+        for tag in tags:
+            conditions.append("d.doc_id IN (SELECT doc_id FROM tags WHERE tag = ?)")
+            params.append(tag)
+
+        columns = "d.doc_id, d.kind, d.title, d.url, d.price, d.rating, d.author"
+        if query:
+            sql = (
+                f"SELECT {columns}, bm25(fts, {TITLE_WEIGHT}, {BODY_WEIGHT}) AS score, "
+                f"snippet(fts, 1, '[', ']', '…', {SNIPPET_TOKENS}) "
+                "FROM fts JOIN documents d ON d.doc_id = fts.rowid WHERE fts MATCH ?"
+            )
+            params.insert(0, query)
+            order = "score"
+        else:
+            sql = f"SELECT {columns}, NULL, NULL FROM documents d WHERE 1"
+            order = "d.doc_id"
+        sql += "".join(f" AND {condition}" for condition in conditions) + f" ORDER BY {order} LIMIT ?"
+
+        try:
+            rows = self.conn.execute(sql, params + [limit]).fetchall()
+        except sqlite3.OperationalError as e:
+            raise ValueError(f"Requête invalide '{query}' : {e}") from e
+        fields = ('doc_id', 'kind', 'title', 'url', 'price', 'rating', 'author', 'score', 'snippet')
+        return [dict(zip(fields, row)) for row in rows]
+
+    def stats(self):
+        by_kind = dict(self.conn.execute("SELECT kind, COUNT(*) FROM documents GROUP BY kind ORDER BY kind"))
+        tags = self.conn.execute("SELECT COUNT(DISTINCT tag) FROM tags").fetchone()[0]
+        return {"documents": sum(by_kind.values()), "par_type": by_kind, "tags": tags}
+
+    def optimize(self):
+        """Fusionne les segments FTS5 (après de gros imports)."""
+        self.conn.execute("INSERT INTO fts (fts) VALUES ('optimize')")
+        self.conn.commit()
+
+    def close(self):
+        self.commit()
+        self.conn.close()
+
+
+def print_results(results):
+    for result in results:
+        details = [result['kind']]
+        if result['price'] is not None:
+            details.append(f"£{result['price']:.2f}")
+        if result['rating'] is not None:
+            details.append(f"{result['rating']}/5")
+        if result['author']:
+            details.append(result['author'])
+        score = f"{-result['score']:6.2f}  " if result['score'] is not None else ""
+        label = f"{result['title']} ({', '.join(details)})" if result['title'] else f"({', '.join(details)})"
+        print(f"{score}{label}")
+        if result['snippet']:
+            print(f"        {result['snippet']}")
+        if result['url']:
+            print(f"        {result['url']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Index plein texte (BM25) des livres, citations et auteurs scrapés.")
+    parser.add_argument('database', help="Fichier SQLite de l'index (créé si besoin)")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    index_parser = commands.add_parser('index', help="Ajoute / met à jour des fichiers JSON, JSONL ou graphml")
+    index_parser.add_argument('files', nargs='+')
+    index_parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help=f"Documents par transaction (défaut: {BATCH_SIZE})")
+    index_parser.add_argument('--optimize', action='store_true', help="Fusionne les segments de l'index après l'import")
+
+    search_parser = commands.add_parser('search', help="Recherche (syntaxe FTS5 : mots, \"phrase\", OR, NOT, préfixe*)")
+    search_parser.add_argument('query', nargs='?', help="Requête (absente : filtres seuls)")
+    search_parser.add_argument('--kind', help="Type de document (livre, citation, auteur, ou source exo8)")
+    search_parser.add_argument('--min-price', type=float)
+    search_parser.add_argument('--max-price', type=float)
+    search_parser.add_argument('--min-rating', type=int)
+    search_parser.add_argument('--tag', action='append', default=[], help="Tag ou catégorie requis (répétable)")
+    search_parser.add_argument('--author')
+    search_parser.add_argument('-n', '--limit', type=int, default=10)
+    search_parser.add_argument('--json', action='store_true', help="Résultats en JSON")
+
+    commands.add_parser('stats', help="Nombre de documents par type")
+    args = parser.parse_args()
+
+    index = SearchIndex(args.database, getattr(args, 'batch_size', BATCH_SIZE))
+    try:
+        if args.command == 'index':
+            for path in args.files:
+                if not os.path.exists(path):
+                    print(f"Fichier introuvable : {path}")
+                    continue
+                start = time.perf_counter()
+                try:
+                    index.add_file(path)
+                except (ET.ParseError, json.JSONDecodeError) as e:
+                    index.commit()
+                    print(f"Fichier illisible ou vide : {path} ({e})")
+                    continue
+                print(f"{path} indexé en {time.perf_counter() - start:.2f}s")
+            if args.optimize:
+                index.optimize()
+            print(", ".join(f"{count} {label}" for label, count in index.counts.items()))
+        elif args.command == 'search':
+            start = time.perf_counter()
+            try:
+                results = index.search(args.query, args.kind, args.min_price, args.max_price, args.min_rating,
+                                       args.tag, args.author, args.limit)
+            except ValueError as e:
+                sys.exit(str(e))
+            duration_ms = (time.perf_counter() - start) * 1000
+            if args.json:
+                json.dump(results, sys.stdout, indent=4, ensure_ascii=False)
+                print()
+            else:
+                print_results(results)
+                print(f"{len(results)} résultats en {duration_ms:.1f} ms")
+        else:
+            print(json.dumps(index.stats(), indent=4, ensure_ascii=False))
+    finally:
+        index.close()
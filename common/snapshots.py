@@ -0,0 +1,246 @@
+"""Historique des crawls : état courant, journal des changements et snapshots de base (SQLite).
+
+Chaque run n'enregistre que ses différences avec le run précédent (insert, update
+avec les seuls champs modifiés, delete), repérées par un hash du contenu de chaque
+enregistrement. Un snapshot complet (compressé) est gardé tous les `base_every`
+runs : n'importe quel run se reconstruit depuis la base précédente et ses deltas.
+
+    python snapshots.py ../exo1/snapshots.sqlite runs
+    python snapshots.py ../exo1/snapshots.sqlite changes 12
+    python snapshots.py ../exo1/snapshots.sqlite rebuild 12 -o books_run12.json
+"""
+import argparse
+import hashlib
+import json
+import sqlite3
+import sys
+import zlib
+from datetime import datetime
+
+BASE_EVERY = 20
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created TEXT NOT NULL,
+    complete INTEGER NOT NULL,
+    total INTEGER NOT NULL DEFAULT 0,
+    inserted INTEGER NOT NULL DEFAULT 0,
+    updated INTEGER NOT NULL DEFAULT 0,
+    deleted INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS current (key TEXT PRIMARY KEY, hash TEXT NOT NULL, record TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS changes (
+    run_id INTEGER NOT NULL,
+    key TEXT NOT NULL,
+    op TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS changes_run ON changes (run_id);
+CREATE TABLE IF NOT EXISTS bases (run_id INTEGER PRIMARY KEY, data BLOB NOT NULL);
+"""
+
+
+def content_hash(record):
+    return hashlib.sha1(json.dumps(record, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+
+def diff_fields(old, new):
+    """{champ: [ancienne, nouvelle]} des champs modifiés ou ajoutés, et {champ: ancienne} des champs disparus."""
+    changed = {field: [old.get(field), value] for field, value in new.items() if field not in old or old[field] != value}
+    removed = {field: value for field, value in old.items() if field not in new}
+    return changed, removed
+
+
+def apply_change(state, change):
+    if change['op'] == 'insert':
+        state[change['key']] = change['record']
+    elif change['op'] == 'update':
+        record = state[change['key']]
+        record.update({field: values[1] for field, values in change['changes'].items()})
+        for field in change.get('removed', {}):
+            record.pop(field, None)
+    elif change['op'] == 'delete':
+        state.pop(change['key'], None)
+
+
+class SnapshotStore:
+
+    def __init__(self, path, key_field=None, base_every=BASE_EVERY):
+        self.path = path
+        self.base_every = base_every
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(SCHEMA)
+        stored = self.conn.execute("SELECT value FROM meta WHERE name = 'key_field'").fetchone()
+        if stored is None:
+            if key_field is None:
+                raise ValueError(f"{path} : base de snapshots vide, champ clé (key_field) requis.")
+            with self.conn:
+                self.conn.execute("INSERT INTO meta VALUES ('key_field', ?)", (key_field,))
+            self.key_field = key_field
+        else:
+            if key_field is not None and key_field != stored[0]:
+                raise ValueError(f"{path} : snapshots indexés par '{stored[0]}', pas par '{key_field}'.")
+            self.key_field = stored[0]
+
+    def commit(self, records, complete=True, unreachable=()):
+        """Enregistre un run ; renvoie (run_id, changements).
+
+        `complete=False` (run interrompu, pagination incomplète) : aucune suppression n'est
+        déduite des absences. Les clés de `unreachable` (échec de téléchargement ce run)
+        gardent leur dernier état connu.
+        """
+        current = dict(self.conn.execute("SELECT key, hash FROM current"))
+        changes = []
+        seen = set(unreachable)
+        rows = []
+        for record in records:
+            key = record[self.key_field]
+            if key in seen:
+                continue
+            seen.add(key)
+            record_hash = content_hash(record)
+            previous_hash = current.get(key)
+            if previous_hash == record_hash:
+                continue
+            if previous_hash is None:
+                changes.append({"op": "insert", "key": key, "record": record})
+            else:
+                old_record = json.loads(self.conn.execute("SELECT record FROM current WHERE key = ?", (key,)).fetchone()[0])
+                changed, removed = diff_fields(old_record, record)
+                change = {"op": "update", "key": key, "changes": changed}
+                if removed:
+                    change["removed"] = removed
+                changes.append(change)
+            rows.append((key, record_hash, json.dumps(record, ensure_ascii=False)))
+
+        if complete:
+            for key in sorted(current.keys() - seen):
+                old_record = json.loads(self.conn.execute("SELECT record FROM current WHERE key = ?", (key,)).fetchone()[0])
+                changes.append({"op": "delete", "key": key, "record": old_record})
+
+        counts = {op: sum(1 for change in changes if change['op'] == op) for op in ('insert', 'update', 'delete')}
+        with self.conn:
+            run_id = self.conn.execute(
+                "INSERT INTO runs (created, complete, inserted, updated, deleted) VALUES (?, ?, ?, ?, ?)",
+                (datetime.now().isoformat(timespec='seconds'), int(complete), counts['insert'], counts['update'], counts['delete'])
+            ).lastrowid
+            self.conn.executemany("INSERT OR REPLACE INTO current VALUES (?, ?, ?)", rows)
+            self.conn.executemany(
+                "DELETE FROM current WHERE key = ?",
+                [(change['key'],) for change in changes if change['op'] == 'delete']
+            )
+            self.conn.executemany(
+                "INSERT INTO changes VALUES (?, ?, ?, ?)",
+                [(run_id, change['key'], change['op'], json.dumps(change, ensure_ascii=False)) for change in changes]
+            )
+            total = self.conn.execute("SELECT COUNT(*) FROM current").fetchone()[0]
+            self.conn.execute("UPDATE runs SET total = ? WHERE run_id = ?", (total, run_id))
+            last_base = self.conn.execute("SELECT MAX(run_id) FROM bases").fetchone()[0]
+            if last_base is None or run_id - last_base >= self.base_every:
+                self._write_base(run_id)
+        return run_id, changes
+
+    def _write_base(self, run_id):
+        state = {key: json.loads(record) for key, record in self.conn.execute("SELECT key, record FROM current")}
+        self.conn.execute(
+            "INSERT OR REPLACE INTO bases VALUES (?, ?)",
+            (run_id, zlib.compress(json.dumps(state, ensure_ascii=False).encode('utf-8')))
+        )
+
+    def runs(self):
+        columns = ('run_id', 'created', 'complete', 'total', 'inserted', 'updated', 'deleted')
+        return [dict(zip(columns, row)) for row in self.conn.execute(f"SELECT {', '.join(columns)} FROM runs ORDER BY run_id")]
+
+    def changelog(self, run_id):
+        return [json.loads(data) for (data,) in self.conn.execute("SELECT data FROM changes WHERE run_id = ? ORDER BY rowid", (run_id,))]
+
+    def snapshot(self, run_id=None):
+        """Enregistrements tels qu'après le run `run_id` (défaut : dernier run), triés par clé."""
+        if run_id is None:
+            return [json.loads(record) for (record,) in self.conn.execute("SELECT record FROM current ORDER BY key")]
+
+        base = self.conn.execute("SELECT run_id, data FROM bases WHERE run_id <= ? ORDER BY run_id DESC LIMIT 1", (run_id,)).fetchone()
+        if base is None:
+            raise ValueError(f"Run {run_id} inconnu dans {self.path}")
+        base_run, data = base
+        state = json.loads(zlib.decompress(data))
+        for (change_data,) in self.conn.execute(
+            "SELECT data FROM changes WHERE run_id > ? AND run_id <= ? ORDER BY run_id, rowid", (base_run, run_id)
+        ):
+            apply_change(state, json.loads(change_data))
+        return [state[key] for key in sorted(state)]
+
+    def close(self):
+        self.conn.close()
+
+
+def write_changelog(changes, path):
+    with open(path, 'w', encoding='utf-8') as f:
+        for change in changes:
+            f.write(json.dumps(change, ensure_ascii=False) + '\n')
+
+
+def save_run(path, key_field, records, changelog_path, complete=True, unreachable=()):
+    """Enregistre un run dans la base `path` et écrit ses changements dans `changelog_path` (s'il y en a)."""
+    store = SnapshotStore(path, key_field)
+    try:
+        run_id, changes = store.commit(records, complete, unreachable)
+    finally:
+        store.close()
+    counts = {op: sum(1 for change in changes if change['op'] == op) for op in ('insert', 'update', 'delete')}
+    print(f"Run {run_id} : {counts['insert']} ajouts, {counts['update']} modifications, {counts['delete']} suppressions.")
+    if changes:
+        write_changelog(changes, changelog_path)
+        print(f"Changements sauvegardés dans : {changelog_path}")
+    return run_id, changes
+
+
+def print_changes(changes, limit=None):
+    for change in changes[:limit]:
+        if change['op'] == 'update':
+            details = [f"{field}: {old!r} -> {new!r}" for field, (old, new) in change['changes'].items()]
+            details += [f"{field} supprimé" for field in change.get('removed', {})]
+            print(f"  ~ {change['key']} ({', '.join(details)})")
+        else:
+            print(f"  {'+' if change['op'] == 'insert' else '-'} {change['key']}")
+    if limit is not None and len(changes) > limit:
+        print(f"  ... et {len(changes) - limit} autres changements")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Historique des snapshots : runs, changements, reconstruction.")
+    parser.add_argument('database', help="Base de snapshots (ex: ../exo1/snapshots.sqlite)")
+    parser.add_argument('command', choices=['runs', 'changes', 'rebuild'])
+    parser.add_argument('run_id', nargs='?', type=int, help="changes/rebuild : numéro du run (défaut: dernier)")
+    parser.add_argument('-o', '--output', help="rebuild : fichier JSON (défaut: sortie standard) ; changes : fichier JSONL")
+    args = parser.parse_args()
+
+    store = SnapshotStore(args.database)
+    runs = store.runs()
+    if args.command == 'runs':
+        for run in runs:
+            print(f"run {run['run_id']:>4}  {run['created']}  {'complet' if run['complete'] else 'partiel':8}"
+                  f"  {run['total']:>6} enregistrements  +{run['inserted']} ~{run['updated']} -{run['deleted']}")
+        sys.exit(0)
+
+    if not runs:
+        sys.exit(f"Aucun run dans {args.database}")
+    run_id = args.run_id or runs[-1]['run_id']
+    if args.command == 'changes':
+        changes = store.changelog(run_id)
+        if args.output:
+            write_changelog(changes, args.output)
+            print(f"{len(changes)} changements du run {run_id} sauvegardés dans {args.output}")
+        else:
+            print(f"Run {run_id} : {len(changes)} changements")
+            print_changes(changes)
+    else:
+        records = store.snapshot(run_id)
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                json.dump(records, f, indent=4, ensure_ascii=False)
+            print(f"Snapshot du run {run_id} ({len(records)} enregistrements) sauvegardé dans {args.output}")
+        else:
+            json.dump(records, sys.stdout, indent=4, ensure_ascii=False)
@@ -0,0 +1,276 @@
+"""Transport HTTP partagé : pool de connexions keep-alive, timeouts par défaut, cache DNS, mesures.
+
+Un `requests.get` isolé ouvre une nouvelle connexion TCP+TLS à chaque appel et
+attend indéfiniment un serveur muet. Une session issue de `create_session()` :
+
+- réutilise ses connexions (pool dimensionné à la concurrence, `pool_maxsize`) ;
+- applique DEFAULT_TIMEOUT (connexion, lecture) aux requêtes sans timeout explicite ;
+- annonce gzip/deflate, et br / zstd si brotli / zstandard sont installés
+  (décompression par urllib3) ;
+- résout chaque hôte une fois par DNS_TTL secondes ;
+- passe en HTTP/2 (multiplexage) avec `http2=True` si httpx[http2] est installé ;
+- compte requêtes, connexions ouvertes et latences (`session.transport_stats`).
+
+    python transport.py https://books.toscrape.com/ https://books.toscrape.com/catalogue/page-2.html -n 5
+"""
+import argparse
+import io
+import logging
+import socket
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+# (connexion, lecture) en secondes
+DEFAULT_TIMEOUT = (5, 30)
+DEFAULT_POOL_SIZE = 10
+DNS_TTL = 300
+
+_dns_cache = {}
+_dns_lock = threading.Lock()
+_original_getaddrinfo = None
+_dns_ttl = DNS_TTL
+
+_shared_session = None
+_shared_lock = threading.Lock()
+
+
+class TransportStats:
+    """Requêtes, latences et connexions ouvertes (compteurs des pools urllib3) d'une session."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies_ms = []
+        self.by_host = {}
+        self.compressed = 0
+        self.http2 = 0
+        self.pools = {}
+
+    def record(self, response, latency_ms, pool=None):
+        host = urlsplit(response.url or '').netloc
+        with self.lock:
+            self.latencies_ms.append(latency_ms)
+            self.by_host[host] = self.by_host.get(host, 0) + 1
+            self.compressed += bool(response.headers.get('Content-Encoding'))
+            self.http2 += getattr(response, 'http_version', None) == 'HTTP/2'
+            if pool is not None:
+                self.pools[id(pool)] = pool
+
+    def summary(self):
+        with self.lock:
+            latencies = sorted(self.latencies_ms)
+            pools = list(self.pools.values())
+            summary = {"requests": len(latencies), "compressed": self.compressed, "hosts": dict(self.by_host)}
+            http2 = self.http2
+        if latencies:
+            summary["p50_ms"] = round(latencies[len(latencies) // 2], 2)
+            summary["p95_ms"] = round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 2)
+        if pools:
+            # num_requests compte aussi les tentatives (retries) envoyées sur le pool
+            pooled_requests = sum(pool.num_requests for pool in pools)
+            new_connections = sum(pool.num_connections for pool in pools)
+            summary["new_connections"] = new_connections
+            summary["reuse_rate"] = round(1 - new_connections / pooled_requests, 3) if pooled_requests else 0.0
+        if http2:
+            summary["http2"] = http2
+        return summary
+
+
+def format_stats(stats):
+    summary = stats.summary()
+    text = f"{summary['requests']} requêtes"
+    if 'new_connections' in summary:
+        text += f", {summary['new_connections']} connexions ouvertes (réutilisation {summary['reuse_rate']:.0%})"
+    if 'p50_ms' in summary:
+        text += f", latence p50 {summary['p50_ms']} ms / p95 {summary['p95_ms']} ms"
+    if summary['compressed']:
+        text += f", {summary['compressed']} réponses compressées"
+    if summary.get('http2'):
+        text += f", {summary['http2']} en HTTP/2"
+    return text
+
+
+class TransportAdapter(HTTPAdapter):
+    """HTTPAdapter avec timeout par défaut et mesures dans `stats`."""
+
+    def __init__(self, timeout=DEFAULT_TIMEOUT, stats=None, **kwargs):
+        self.timeout = timeout
+        self.stats = stats
+        super().__init__(**kwargs)
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        start = time.perf_counter()
+        response = super().send(request, stream=stream, timeout=timeout or self.timeout,
+                                verify=verify, cert=cert, proxies=proxies)
+        # Jusqu'aux en-têtes (response.elapsed n'est renseigné par la session qu'au retour)
+        latency_ms = (time.perf_counter() - start) * 1000
+        if self.stats is not None:
+            self.stats.record(response, latency_ms, getattr(response.raw, '_pool', None))
+        return response
+
+
+class HTTP2Adapter(BaseAdapter):
+    """Adaptateur requests adossé à httpx (HTTP/2 multiplexé sur une connexion par hôte).
+
+    Les cookies reçus ne sont pas reportés dans la session : les sites à login (exo9)
+    restent en HTTP/1.1.
+    """
+
+    def __init__(self, timeout=DEFAULT_TIMEOUT, pool_maxsize=DEFAULT_POOL_SIZE, stats=None):
+        import httpx
+
+        super().__init__()
+        self.httpx = httpx
+        self.timeout = timeout
+        self.stats = stats
+        self.client = httpx.Client(
+            http2=True,
+            follow_redirects=False,
+            limits=httpx.Limits(max_connections=pool_maxsize, max_keepalive_connections=pool_maxsize)
+        )
+
+    def _httpx_timeout(self, timeout):
+        timeout = timeout or self.timeout
+        if isinstance(timeout, tuple):
+            connect, read = timeout
+            return self.httpx.Timeout(read, connect=connect)
+        return self.httpx.Timeout(timeout)
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        try:
+            reply = self.client.request(
+                request.method, request.url, headers=dict(request.headers), content=request.body,
+                timeout=self._httpx_timeout(timeout)
+            )
+        except self.httpx.ConnectTimeout as e:
+            raise requests.exceptions.ConnectTimeout(e, request=request)
+        except self.httpx.TimeoutException as e:
+            raise requests.exceptions.ReadTimeout(e, request=request)
+        except self.httpx.TransportError as e:
+            raise requests.exceptions.ConnectionError(e, request=request)
+
+        response = requests.Response()
+        response.status_code = reply.status_code
+        response.reason = reply.reason_phrase
+        # Corps déjà décompressé par httpx
+        response.headers = CaseInsensitiveDict(
+            (name, value) for name, value in reply.headers.items() if name.lower() != 'content-encoding'
+        )
+        response.encoding = get_encoding_from_headers(response.headers)
+        # Corps déjà lu en entier : iter_content() le découpe, close() n'a rien à libérer
+        response._content = reply.content
+        response._content_consumed = True
+        response.raw = io.BytesIO(reply.content)
+        response.url = request.url
+        response.request = request
+        response.elapsed = reply.elapsed
+        response.connection = self
+        response.http_version = reply.http_version
+        if self.stats is not None:
+            self.stats.record(response, reply.elapsed.total_seconds() * 1000)
+            if reply.headers.get('Content-Encoding'):
+                with self.stats.lock:
+                    self.stats.compressed += 1
+        return response
+
+    def close(self):
+        self.client.close()
+
+
+def _cached_getaddrinfo(host, port, family=0, type=0, proto=0, flags=0):
+    key = (host, port, family, type, proto, flags)
+    now = time.monotonic()
+    with _dns_lock:
+        entry = _dns_cache.get(key)
+    if entry and entry[0] > now:
+        return entry[1]
+    addresses = _original_getaddrinfo(host, port, family, type, proto, flags)
+    with _dns_lock:
+        _dns_cache[key] = (now + _dns_ttl, addresses)
+    return addresses
+
+
+def install_dns_cache(ttl=DNS_TTL):
+    """Met en cache les résolutions DNS du processus (socket.getaddrinfo) pendant `ttl` secondes."""
+    global _original_getaddrinfo, _dns_ttl
+    _dns_ttl = ttl
+    if _original_getaddrinfo is None:
+        _original_getaddrinfo = socket.getaddrinfo
+        socket.getaddrinfo = _cached_getaddrinfo
+
+
+def configure_session(session, concurrency=DEFAULT_POOL_SIZE, timeout=DEFAULT_TIMEOUT, http2=False,
+                      max_retries=0, headers=None, dns_cache=True, stats=None):
+    """Monte le transport partagé sur une session existante (requests.Session, CachedSession...)."""
+    stats = stats or getattr(session, 'transport_stats', None) or TransportStats()
+    pool_size = max(DEFAULT_POOL_SIZE, concurrency)
+    adapter = None
+    if http2:
+        try:
+            adapter = HTTP2Adapter(timeout, pool_size, stats)
+            if max_retries:
+                logging.warning("HTTP/2 : les retries urllib3 (max_retries) ne s'appliquent qu'aux URLs http://.")
+        except ImportError:
+            logging.warning("httpx[http2] non installé : transport HTTP/1.1 (pool keep-alive).")
+    if adapter is not None:
+        session.mount("https://", adapter)
+        session.mount("http://", TransportAdapter(timeout, stats, pool_maxsize=pool_size, max_retries=max_retries))
+    else:
+        adapter = TransportAdapter(timeout, stats, pool_maxsize=pool_size, max_retries=max_retries)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+    if headers:
+        session.headers.update(headers)
+    if dns_cache:
+        install_dns_cache()
+    session.transport_stats = stats
+    return session
+
+
+def create_session(**kwargs):
+    """Nouvelle session sur le transport partagé (arguments : voir configure_session)."""
+    # requests.Session lu à l'appel : remplacé par CachedSession après requests_cache.install_cache
+    return configure_session(requests.Session(), **kwargs)
+
+
+def get_session(**kwargs):
+    """Session commune du processus, pour les scripts qui appelaient `requests.get`.
+
+    Les options (voir configure_session, ex: http2=True) ne s'appliquent qu'au premier appel,
+    qui crée la session.
+    """
+    global _shared_session
+    with _shared_lock:
+        if _shared_session is None:
+            _shared_session = create_session(**kwargs)
+        return _shared_session
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mesure du transport partagé : réutilisation des connexions et latences.")
+    parser.add_argument('urls', nargs='+')
+    parser.add_argument('-n', '--repeat', type=int, default=3, help="Passages sur la liste d'URLs (défaut: 3)")
+    parser.add_argument('--http2', action='store_true', help="HTTP/2 via httpx (si installé)")
+    parser.add_argument('--no-pool', action='store_true', help="Comparaison : un requests.get par requête, sans pool")
+    args = parser.parse_args()
+
+    session = create_session(http2=args.http2)
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        for url in args.urls:
+            try:
+                if args.no_pool:
+                    # Nouvelle session (donc nouvelle connexion) à chaque requête, mesurée par les mêmes stats
+                    with create_session(stats=session.transport_stats, dns_cache=False) as one_shot:
+                        one_shot.get(url)
+                else:
+                    session.get(url)
+            except requests.exceptions.RequestException as e:
+                print(f"Erreur sur {url} : {e}")
+    duration = time.perf_counter() - start
+    print(f"{format_stats(session.transport_stats)} ; total {duration:.2f}s")
@@ -0,0 +1,245 @@
+"""Archive WARC (compressée) des réponses HTTP brutes, pour re-parser sans re-crawler.
+
+Chaque enregistrement est un membre gzip indépendant : l'archive se lit comme un
+seul flux gzip, et un enregistrement se relit directement à son offset. Un index
+(`<archive>.idx`, une ligne JSON par réponse) est tenu à jour pendant l'écriture ;
+il est reconstruit par un parcours complet de l'archive s'il manque ou est en retard.
+
+Le corps archivé est celui reçu par requests, donc déjà décompressé : les en-têtes
+Content-Encoding/Transfer-Encoding sont retirés et Content-Length recalculé.
+"""
+import base64
+import hashlib
+import json
+import logging
+import os
+import threading
+import uuid
+import zlib
+from collections import namedtuple
+from datetime import datetime, timezone
+
+WarcRecord = namedtuple('WarcRecord', ['type', 'url', 'date', 'status', 'reason', 'headers', 'body'])
+
+# En-têtes qui décrivent le transport et non le corps archivé
+SKIPPED_HEADERS = {'content-encoding', 'transfer-encoding', 'content-length'}
+READ_CHUNK_SIZE = 64 * 1024
+
+
+def index_path(archive_path):
+    return f"{archive_path}.idx"
+
+
+def _warc_date():
+    return datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def _warc_record(warc_type, block, headers):
+    lines = [
+        'WARC/1.0',
+        f'WARC-Type: {warc_type}',
+        f'WARC-Record-ID: <urn:uuid:{uuid.uuid4()}>',
+        f'WARC-Date: {_warc_date()}',
+    ] + [f'{name}: {value}' for name, value in headers] + [f'Content-Length: {len(block)}']
+    return ('\r\n'.join(lines) + '\r\n\r\n').encode('utf-8') + block + b'\r\n\r\n'
+
+
+def _http_block(response):
+    raw_headers = response.raw.headers.items() if getattr(response.raw, 'headers', None) is not None else response.headers.items()
+    body = response.content or b''
+    lines = [f"HTTP/1.1 {response.status_code} {response.reason or ''}".rstrip()]
+    lines += [f"{name}: {value}" for name, value in raw_headers if name.lower() not in SKIPPED_HEADERS]
+    lines.append(f"Content-Length: {len(body)}")
+    return ('\r\n'.join(lines) + '\r\n\r\n').encode('iso-8859-1', errors='replace') + body, body
+
+
+class WarcWriter:
+    """Ajoute les réponses à une archive .warc.gz ; utilisable depuis plusieurs threads.
+
+    Une archive par processus : les workers distribués écrivent chacun la leur.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.records = 0
+        self._lock = threading.Lock()
+        is_new = not os.path.exists(path) or os.path.getsize(path) == 0
+        self._file = open(path, 'ab')
+        self._index = open(index_path(path), 'a', encoding='utf-8')
+        if is_new:
+            info = "software: web-scrapping\r\nformat: WARC File Format 1.0\r\n".encode('utf-8')
+            self._append(_warc_record('warcinfo', info, [('Content-Type', 'application/warc-fields')]), None)
+
+    def _append(self, record, entry):
+        member = zlib.compressobj(6, zlib.DEFLATED, 31)
+        data = member.compress(record) + member.flush()
+        with self._lock:
+            offset = self._file.tell()
+            self._file.write(data)
+            self._file.flush()
+            if entry is not None:
+                entry.update(offset=offset, length=len(data))
+                self._index.write(json.dumps(entry) + '\n')
+                self._index.flush()
+                self.records += 1
+
+    def write_response(self, response):
+        block, body = _http_block(response)
+        digest = base64.b32encode(hashlib.sha1(body).digest()).decode('ascii')
+        self._append(
+            _warc_record('response', block, [
+                ('WARC-Target-URI', response.url),
+                ('WARC-Payload-Digest', f'sha1:{digest}'),
+                ('Content-Type', 'application/http;msgtype=response'),
+            ]),
+            {"url": response.url, "status": response.status_code, "date": _warc_date()}
+        )
+
+    def hook(self, response, *args, **kwargs):
+        # Réponses servies par le cache HTTP : déjà archivées lors du téléchargement.
+        # Réponses en streaming : lire le corps ici le consommerait avant l'appelant.
+        if getattr(response, 'from_cache', False) or kwargs.get('stream'):
+            return response
+        try:
+            self.write_response(response)
+        except OSError as e:
+            logging.error(f"Impossible d'archiver {response.url} dans {self.path}: {e}")
+        return response
+
+    def install(self, session):
+        session.hooks['response'].append(self.hook)
+        return session
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+            self._index.close()
+
+
+def _iter_members(f):
+    """(offset, longueur compressée, données) de chaque membre gzip, depuis la position courante."""
+    offset = f.tell()
+    pending = b''
+    while True:
+        decompressor = zlib.decompressobj(31)
+        parts, length, data = [], 0, pending
+        while not decompressor.eof:
+            if not data:
+                data = f.read(READ_CHUNK_SIZE)
+                if not data:
+                    if length:
+                        # Dernier enregistrement interrompu (arrêt brutal pendant l'écriture)
+                        logging.warning(f"Archive tronquée : enregistrement incomplet ignoré à l'octet {offset}.")
+                    return
+            length += len(data)
+            parts.append(decompressor.decompress(data))
+            data = b''
+        pending = decompressor.unused_data
+        length -= len(pending)
+        yield offset, length, b''.join(parts)
+        offset += length
+
+
+def parse_record(data):
+    head, _, rest = data.partition(b'\r\n\r\n')
+    warc_headers = dict(
+        line.split(': ', 1) for line in head.decode('utf-8').split('\r\n')[1:] if ': ' in line
+    )
+    block = rest[:int(warc_headers.get('Content-Length', len(rest)))]
+    url, date, warc_type = warc_headers.get('WARC-Target-URI'), warc_headers.get('WARC-Date'), warc_headers.get('WARC-Type')
+    if warc_type != 'response':
+        return WarcRecord(warc_type, url, date, None, None, [], block)
+
+    http_head, _, body = block.partition(b'\r\n\r\n')
+    status_line, *header_lines = http_head.decode('iso-8859-1').split('\r\n')
+    _, status, *reason = status_line.split(' ', 2)
+    headers = [tuple(line.split(': ', 1)) for line in header_lines if ': ' in line]
+    return WarcRecord(warc_type, url, date, int(status), reason[0] if reason else '', headers, body)
+
+
+def iter_records(path):
+    """Parcours séquentiel : (offset, longueur, WarcRecord) de chaque enregistrement."""
+    with open(path, 'rb') as f:
+        for offset, length, data in _iter_members(f):
+            yield offset, length, parse_record(data)
+
+
+def read_record(f, offset):
+    """Relit un seul enregistrement, à son offset, dans une archive ouverte en binaire."""
+    f.seek(offset)
+    for _, _, data in _iter_members(f):
+        return parse_record(data)
+    raise ValueError(f"Aucun enregistrement WARC à l'offset {offset}")
+
+
+def rebuild_index(path):
+    entries = [
+        {"url": record.url, "status": record.status, "date": record.date, "offset": offset, "length": length}
+        for offset, length, record in iter_records(path)
+        if record.type == 'response'
+    ]
+    with open(index_path(path), 'w', encoding='utf-8') as f:
+        for entry in entries:
+            f.write(json.dumps(entry) + '\n')
+    return entries
+
+
+def load_index(path):
+    """Entrées de l'index (url, status, offset, length...), reconstruit s'il ne couvre pas toute l'archive."""
+    entries = []
+    if os.path.exists(index_path(path)):
+        with open(index_path(path), 'r', encoding='utf-8') as f:
+            entries = [json.loads(line) for line in f if line.strip()]
+    archive_size = os.path.getsize(path)
+    if not entries or entries[-1]['offset'] + entries[-1]['length'] != archive_size:
+        logging.info(f"Index absent ou incomplet pour {path} : reconstruction par parcours de l'archive.")
+        entries = rebuild_index(path)
+    return entries
+
+
+class ArchiveSession:
+    """Remplace une session requests : `get(url)` renvoie la réponse archivée, sans réseau.
+
+    Une URL absente de l'archive donne un 404 ; pour une URL archivée plusieurs fois,
+    la dernière réponse est servie. Les redirections archivées sont suivies.
+    """
+
+    def __init__(self, path, offsets):
+        self.path = path
+        self.offsets = offsets
+        self.headers = {}
+        self.hooks = {'response': []}
+        self._file = open(path, 'rb')
+
+    def _response(self, url):
+        import requests
+        from requests.structures import CaseInsensitiveDict
+        from requests.utils import get_encoding_from_headers
+
+        response = requests.Response()
+        response.url = url
+        if url not in self.offsets:
+            response.status_code, response.reason, response._content = 404, 'Not in archive', b''
+            return response
+        record = read_record(self._file, self.offsets[url])
+        response.status_code, response.reason, response._content = record.status, record.reason, record.body
+        response.headers = CaseInsensitiveDict(record.headers)
+        response.encoding = get_encoding_from_headers(response.headers)
+        return response
+
+    def get(self, url, allow_redirects=True, **kwargs):
+        from urllib.parse import urljoin
+
+        response = self._response(url)
+        history = []
+        while allow_redirects and response.is_redirect and len(history) < 10:
+            history.append(response)
+            response = self._response(urljoin(response.url, response.headers['Location']))
+        response.history = history
+        return response
+
+    def mount(self, prefix, adapter):
+        pass
+
+    def close(self):
+        self._file.close()
@@ -1,10 +1,16 @@
 import requests
 from bs4 import BeautifulSoup
+import argparse
 import json
+import os
+import sys
 from datetime import datetime
 import re
 from urllib.parse import urljoin
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from common.transport import create_session, format_stats, get_session
+
 SITE_URL = "https://books.toscrape.com/"
 CATALOGUE_URL = "https://books.toscrape.com/catalogue/"
 
@@ -19,9 +25,9 @@ def extract_stock_count(stock_text):
 def extract_price_float(price_text):
     return float(price_text.replace('£', ''))
 
-def get_book_details(book_url):
+def get_book_details(book_url, session=None):
     try:
-        response = requests.get(book_url)
+        response = (session or get_session()).get(book_url)
         response.raise_for_status() 
     except requests.exceptions.RequestException as e:
         print(f"Erreur (ex: 404) pour {book_url}: {e}")
@@ -56,18 +62,20 @@ def get_book_details(book_url):
         "url_image_hd": image_url_hd
     }
 
-def scrape_all_books():
-    all_books_data = []
+def iter_book_urls(session, failures=None):
+    """URLs des fiches livres, page de listing par page de listing."""
     current_page_url = "https://books.toscrape.com/catalogue/page-1.html"
     
     while current_page_url:
         print(f"Scraping de la page : {current_page_url}")
         
         try:
-            response = requests.get(current_page_url)
+            response = session.get(current_page_url)
             response.raise_for_status()
         except requests.exceptions.RequestException as e:
             print(f"Erreur sur la page de listing {current_page_url}: {e}")
+            if failures is not None:
+                failures['listing'] = current_page_url
             break
 
         soup = BeautifulSoup(response.content, 'html.parser')
@@ -76,11 +84,7 @@ def scrape_all_books():
         
         for book in books_on_page:
             relative_book_url = book.find('h3').find('a')['href']
-            absolute_book_url = urljoin(CATALOGUE_URL, relative_book_url)
-            
-            book_details = get_book_details(absolute_book_url)
-            if book_details:
-                all_books_data.append(book_details)
+            yield urljoin(CATALOGUE_URL, relative_book_url)
         
         next_page_tag = soup.find('li', class_='next')
         if next_page_tag:
@@ -88,22 +92,124 @@ def scrape_all_books():
             current_page_url = urljoin(CATALOGUE_URL, next_page_relative_url)
         else:
             current_page_url = None
-            
+
+def scrape_books(book_urls, session, failures=None):
+    all_books_data = []
+    for book_url in book_urls:
+        book_details = get_book_details(book_url, session)
+        if book_details:
+            all_books_data.append(book_details)
+        elif failures is not None:
+            failures.setdefault('details', []).append(book_url)
     return all_books_data
 
+def scrape_all_books(session=None, failures=None):
+    """`failures` (dict optionnel) reçoit les URLs de fiches en échec ('details') et la
+    page de listing sur laquelle la pagination s'est interrompue ('listing')."""
+    session = session or create_session()
+    return scrape_books(iter_book_urls(session, failures), session, failures)
+
+def scrape_books_with_budget(session, tracker, budget, failures):
+    """Tous les listings, puis seulement les `budget` fiches les plus susceptibles d'avoir changé.
+
+    Renvoie (livres re-téléchargés, URLs connues laissées de côté ce run).
+    """
+    from common.snapshots import content_hash
+
+    book_urls = list(iter_book_urls(session, failures))
+    selected, left_stale = tracker.plan(book_urls, budget)
+    print(f"{len(selected)} fiches sur {len(book_urls)} re-téléchargées "
+          f"(pages périmées attendues parmi les autres : {left_stale:.1f}).")
+
+    books_data = scrape_books(selected, session, failures)
+    for book in books_data:
+        tracker.observe(book['url_detail'], content_hash(book))
+    selected = set(selected)
+    return books_data, [url for url in book_urls if url not in selected]
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scraper 'Books to Scrape' (détails de chaque livre) vers JSON.")
+    parser.add_argument(
+        '--warc',
+        type=str,
+        help="Archive .warc.gz où ajouter chaque réponse brute (re-parse ensuite avec common/reparse.py)"
+    )
+    parser.add_argument(
+        '--snapshots',
+        type=str,
+        help="Base SQLite d'historique (ex: snapshots.sqlite) : seuls les changements depuis le run "
+             "précédent sont écrits (books_changes_<horodatage>.jsonl) au lieu du snapshot complet"
+    )
+    parser.add_argument(
+        '--budget',
+        type=int,
+        help="Nombre maximal de fiches à re-télécharger ; les listings sont toujours parcourus et les "
+             "fiches choisies selon leur taux de changement estimé (voir --freshness)"
+    )
+    parser.add_argument(
+        '--freshness',
+        type=str,
+        default='freshness.sqlite',
+        help="Base SQLite des visites et taux de changement par fiche, avec --budget (défaut: freshness.sqlite)"
+    )
+    parser.add_argument(
+        '--images',
+        type=str,
+        help="Dossier où télécharger les couvertures (url_image_hd), stockées par hash SHA-256"
+    )
+    parser.add_argument(
+        '--http2',
+        action='store_true',
+        help="HTTP/2 (multiplexage sur une connexion par hôte) via httpx[http2], si installé"
+    )
+    args = parser.parse_args()
+
     print("Démarrage du scraping de 'Books to Scrape'...")
-    
-    books_data = scrape_all_books()
+
+    session = create_session(http2=args.http2)
+    warc_writer = None
+    if args.warc:
+        from common.warc import WarcWriter
+        warc_writer = WarcWriter(args.warc)
+        warc_writer.install(session)
+
+    failures = {}
+    skipped_urls = []
+    if args.budget is not None:
+        from common.freshness import FreshnessTracker
+        tracker = FreshnessTracker(args.freshness)
+        books_data, skipped_urls = scrape_books_with_budget(session, tracker, args.budget, failures)
+        tracker.close()
+        if not args.snapshots:
+            print("Attention : sans --snapshots, le JSON ne contient que les fiches re-téléchargées.")
+    else:
+        books_data = scrape_all_books(session, failures)
+    if warc_writer:
+        warc_writer.close()
+        print(f"{warc_writer.records} réponses archivées dans : {args.warc}")
     
     print(f"Scraping terminé. {len(books_data)} livres trouvés.")
+    print(f"Transport : {format_stats(session.transport_stats)}")
+
+    if args.images:
+        from common.images import download_images, print_summary
+        print_summary(download_images([book['url_image_hd'] for book in books_data], args.images, http2=args.http2))
     
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    filename = f"books_scrape_{timestamp}.json"
-    
-    try:
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(books_data, f, indent=4, ensure_ascii=False)
-        print(f"Données sauvegardées avec succès dans : {filename}")
-    except IOError as e:
-        print(f"Erreur lors de la sauvegarde du fichier JSON : {e}")
\ No newline at end of file
+    if args.snapshots:
+        from common.snapshots import save_run
+        # Pagination interrompue : les livres non vus ne sont pas considérés comme supprimés.
+        # Fiches en échec ou hors budget : dernier état connu conservé.
+        save_run(
+            args.snapshots, 'url_detail', books_data, f"books_changes_{timestamp}.jsonl",
+            complete='listing' not in failures, unreachable=failures.get('details', []) + skipped_urls
+        )
+    else:
+        filename = f"books_scrape_{timestamp}.json"
+
+        try:
+            with open(filename, 'w', encoding='utf-8') as f:
+                json.dump(books_data, f, indent=4, ensure_ascii=False)
+            print(f"Données sauvegardées avec succès dans : {filename}")
+        except IOError as e:
+            print(f"Erreur lors de la sauvegarde du fichier JSON : {e}")
@@ -4,9 +4,14 @@ from bs4 import BeautifulSoup
 from urllib.parse import urljoin
 import networkx as nx
 from collections import Counter
+import os
 import re
+import sys
 import time
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from common.transport import format_stats, get_session
+
 SITE_URL = "http://quotes.toscrape.com/"
 
 print("Mise en place du cache (quotes_cache.sqlite)...")
@@ -14,7 +19,8 @@ requests_cache.install_cache('quotes_cache', backend='sqlite', expire_after=3600
 
 def get_soup(url):
     try:
-        response = requests.get(url)
+        # Session partagée créée après install_cache : c'est une CachedSession
+        response = get_session().get(url)
         response.raise_for_status()
         print(f"GET {url} (Cached: {response.from_cache})")
         return BeautifulSoup(response.content, 'lxml')
@@ -144,6 +150,7 @@ if __name__ == "__main__":
     print(f"\n--- Scraping Terminé ---")
     print(f"{len(quotes_list)} citations trouvées.")
     print(f"{len(authors_dict)} auteurs uniques trouvés.")
+    print(f"Transport : {format_stats(get_session().transport_stats)}")
     author_names_from_quotes = [q['author'] for q in quotes_list]
     author_counts = Counter(author_names_from_quotes)
     
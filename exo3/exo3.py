@@ -1,17 +1,23 @@
-import requests
-from bs4 import BeautifulSoup
-import pandas as pd
 import argparse
 import re
 from datetime import datetime
 import sys
-import dateparser
+import os
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from common.columnar import OUTPUT_FORMATS, output_path, write_dataframe
 
 SITE_URL = "https://realpython.github.io/fake-jobs/"
 
-def scrape_all_jobs(url):
+# requests, pandas et dateparser sont importés dans les fonctions qui s'en servent :
+# `--help` et les erreurs d'arguments restent instantanés.
+def scrape_all_jobs(url, http2=False):
+    import requests
+    from bs4 import BeautifulSoup
+    from common.transport import get_session
+
     try:
-        response = requests.get(url)
+        response = get_session(http2=http2).get(url)
         response.raise_for_status()
     except requests.exceptions.RequestException as e:
         print(f"Erreur: Impossible de joindre {url}. {e}", file=sys.stderr)
@@ -39,7 +45,11 @@ def scrape_all_jobs(url):
         })
     return jobs_data
 
-def clean_and_process_data(jobs_list):
+def clean_and_process_data(jobs_list, near_duplicates=False, similarity=0.8):
+    import pandas as pd
+    import dateparser
+    from common.near_duplicates import find_near_duplicates
+
     if not jobs_list:
         return pd.DataFrame()
         
@@ -57,6 +67,13 @@ def clean_and_process_data(jobs_list):
         keep='first'
     )
 
+    if near_duplicates:
+        # Quasi-doublons (MinHash/LSH sur des 5-grammes de caractères) : l'id de cluster
+        # est l'index de la première annonce du groupe.
+        texts = (df['titre'] + ' ' + df['entreprise'] + ' ' + df['localisation']).tolist()
+        df['cluster_quasi_doublon'] = find_near_duplicates(texts, threshold=similarity, shingle_size=5, unit='char')
+        df['est_doublon'] = df['est_doublon'] | (df['cluster_quasi_doublon'] != df.index)
+
     
     return df
 
@@ -117,21 +134,43 @@ if __name__ == "__main__":
         action='store_true', 
         help="Inclure les doublons dans le résultat"
     )
+    parser.add_argument(
+        '--near-duplicates',
+        action='store_true',
+        help="Considérer aussi les quasi-doublons (titre/entreprise/localisation similaires) comme doublons"
+    )
+    parser.add_argument(
+        '--similarity',
+        type=float,
+        default=0.8,
+        help="Seuil de similarité (Jaccard estimé) pour les quasi-doublons (défaut: 0.8)"
+    )
     parser.add_argument(
         '-o', '--output', 
         type=str, 
         default="fake_jobs_results.csv", 
-        help="Nom du fichier CSV de sortie (défaut: 'fake_jobs_results.csv')"
+        help="Nom du fichier de sortie (défaut: 'fake_jobs_results.csv')"
+    )
+    parser.add_argument(
+        '-f', '--format',
+        choices=OUTPUT_FORMATS,
+        default='csv',
+        help="Format de sortie : 'csv' ou 'parquet' colonnaire (défaut: 'csv')"
+    )
+    parser.add_argument(
+        '--http2',
+        action='store_true',
+        help="HTTP/2 (multiplexage sur une connexion par hôte) via httpx[http2], si installé"
     )
     
     args = parser.parse_args()
 
     print("Démarrage du scraping 'Fake Jobs'...")
-    all_jobs_raw = scrape_all_jobs(SITE_URL)
+    all_jobs_raw = scrape_all_jobs(SITE_URL, http2=args.http2)
     
     print(f"{len(all_jobs_raw)} annonces brutes trouvées.")
     
-    df_cleaned = clean_and_process_data(all_jobs_raw)
+    df_cleaned = clean_and_process_data(all_jobs_raw, args.near_duplicates, args.similarity)
     
     if df_cleaned.empty:
         print("Aucune donnée n'a pu être traitée. Arrêt.")
@@ -157,8 +196,15 @@ if __name__ == "__main__":
     if args.stats:
         generate_and_print_stats(final_df_export)
 
+    output_file = args.output if args.format == 'csv' else output_path(args.output, args.format)
     try:
-        final_df_export.to_csv(args.output, encoding='utf-8-sig', index=False)
-        print(f"\nRésultats sauvegardés avec succès dans : {args.output}")
-    except IOError as e:
-        print(f"Erreur lors de la sauvegarde du CSV : {e}", file=sys.stderr)
\ No newline at end of file
+        write_dataframe(
+            final_df_export,
+            output_file,
+            args.format,
+            dictionary_columns=['entreprise', 'localisation'],
+            sort_by=['localisation']
+        )
+        print(f"\nRésultats sauvegardés avec succès dans : {output_file}")
+    except (IOError, ImportError) as e:
+        print(f"Erreur lors de la sauvegarde des résultats : {e}", file=sys.stderr)
\ No newline at end of file
@@ -1,18 +1,24 @@
 import requests
 from bs4 import BeautifulSoup
 from urllib.parse import urljoin
+import argparse
 import json
+import os
 import re
+import sys
 from datetime import datetime
 import time
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from common.transport import format_stats, get_session
+
 SITE_URL = "https://books.toscrape.com/"
 CATALOGUE_URL = "https://books.toscrape.com/catalogue/"
 START_PAGE = "https://books.toscrape.com/index.html"
 
 def get_soup(url):
     try:
-        response = requests.get(url)
+        response = get_session().get(url)
         response.raise_for_status()
         return BeautifulSoup(response.content, 'lxml')
     except requests.exceptions.RequestException as e:
@@ -90,9 +96,38 @@ def parse_category_node(li_element):
         "sous_categories": subcategories_list
     }
 
+def flatten_category_tree(tree, parent_url=None):
+    """Une ligne par catégorie (statistiques à plat, lien vers le parent) pour l'historique des snapshots."""
+    records = []
+    for node in tree:
+        records.append({
+            "url_categorie": node["url_categorie"],
+            "nom_categorie": node["nom_categorie"],
+            "url_parent": parent_url,
+            **node["statistiques"]
+        })
+        records.extend(flatten_category_tree(node["sous_categories"], node["url_categorie"]))
+    return records
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Arborescence des catégories de 'Books to Scrape' avec statistiques de prix.")
+    parser.add_argument(
+        '--snapshots',
+        type=str,
+        help="Base SQLite d'historique (ex: snapshots.sqlite) : seuls les changements depuis le run "
+             "précédent sont écrits (category_changes_<horodatage>.jsonl) au lieu de l'arbre complet"
+    )
+    parser.add_argument(
+        '--http2',
+        action='store_true',
+        help="HTTP/2 (multiplexage sur une connexion par hôte) via httpx[http2], si installé"
+    )
+    args = parser.parse_args()
+
     print("Démarrage du scraping de l'arborescence des catégories...")
     
+    # Crée la session commune utilisée par get_soup
+    get_session(http2=args.http2)
     start_soup = get_soup(START_PAGE)
     
     if start_soup:
@@ -111,15 +146,23 @@ if __name__ == "__main__":
                 full_category_tree.append(category_data)
         
         print("\nScraping de l'arborescence terminé.")
+        print(f"Transport : {format_stats(get_session().transport_stats)}")
         
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"category_tree_{timestamp}.json"
-        
-        try:
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(full_category_tree, f, indent=4, ensure_ascii=False)
-            print(f"Arborescence sauvegardée avec succès dans : {filename}")
-        except IOError as e:
-            print(f"Erreur lors de la sauvegarde du JSON : {e}")
+        if args.snapshots:
+            from common.snapshots import save_run
+            save_run(
+                args.snapshots, 'url_categorie', flatten_category_tree(full_category_tree),
+                f"category_changes_{timestamp}.jsonl"
+            )
+        else:
+            filename = f"category_tree_{timestamp}.json"
+
+            try:
+                with open(filename, 'w', encoding='utf-8') as f:
+                    json.dump(full_category_tree, f, indent=4, ensure_ascii=False)
+                print(f"Arborescence sauvegardée avec succès dans : {filename}")
+            except IOError as e:
+                print(f"Erreur lors de la sauvegarde du JSON : {e}")
     else:
         print("Impossible de scraper la page de démarrage. Arrêt.")
\ No newline at end of file
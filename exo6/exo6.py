@@ -1,14 +1,18 @@
 import requests
-from requests.adapters import HTTPAdapter
 from requests.packages.urllib3.util.retry import Retry
 from bs4 import BeautifulSoup
+import argparse
 import logging
 import time
 import json
 import os
 import re
+import sys
 from urllib.parse import urljoin
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from common.transport import create_session, format_stats
+
 SITE_URL = "https://books.toscrape.com/"
 CATALOGUE_URL = "https://books.toscrape.com/catalogue/"
 START_PAGE = "https://books.toscrape.com/catalogue/page-1.html"
@@ -27,9 +31,7 @@ def setup_logging():
         ]
     )
 
-def create_resilient_session():
-    session = requests.Session()
-    
+def create_resilient_session(http2=False):
     retry_strategy = Retry(
         total=5,
         status_forcelist=[429, 500, 502, 503, 504],
@@ -37,18 +39,15 @@ def create_resilient_session():
         allowed_methods=["HEAD", "GET", "OPTIONS"]
     )
     
-    adapter = HTTPAdapter(max_retries=retry_strategy)
-    
-    session.mount("http://", adapter)
-    session.mount("https://", adapter)
-    
-    session.timeout = (5, 30)
-    
-    session.headers.update({
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-    })
-    
-    return session
+    # Timeout par défaut (5s connexion, 30s lecture) appliqué par le transport partagé
+    return create_session(
+        timeout=(5, 30),
+        http2=http2,
+        max_retries=retry_strategy,
+        headers={
+            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+        }
+    )
 
 def load_progress():
     if not os.path.exists(PROGRESS_FILE):
@@ -130,64 +129,117 @@ def get_book_details(session, book_url):
         return None
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scraper résilient 'Books to Scrape' (retries, reprise) vers JSONL.")
+    parser.add_argument(
+        '--warc',
+        type=str,
+        help="Archive .warc.gz où ajouter chaque réponse brute (re-parse ensuite avec common/reparse.py)"
+    )
+    parser.add_argument(
+        '--index',
+        type=str,
+        help="Index plein texte SQLite (common/search_index.py) alimenté au fil du scraping"
+    )
+    parser.add_argument(
+        '--images',
+        type=str,
+        help="Dossier où télécharger les couvertures des livres scrapés (stockées par hash SHA-256)"
+    )
+    parser.add_argument(
+        '--http2',
+        action='store_true',
+        help="HTTP/2 (multiplexage sur une connexion par hôte) via httpx[http2], si installé"
+    )
+    args = parser.parse_args()
+
     setup_logging()
     logging.info("--- Démarrage du Scraper Résilient ---")
     
-    session = create_resilient_session()
+    session = create_resilient_session(http2=args.http2)
+    warc_writer = None
+    if args.warc:
+        from common.warc import WarcWriter
+        warc_writer = WarcWriter(args.warc)
+        warc_writer.install(session)
+    search_index = None
+    if args.index:
+        from common.search_index import SearchIndex, document_from_record
+        search_index = SearchIndex(args.index)
     current_page_url = load_progress()
     
     books_scraped_session = 0
+    image_urls = []
     start_time = time.time()
 
-    while current_page_url:
-        logging.info(f"Scraping de la page : {current_page_url}")
+    # Arrêt volontaire (SystemExit sur un 403) ou Ctrl-C : l'index garde les livres déjà scrapés
+    try:
+        while current_page_url:
+            logging.info(f"Scraping de la page : {current_page_url}")
         
-        try:
-            response = session.get(current_page_url)
-            response.raise_for_status()
-        except requests.exceptions.RequestException as e:
-            logging.error(f"Échec critique sur la page de listing {current_page_url}: {e}")
-            break 
-        soup = BeautifulSoup(response.content, 'lxml')
+            try:
+                response = session.get(current_page_url)
+                response.raise_for_status()
+            except requests.exceptions.RequestException as e:
+                logging.error(f"Échec critique sur la page de listing {current_page_url}: {e}")
+                break 
+            soup = BeautifulSoup(response.content, 'lxml')
         
-        books_on_page = soup.find_all('article', class_='product_pod')
+            books_on_page = soup.find_all('article', class_='product_pod')
         
-        for book in books_on_page:
-            relative_book_url = book.find('h3').find('a')['href']
-            absolute_book_url = urljoin(CATALOGUE_URL, relative_book_url)
+            for book in books_on_page:
+                relative_book_url = book.find('h3').find('a')['href']
+                absolute_book_url = urljoin(CATALOGUE_URL, relative_book_url)
             
-            book_details = get_book_details(session, absolute_book_url)
+                book_details = get_book_details(session, absolute_book_url)
             
-            if book_details:
-                save_data(book_details)
-                logging.debug(f"SUCCÈS : {book_details['titre']}")
-                books_scraped_session += 1
-            else:
-                logging.warning(f"ÉCHEC : Impossible de scraper {absolute_book_url}")
+                if book_details:
+                    save_data(book_details)
+                    if search_index:
+                        search_index.add(document_from_record(book_details))
+                    logging.debug(f"SUCCÈS : {book_details['titre']}")
+                    books_scraped_session += 1
+                    image_urls.append(book_details['url_image_hd'])
+                else:
+                    logging.warning(f"ÉCHEC : Impossible de scraper {absolute_book_url}")
 
-            time.sleep(0.1) 
+                time.sleep(0.1) 
         
        
-        next_page_tag = soup.find('li', class_='next')
-        if next_page_tag:
-            next_page_relative_url = next_page_tag.find('a')['href']
-            current_page_url = urljoin(CATALOGUE_URL, next_page_relative_url)
+            next_page_tag = soup.find('li', class_='next')
+            if next_page_tag:
+                next_page_relative_url = next_page_tag.find('a')['href']
+                current_page_url = urljoin(CATALOGUE_URL, next_page_relative_url)
   
-            save_progress(current_page_url)
-        else:
-            current_page_url = None
-            logging.info("Fin de la pagination atteinte.")
-            if os.path.exists(PROGRESS_FILE):
-                os.remove(PROGRESS_FILE)
+                save_progress(current_page_url)
+                if search_index:
+                    # Livres des pages passées indexés durablement : une reprise ne les revisite pas
+                    search_index.commit()
+            else:
+                current_page_url = None
+                logging.info("Fin de la pagination atteinte.")
+                if os.path.exists(PROGRESS_FILE):
+                    os.remove(PROGRESS_FILE)
                 
-        time.sleep(0.5) 
-            
+            time.sleep(0.5)
+    finally:
+        if search_index:
+            search_index.close()
+
     end_time = time.time()
     duration = end_time - start_time
     logging.info(f"--- Session de Scraping Terminée ---")
     logging.info(f"Temps total : {duration:.2f} secondes")
     logging.info(f"Livres scrapés cette session : {books_scraped_session}")
+    logging.info(f"Transport : {format_stats(session.transport_stats)}")
     if books_scraped_session > 0 and duration > 0:
         logging.info(f"Performance : {books_scraped_session / duration:.2f} livres/seconde")
     logging.info(f"Données sauvegardées dans : {OUTPUT_FILE}")
+    if warc_writer:
+        warc_writer.close()
+        logging.info(f"{warc_writer.records} réponses archivées dans : {args.warc}")
+    if search_index:
+        logging.info(f"Index plein texte mis à jour : {args.index} ({search_index.counts})")
+    if args.images:
+        from common.images import download_images
+        logging.info(f"Images : {download_images(image_urls, args.images, http2=args.http2)}")
     logging.info(f"Logs complets dans : {LOG_FILE}")
\ No newline at end of file
@@ -0,0 +1,176 @@
+import math
+
+# Facteur de cohérence entre la MAD et l'écart-type d'une loi normale
+MAD_SCALE = 0.6745
+
+
+class QuantileSketch:
+    """Histogramme à buckets logarithmiques : quantiles à précision relative bornée, en une passe."""
+
+    def __init__(self, relative_accuracy=0.01):
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.buckets = {}
+        self.zero_count = 0
+        self.count = 0
+
+    def add(self, value):
+        if value <= 0:
+            self.zero_count += 1
+        else:
+            key = math.ceil(math.log(value) / self.log_gamma)
+            self.buckets[key] = self.buckets.get(key, 0) + 1
+        self.count += 1
+
+    def _bucket_value(self, key):
+        return 2 * self.gamma ** key / (self.gamma + 1)
+
+    def _weighted_values(self):
+        values = [(0.0, self.zero_count)] if self.zero_count else []
+        values.extend((self._bucket_value(key), self.buckets[key]) for key in sorted(self.buckets))
+        return values
+
+    @staticmethod
+    def _weighted_quantile(weighted_values, total, q):
+        rank = q * (total - 1)
+        seen = 0
+        for value, count in weighted_values:
+            seen += count
+            if seen > rank:
+                return value
+        return weighted_values[-1][0]
+
+    def quantile(self, q):
+        if self.count == 0:
+            return None
+        return self._weighted_quantile(self._weighted_values(), self.count, q)
+
+    def median_and_mad(self):
+        if self.count == 0:
+            return None, None
+        weighted_values = self._weighted_values()
+        median = self._weighted_quantile(weighted_values, self.count, 0.5)
+        deviations = sorted((abs(value - median), count) for value, count in weighted_values)
+        return median, self._weighted_quantile(deviations, self.count, 0.5)
+
+
+class StreamingAnomalyDetector:
+    """Détection d'anomalies robuste (médiane/MAD) au fil de l'eau.
+
+    Chaque valeur est notée contre la référence courante avant d'y être ajoutée,
+    avec une référence par groupe (ex: catégorie) dès qu'elle a assez d'observations.
+    Les premières valeurs, reçues avant `min_samples`, sont notées dès que la
+    référence globale est prête.
+    """
+
+    def __init__(self, value_field='prix_gbp', group_field=None, threshold=3.5,
+                 min_samples=30, relative_accuracy=0.01, refresh_every=50, on_anomaly=None):
+        self.value_field = value_field
+        self.group_field = group_field
+        self.threshold = threshold
+        self.min_samples = min_samples
+        self.relative_accuracy = relative_accuracy
+        self.refresh_every = refresh_every
+        self.on_anomaly = on_anomaly
+        self.global_sketch = QuantileSketch(relative_accuracy)
+        self.group_sketches = {}
+        self._baselines = {}
+        self._pending = []
+        self.records_seen = 0
+        self.non_finite = 0
+        self.anomalies = []
+
+    def _sketch_for(self, group):
+        if group is None:
+            return self.global_sketch
+        if group not in self.group_sketches:
+            self.group_sketches[group] = QuantileSketch(self.relative_accuracy)
+        return self.group_sketches[group]
+
+    def baseline(self, group=None):
+        sketch = self._sketch_for(group)
+        cached = self._baselines.get(group)
+        if cached is None or sketch.count - cached['count'] >= self.refresh_every:
+            median, mad = sketch.median_and_mad()
+            cached = {'count': sketch.count, 'median': median, 'mad': mad}
+            self._baselines[group] = cached
+        return cached
+
+    def refresh_baselines(self):
+        """Recalcule les références à partir de toutes les valeurs vues (fin de flux)."""
+        self._baselines.clear()
+
+    def _score(self, value, group):
+        reference = None
+        if group is not None and self._sketch_for(group).count >= self.min_samples:
+            reference = self.baseline(group)
+            if not reference['mad']:
+                # Groupe sans dispersion (prix identiques) : la référence globale prend le relais
+                reference = None
+        if reference is None:
+            reference = self.baseline(None)
+        if not reference['mad']:
+            return None
+        return MAD_SCALE * (value - reference['median']) / reference['mad']
+
+    def score(self, value, group=None):
+        """Z-score robuste de `value` contre les références courantes (None si non notable)."""
+        if value is None or not math.isfinite(value):
+            return None
+        return self._score(value, group)
+
+    def _check(self, record, value, group):
+        score = self._score(value, group)
+        if score is not None and abs(score) > self.threshold:
+            anomaly = {**record, 'prix_zscore': score}
+            self.anomalies.append(anomaly)
+            if self.on_anomaly:
+                self.on_anomaly(anomaly)
+            return anomaly
+        return None
+
+    def update(self, record):
+        value = record.get(self.value_field)
+        if value is None:
+            return []
+        if not math.isfinite(value):
+            # Hors de l'histogramme logarithmique : compté à part, jamais noté
+            self.non_finite += 1
+            return []
+        group = record.get(self.group_field) if self.group_field else None
+        self.records_seen += 1
+
+        flagged = []
+        if self.global_sketch.count < self.min_samples:
+            self._pending.append((record, value, group))
+        else:
+            anomaly = self._check(record, value, group)
+            if anomaly:
+                flagged.append(anomaly)
+
+        self.global_sketch.add(value)
+        if group is not None:
+            self._sketch_for(group).add(value)
+
+        if self._pending and self.global_sketch.count >= self.min_samples:
+            pending, self._pending = self._pending, []
+            for pending_record, pending_value, pending_group in pending:
+                anomaly = self._check(pending_record, pending_value, pending_group)
+                if anomaly:
+                    flagged.append(anomaly)
+        return flagged
+
+    def process(self, records):
+        for record in records:
+            yield from self.update(record)
+
+    def flush(self):
+        """Note les valeurs encore en attente (flux plus court que `min_samples`)."""
+        pending, self._pending = self._pending, []
+        flagged = []
+        if self.global_sketch.count > 2:
+            for record, value, group in pending:
+                anomaly = self._check(record, value, group)
+                if anomaly:
+                    flagged.append(anomaly)
+        return flagged
@@ -1,54 +1,38 @@
-import pandas as pd
+import argparse
 import json
 import logging
-from pydantic import BaseModel, Field, ValidationError, field_validator
-from typing import Optional
-from scipy.stats import zscore
-import numpy as np
+import os
+import sys
+from anomalies import StreamingAnomalyDetector
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from common.columnar import OUTPUT_FORMATS, output_path, write_dataframe
 
 INPUT_FILE = 'books_data_resilient.jsonl' 
 INPUT_FORMAT = 'jsonl'
+# 'batch' : contrôles vectorisés + repli pydantic ; 'record' : pydantic ligne par ligne
+VALIDATION_MODE = 'batch'
+# Nombre de processus pour valider un JSONL volumineux (0 ou 1 : validation dans le processus courant)
+PARALLEL_WORKERS = 0
+# 'robust' : médiane/MAD en flux (une passe) ; 'zscore' : Z-score classique sur la colonne entière
+ANOMALY_METHOD = 'robust'
+# Colonne optionnelle servant de référence par groupe (ex: 'categorie_principale')
+ANOMALY_GROUP_FIELD = None
+ROBUST_ZSCORE_THRESHOLD = 3.5
+# Seuil de similarité (Jaccard estimé par MinHash) entre descriptions quasi-identiques
+NEAR_DUPLICATE_THRESHOLD = 0.8
 CLEAN_OUTPUT_FILE = 'books_data_clean.csv'
+# 'csv' ou 'parquet' (colonnaire, nécessite pyarrow)
+OUTPUT_FORMAT = 'csv'
 REPORT_FILE = 'data_quality_report.txt'
 
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(REPORT_FILE, mode='w'),
-        logging.StreamHandler()
-    ]
-)
-
-
-class BookModel(BaseModel):
-
-    titre: str = Field(min_length=1)
-    url_detail: str
-    prix_gbp: float = Field(gt=0)
-    note_sur_5: int = Field(ge=0, le=5)
-    description: Optional[str] = None
-    stock_disponible: int = Field(ge=0) 
-    url_image_hd: str
-
-    @field_validator('titre', 'description')
-    def clean_text(cls, v):
-        if v is None:
-            return v
-        v = v.strip()
-        v = " ".join(v.split())
-        return v
-    
-    @field_validator('url_detail', 'url_image_hd')
-    def check_url_format(cls, v):
-        if not v.startswith(('http://', 'https://')):
-            raise ValueError('URL doit commencer par http:// ou https://')
-        return v
 
+# pandas, scipy et pydantic (via validation) sont importés dans les fonctions qui s'en
+# servent : `--help` et les erreurs d'arguments restent instantanés.
+def load_and_validate_data(filepath, file_format, mode=VALIDATION_MODE, on_valid=None):
+    import pandas as pd
+    from validation import validate_batch, validate_record_by_record
 
-def load_and_validate_data(filepath, file_format):
-    valid_records = []
-    invalid_records_details = []
     # Default metrics to return on early error cases so callers can rely on a stable structure
     default_metrics = {
         "total_records": 0,
@@ -81,47 +65,125 @@ def load_and_validate_data(filepath, file_format):
 
     logging.info(f"Début de la validation pour {len(raw_data)} enregistrements...")
 
-    error_counts = {}
+    if mode == 'batch':
+        valid_df, invalid_records_details, error_counts = validate_batch(raw_data, on_valid)
+    else:
+        valid_df, invalid_records_details, error_counts = validate_record_by_record(raw_data, on_valid)
 
-    for i, record in enumerate(raw_data):
-        try:
-            clean_record = BookModel.model_validate(record)
-            valid_records.append(clean_record.model_dump())
-            
-        except ValidationError as e:
-            errors = e.errors()
-            invalid_records_details.append({'index': i, 'record': record, 'errors': errors})
-            for error in errors:
-                field = error['loc'][0] if error['loc'] else 'unknown_field'
-                error_counts[field] = error_counts.get(field, 0) + 1
-
-    logging.info(f"Validation terminée. {len(valid_records)} valides, {len(invalid_records_details)} invalides.")
+    logging.info(f"Validation terminée. {len(valid_df)} valides, {len(invalid_records_details)} invalides.")
     
     quality_metrics = {
         "total_records": len(raw_data),
-        "valid_records": len(valid_records),
+        "valid_records": len(valid_df),
         "invalid_records": len(invalid_records_details),
         "validation_errors_by_field": error_counts,
         "invalid_record_examples": invalid_records_details[:5]
     }
 
-    return pd.DataFrame(valid_records), quality_metrics
+    return valid_df, quality_metrics
+
+def load_and_validate_data_parallel(filepath, workers, mode=VALIDATION_MODE, on_valid=None):
+    import pandas as pd
+    from validation import validate_jsonl_parallel
+
+    default_metrics = {
+        "total_records": 0,
+        "valid_records": 0,
+        "invalid_records": 0,
+        "validation_errors_by_field": {},
+        "invalid_record_examples": []
+    }
+
+    logging.info(f"Validation parallèle de '{filepath}' sur {workers} processus (shards mmap)...")
+
+    try:
+        total_records, valid_df, invalid_count, invalid_examples, error_counts = validate_jsonl_parallel(filepath, workers, mode, on_valid)
+    except FileNotFoundError:
+        logging.error(f"Erreur: Fichier '{filepath}' non trouvé.")
+        return pd.DataFrame(), default_metrics
+    except json.JSONDecodeError:
+        logging.error(f"Erreur: Impossible de décoder le JSON dans '{filepath}'.")
+        return pd.DataFrame(), default_metrics
+
+    logging.info(f"Validation terminée. {len(valid_df)} valides, {invalid_count} invalides.")
+
+    quality_metrics = {
+        "total_records": total_records,
+        "valid_records": len(valid_df),
+        "invalid_records": invalid_count,
+        "validation_errors_by_field": error_counts,
+        "invalid_record_examples": invalid_examples[:5]
+    }
+
+    return valid_df, quality_metrics
+
+def create_price_anomaly_detector(group_field=ANOMALY_GROUP_FIELD):
+    def report(anomaly):
+        logging.warning(f"Anomalie de prix : {anomaly['titre'][:40]} | £{anomaly['prix_gbp']:.2f} (Z-score robuste: {anomaly['prix_zscore']:.2f})")
+
+    return StreamingAnomalyDetector(value_field='prix_gbp', group_field=group_field,
+                                    threshold=ROBUST_ZSCORE_THRESHOLD, on_anomaly=report)
+
+def finish_price_anomaly_detection(detector):
+    detector.flush()
+    detector.refresh_baselines()
+
+    for group, sketch in [(None, detector.global_sketch)] + list(detector.group_sketches.items()):
+        reference = detector.baseline(group)
+        label = group if group is not None else 'global'
+        logging.info(f"Référence prix ({label}) : médiane £{reference['median']:.2f}, MAD £{reference['mad']:.2f} sur {sketch.count} valeurs")
+
+    return detector.anomalies
+
+def detect_price_anomalies_streaming(records, group_field=ANOMALY_GROUP_FIELD):
+    detector = create_price_anomaly_detector(group_field)
+    for record in records:
+        detector.update(record)
+    finish_price_anomaly_detection(detector)
+    return detector
+
+def analyze_and_clean_dataframe(df, detector=None, method=ANOMALY_METHOD, group_field=ANOMALY_GROUP_FIELD):
+    from common.near_duplicates import find_near_duplicates, is_near_duplicate
 
-def analyze_and_clean_dataframe(df):
-    
     if df.empty:
         logging.warning("DataFrame vide, aucune analyse post-validation à effectuer.")
         return df, {}
         
     analysis_metrics = {}
 
+    # Avant l'imputation : les descriptions manquantes restent chacune dans leur propre cluster
+    df['cluster_description'] = find_near_duplicates(df['description'].tolist(), threshold=NEAR_DUPLICATE_THRESHOLD)
+    near_duplicates_count = sum(is_near_duplicate(df['cluster_description'].tolist()))
+    analysis_metrics['descriptions_quasi_doublons'] = near_duplicates_count
+    if near_duplicates_count > 0:
+        logging.info(f"{near_duplicates_count} descriptions quasi-identiques à une description précédente.")
+
     missing_desc_count = df['description'].isnull().sum()
     if missing_desc_count > 0:
         logging.info(f"Imputation de {missing_desc_count} descriptions manquantes.")
         df['description'] = df['description'].fillna('Description non disponible')
     analysis_metrics['imputed_descriptions'] = missing_desc_count
 
-    if len(df) > 2:
+    if len(df) > 2 and method == 'robust':
+        if detector is not None:
+            # Détecteur déjà alimenté par la validation, enregistrement par enregistrement
+            finish_price_anomaly_detection(detector)
+        else:
+            detector = detect_price_anomalies_streaming(df.to_dict('records'), group_field)
+        anomalies = detector.anomalies
+        # Score de chaque ligne contre les références finales (les alertes, elles, ont été
+        # levées au fil de l'eau contre la référence du moment)
+        groups = df[detector.group_field].tolist() if detector.group_field else [None] * len(df)
+        df['prix_zscore'] = [detector.score(value, group) for value, group in zip(df['prix_gbp'].tolist(), groups)]
+        analysis_metrics['anomalies_prix_detectees'] = len(anomalies)
+        analysis_metrics['anomalies_prix_exemples'] = [
+            {'titre': a['titre'], 'prix_gbp': a['prix_gbp'], 'prix_zscore': a['prix_zscore']} for a in anomalies
+        ]
+        logging.info(f"{len(anomalies)} anomalies de prix détectées (Z-score robuste > {ROBUST_ZSCORE_THRESHOLD}).")
+    elif len(df) > 2:
+        import numpy as np
+        from scipy.stats import zscore
+
         df['prix_zscore'] = zscore(df['prix_gbp'])
         anomalies = df[np.abs(df['prix_zscore']) > 3]
         analysis_metrics['anomalies_prix_detectees'] = len(anomalies)
@@ -156,6 +218,7 @@ def generate_quality_report(initial_metrics, analysis_metrics):
     logging.info("ANALYSE POST-VALIDATION")
     logging.info("="*50)
     logging.info(f"Descriptions manquantes imputées : {analysis_metrics.get('imputed_descriptions', 'N/A')}")
+    logging.info(f"Descriptions quasi-dupliquées : {analysis_metrics.get('descriptions_quasi_doublons', 'N/A')}")
     logging.info(f"Anomalies de prix (Z-score) : {analysis_metrics.get('anomalies_prix_detectees', 'N/A')}")
     
     if analysis_metrics.get('anomalies_prix_detectees', 0) > 0:
@@ -163,23 +226,103 @@ def generate_quality_report(initial_metrics, analysis_metrics):
         for ex in analysis_metrics.get('anomalies_prix_exemples', []):
             logging.info(f"  - Titre: {ex['titre'][:40]}... | Prix: £{ex['prix_gbp']:.2f} (Z-score: {ex['prix_zscore']:.2f})")
 
-if __name__ == "__main__":
+def main():
+    parser = argparse.ArgumentParser(
+        description="Valide un export de livres (exo6), détecte les anomalies de prix et écrit un rapport qualité."
+    )
+    parser.add_argument(
+        '-i', '--input',
+        type=str,
+        default=INPUT_FILE,
+        help=f"Fichier à valider (défaut: '{INPUT_FILE}')"
+    )
+    parser.add_argument(
+        '--input-format',
+        choices=('json', 'jsonl'),
+        default=INPUT_FORMAT,
+        help=f"Format du fichier d'entrée (défaut: '{INPUT_FORMAT}')"
+    )
+    parser.add_argument(
+        '--mode',
+        choices=('batch', 'record'),
+        default=VALIDATION_MODE,
+        help=f"'batch' : contrôles vectorisés + repli pydantic ; 'record' : pydantic ligne par ligne (défaut: '{VALIDATION_MODE}')"
+    )
+    parser.add_argument(
+        '-w', '--workers',
+        type=int,
+        default=PARALLEL_WORKERS,
+        help=f"Processus de validation pour un JSONL (0 ou 1 : dans le processus courant ; défaut: {PARALLEL_WORKERS})"
+    )
+    parser.add_argument(
+        '--anomaly-method',
+        choices=('robust', 'zscore'),
+        default=ANOMALY_METHOD,
+        help=f"'robust' : médiane/MAD en flux ; 'zscore' : Z-score classique (défaut: '{ANOMALY_METHOD}')"
+    )
+    parser.add_argument(
+        '--group-field',
+        type=str,
+        default=ANOMALY_GROUP_FIELD,
+        help="Colonne servant de référence de prix par groupe (ex: 'categorie_principale')"
+    )
+    parser.add_argument(
+        '-o', '--output',
+        type=str,
+        default=CLEAN_OUTPUT_FILE,
+        help=f"Fichier des données nettoyées (défaut: '{CLEAN_OUTPUT_FILE}')"
+    )
+    parser.add_argument(
+        '-f', '--format',
+        choices=OUTPUT_FORMATS,
+        default=OUTPUT_FORMAT,
+        help=f"Format de sortie : 'csv' ou 'parquet' colonnaire (défaut: '{OUTPUT_FORMAT}')"
+    )
+    parser.add_argument(
+        '--report',
+        type=str,
+        default=REPORT_FILE,
+        help=f"Fichier du rapport qualité (défaut: '{REPORT_FILE}')"
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.FileHandler(args.report, mode='w'),
+            logging.StreamHandler()
+        ]
+    )
+
     logging.info(f"--- Démarrage du Pipeline de Nettoyage ---")
-    logging.info(f"Source: {INPUT_FILE} | Rapport: {REPORT_FILE}")
+    logging.info(f"Source: {args.input} | Rapport: {args.report}")
 
-    df_clean, validation_metrics = load_and_validate_data(INPUT_FILE, INPUT_FORMAT)
+    # Anomalies de prix signalées pendant la validation, au fil des enregistrements valides
+    detector = create_price_anomaly_detector(args.group_field) if args.anomaly_method == 'robust' else None
+    on_valid = detector.update if detector else None
 
-    df_final, analysis_metrics = analyze_and_clean_dataframe(df_clean)
+    if args.input_format == 'jsonl' and args.workers > 1:
+        df_clean, validation_metrics = load_and_validate_data_parallel(args.input, args.workers, args.mode, on_valid=on_valid)
+    else:
+        df_clean, validation_metrics = load_and_validate_data(args.input, args.input_format, args.mode, on_valid=on_valid)
+
+    df_final, analysis_metrics = analyze_and_clean_dataframe(df_clean, detector, args.anomaly_method, args.group_field)
 
     generate_quality_report(validation_metrics, analysis_metrics)
-    
+
     if not df_final.empty:
+        clean_output_file = output_path(args.output, args.format)
         try:
-            df_final.to_csv(CLEAN_OUTPUT_FILE, index=False, encoding='utf-8-sig')
-            logging.info(f"Données nettoyées sauvegardées dans : {CLEAN_OUTPUT_FILE}")
-        except IOError as e:
-            logging.error(f"Impossible de sauvegarder le CSV propre : {e}")
+            write_dataframe(df_final, clean_output_file, args.format)
+            logging.info(f"Données nettoyées sauvegardées dans : {clean_output_file}")
+        except (IOError, ImportError) as e:
+            logging.error(f"Impossible de sauvegarder les données propres : {e}")
     else:
         logging.warning("Aucune donnée valide n'a été sauvegardée.")
-        
-    logging.info("--- Pipeline Terminé ---")
\ No newline at end of file
+
+    logging.info("--- Pipeline Terminé ---")
+
+
+if __name__ == "__main__":
+    main()
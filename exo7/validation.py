@@ -0,0 +1,240 @@
+import json
+import mmap
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from pydantic import BaseModel, Field, ValidationError, field_validator
+from typing import Optional
+
+URL_PREFIXES = ('http://', 'https://')
+
+# Nombre d'exemples d'enregistrements invalides renvoyés par chaque shard
+SHARD_EXAMPLES = 5
+
+# Au-delà de 2**53, un entier n'est plus représentable exactement en float64 :
+# ces valeurs (rarissimes) passent par le chemin pydantic.
+MAX_EXACT_INT = 2 ** 53
+
+_MISSING = object()
+
+
+class BookModel(BaseModel):
+
+    titre: str = Field(min_length=1)
+    url_detail: str
+    # Infinity est un float > 0 valide pour JSON : refusé explicitement
+    prix_gbp: float = Field(gt=0, allow_inf_nan=False)
+    note_sur_5: int = Field(ge=0, le=5)
+    description: Optional[str] = None
+    stock_disponible: int = Field(ge=0)
+    url_image_hd: str
+
+    @field_validator('titre', 'description')
+    def clean_text(cls, v):
+        if v is None:
+            return v
+        v = v.strip()
+        v = " ".join(v.split())
+        return v
+
+    @field_validator('url_detail', 'url_image_hd')
+    def check_url_format(cls, v):
+        if not v.startswith(('http://', 'https://')):
+            raise ValueError('URL doit commencer par http:// ou https://')
+        return v
+
+
+def _column(records, field):
+    return [record.get(field, _MISSING) for record in records]
+
+def _type_mask(values, allowed_types):
+    return np.fromiter((type(v) in allowed_types for v in values), dtype=bool, count=len(values))
+
+def _numeric_column(values, allowed_types):
+    # Entiers hors de la plage des float64 (ex: 10**400) : chemin pydantic, qui les rejette proprement
+    mask = np.fromiter(
+        (type(v) in allowed_types and (type(v) is not int or abs(v) <= sys.float_info.max) for v in values),
+        dtype=bool,
+        count=len(values)
+    )
+    array = np.zeros(len(values), dtype=np.float64)
+    array[mask] = np.fromiter((v for v, ok in zip(values, mask) if ok), dtype=np.float64, count=int(mask.sum()))
+    return array, mask
+
+def _object_column(values):
+    return np.fromiter(values, dtype=object, count=len(values))
+
+def _url_mask(values):
+    return np.fromiter(
+        (type(v) is str and v.startswith(URL_PREFIXES) for v in values),
+        dtype=bool,
+        count=len(values)
+    )
+
+def _normalize_whitespace(values):
+    return [" ".join(v.split()) if v is not None else None for v in values]
+
+def _emit_records(df, on_valid):
+    columns = list(df.columns)
+    for row in zip(*(df[column].tolist() for column in columns)):
+        on_valid(dict(zip(columns, row)))
+
+def validate_record_by_record(raw_data, on_valid=None):
+    valid_records = []
+    invalid_records_details = []
+    error_counts = {}
+
+    for i, record in enumerate(raw_data):
+        try:
+            clean_record = BookModel.model_validate(record).model_dump()
+            valid_records.append(clean_record)
+            if on_valid:
+                on_valid(clean_record)
+
+        except ValidationError as e:
+            errors = e.errors()
+            invalid_records_details.append({'index': i, 'record': record, 'errors': errors})
+            for error in errors:
+                field = error['loc'][0] if error['loc'] else 'unknown_field'
+                error_counts[field] = error_counts.get(field, 0) + 1
+
+    return pd.DataFrame(valid_records), invalid_records_details, error_counts
+
+def validate_batch(raw_data, on_valid=None):
+    """Valide les enregistrements colonne par colonne.
+
+    Les lignes qui passent les contrôles vectorisés sont nettoyées en bloc ;
+    les autres sont revalidées une à une par BookModel, ce qui garantit des
+    messages d'erreur identiques au chemin enregistrement par enregistrement.
+    `on_valid` reçoit ensuite chaque enregistrement valide, dans l'ordre d'entrée.
+    """
+    positions = [i for i, record in enumerate(raw_data) if type(record) is dict]
+    records = [raw_data[i] for i in positions]
+
+    prix, prix_ok = _numeric_column(_column(records, 'prix_gbp'), (int, float))
+    note, note_ok = _numeric_column(_column(records, 'note_sur_5'), (int,))
+    stock, stock_ok = _numeric_column(_column(records, 'stock_disponible'), (int,))
+
+    with np.errstate(invalid='ignore'):
+        fast_mask = prix_ok & (prix > 0) & np.isfinite(prix)
+        fast_mask &= note_ok & (note >= 0) & (note <= 5)
+        fast_mask &= stock_ok & (stock >= 0) & (stock < MAX_EXACT_INT)
+
+    titres = _object_column(_column(records, 'titre'))
+    fast_mask &= _type_mask(titres, (str,))
+    fast_mask[fast_mask] &= np.fromiter((len(v) >= 1 for v in titres[fast_mask]), dtype=bool)
+
+    descriptions = _object_column(
+        [None if v is _MISSING else v for v in _column(records, 'description')]
+    )
+    fast_mask &= _type_mask(descriptions, (str, type(None)))
+
+    urls_detail = _object_column(_column(records, 'url_detail'))
+    urls_image = _object_column(_column(records, 'url_image_hd'))
+    fast_mask &= _url_mask(urls_detail) & _url_mask(urls_image)
+
+    fast_index = np.asarray(positions, dtype=np.int64)[fast_mask]
+    fast_df = pd.DataFrame({
+        'titre': _normalize_whitespace(titres[fast_mask]),
+        'url_detail': urls_detail[fast_mask],
+        'prix_gbp': prix[fast_mask],
+        'note_sur_5': note[fast_mask].astype(np.int64),
+        'description': _normalize_whitespace(descriptions[fast_mask]),
+        'stock_disponible': stock[fast_mask].astype(np.int64),
+        'url_image_hd': urls_image[fast_mask],
+    }, index=fast_index)
+
+    fast_positions = set(fast_index.tolist())
+    slow_positions = [i for i in range(len(raw_data)) if i not in fast_positions]
+
+    slow_records = []
+    slow_index = []
+    invalid_records_details = []
+    error_counts = {}
+
+    for i in slow_positions:
+        record = raw_data[i]
+        try:
+            slow_records.append(BookModel.model_validate(record).model_dump())
+            slow_index.append(i)
+        except ValidationError as e:
+            errors = e.errors()
+            invalid_records_details.append({'index': i, 'record': record, 'errors': errors})
+            for error in errors:
+                field = error['loc'][0] if error['loc'] else 'unknown_field'
+                error_counts[field] = error_counts.get(field, 0) + 1
+
+    if slow_records:
+        slow_df = pd.DataFrame(slow_records, index=slow_index)
+        valid_df = pd.concat([fast_df, slow_df]).sort_index() if len(fast_df) else slow_df
+    else:
+        valid_df = fast_df
+
+    valid_df = valid_df.reset_index(drop=True)
+    if on_valid:
+        _emit_records(valid_df, on_valid)
+    return valid_df, invalid_records_details, error_counts
+
+
+def find_shard_boundaries(filepath, shard_count):
+    """Découpe le fichier en plages d'octets [début, fin) alignées sur les fins de ligne."""
+    with open(filepath, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return []
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            starts = [0]
+            for k in range(1, shard_count):
+                target = size * k // shard_count
+                newline = mm.find(b'\n', max(target - 1, starts[-1]))
+                if newline == -1:
+                    break
+                if newline + 1 < size and newline + 1 > starts[-1]:
+                    starts.append(newline + 1)
+    return list(zip(starts, starts[1:] + [size]))
+
+def validate_shard(filepath, start, end, mode='batch'):
+    with open(filepath, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            raw_data = [json.loads(line) for line in mm[start:end].splitlines()]
+
+    validator = validate_batch if mode == 'batch' else validate_record_by_record
+    valid_df, invalid_records_details, error_counts = validator(raw_data)
+    return len(raw_data), valid_df, len(invalid_records_details), invalid_records_details[:SHARD_EXAMPLES], error_counts
+
+def validate_jsonl_parallel(filepath, workers, mode='batch', on_valid=None):
+    """Valide un fichier JSONL par shards dans un pool de processus.
+
+    Chaque processus relit sa plage d'octets via mmap : seuls les résultats
+    (DataFrame valide, compteurs, exemples d'erreurs) transitent entre processus.
+    `on_valid` reçoit les enregistrements valides de chaque shard dès son retour,
+    shard après shard dans l'ordre du fichier.
+    """
+    boundaries = find_shard_boundaries(filepath, workers)
+
+    total_records = 0
+    invalid_count = 0
+    valid_frames = []
+    invalid_examples = []
+    error_counts = {}
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(validate_shard, filepath, start, end, mode) for start, end in boundaries]
+        for future in futures:
+            line_count, valid_df, shard_invalid_count, examples, shard_errors = future.result()
+            if on_valid:
+                _emit_records(valid_df, on_valid)
+            for example in examples:
+                invalid_examples.append({**example, 'index': example['index'] + total_records})
+            for field, count in shard_errors.items():
+                error_counts[field] = error_counts.get(field, 0) + count
+            valid_frames.append(valid_df)
+            total_records += line_count
+            invalid_count += shard_invalid_count
+
+    valid_frames = [df for df in valid_frames if not df.empty]
+    valid_df = pd.concat(valid_frames, ignore_index=True) if valid_frames else pd.DataFrame()
+    return total_records, valid_df, invalid_count, invalid_examples, error_counts
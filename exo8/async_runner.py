@@ -0,0 +1,119 @@
+import asyncio
+import logging
+import time
+
+import aiohttp
+
+USER_AGENT = "MultiSourceScraper-Bot-v1.0"
+
+
+def _parse(scraper, content, url):
+    soup = scraper.build_document(content, url)
+    return soup, scraper.parse_page(soup)
+
+async def fetch_and_parse(client, scraper, url):
+    try:
+        async with client.get(url) as response:
+            response.raise_for_status()
+            content = await response.read()
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        logging.error(f"[{scraper.name}] Erreur HTTP pour {url}: {e}")
+        return None, None
+
+    # Le parsing (CPU) est déporté hors de la boucle pour ne pas bloquer les autres téléchargements
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, _parse, scraper, content, url)
+
+async def _emit(scraper, page_data, all_data):
+    # Le sink peut bloquer (back-pressure) : on attend dans un thread plutôt que dans la boucle
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(None, scraper.emit, page_data, all_data)
+
+async def _scrape_sequential(client, scraper):
+    all_data = []
+    current_page_url = scraper.base_url
+    pages_scraped = 0
+
+    while current_page_url and pages_scraped < scraper.max_pages:
+        logging.info(f"[{scraper.name}] Scraping de : {current_page_url}")
+        soup, page_data = await fetch_and_parse(client, scraper, current_page_url)
+        if soup is None:
+            break
+
+        await _emit(scraper, page_data, all_data)
+        logging.info(f"[{scraper.name}] {len(page_data)} items trouvés sur la page.")
+
+        pages_scraped += 1
+        current_page_url = scraper.get_next_page_url(soup, current_page_url)
+        await asyncio.sleep(scraper.request_delay)
+
+    return all_data
+
+async def _scrape_concurrent(client, scraper):
+    all_data = []
+    # Pages terminées en attente : seul le préfixe contigu est émis, dans l'ordre des pages
+    pages_data = {}
+    in_flight = {}
+    next_page = 1
+    next_to_emit = 1
+    last_page = scraper.max_pages
+
+    while in_flight or next_page <= last_page:
+        while next_page <= last_page and len(in_flight) < scraper.concurrency:
+            page_url = scraper.page_url_pattern.format(page=next_page)
+            logging.info(f"[{scraper.name}] Scraping de : {page_url}")
+            task = asyncio.ensure_future(fetch_and_parse(client, scraper, page_url))
+            in_flight[task] = next_page
+            next_page += 1
+            await asyncio.sleep(scraper.request_delay)
+
+        done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            page = in_flight.pop(task)
+            _, page_data = task.result()
+            if not page_data:
+                last_page = min(last_page, page - 1)
+                continue
+            logging.info(f"[{scraper.name}] {len(page_data)} items trouvés sur la page {page}.")
+            pages_data[page] = page_data
+
+        while next_to_emit <= last_page and next_to_emit in pages_data:
+            await _emit(scraper, pages_data.pop(next_to_emit), all_data)
+            next_to_emit += 1
+
+    return all_data
+
+async def scrape_async(client, scraper):
+    if scraper.page_url_pattern and scraper.concurrency > 1:
+        return await _scrape_concurrent(client, scraper)
+    return await _scrape_sequential(client, scraper)
+
+async def _run_all(scrapers, settings):
+    connector = aiohttp.TCPConnector(
+        limit=settings.get('max_connections', 100),
+        limit_per_host=settings.get('max_connections_per_host', 8),
+        keepalive_timeout=settings.get('keepalive_timeout', 30),
+        ttl_dns_cache=300
+    )
+    timeout = aiohttp.ClientTimeout(total=settings.get('request_timeout', 10))
+
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout, headers={"User-Agent": USER_AGENT}) as client:
+
+        async def timed_scrape(scraper):
+            start_time = time.time()
+            try:
+                await scrape_async(client, scraper)
+                return scraper, time.time() - start_time, None
+            except Exception as e:
+                return scraper, time.time() - start_time, e
+
+        return await asyncio.gather(*(timed_scrape(scraper) for scraper in scrapers))
+
+def run_async_scrapers(scrapers, settings):
+    """Exécute tous les scrapers sur une seule boucle asyncio et un client HTTP partagé.
+
+    Le contrat des sous-classes (parse_page / get_next_page_url) est inchangé :
+    seul le téléchargement passe par aiohttp, avec des connexions keep-alive
+    limitées globalement et par hôte.
+    """
+    return asyncio.run(_run_all(scrapers, settings))
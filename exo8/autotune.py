@@ -0,0 +1,165 @@
+import logging
+import threading
+import time
+
+
+class AdaptiveLimit:
+    """Sémaphore dont la limite peut être modifiée pendant l'exécution."""
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.in_use = 0
+        self._condition = threading.Condition()
+
+    def acquire(self):
+        with self._condition:
+            while self.in_use >= self.limit:
+                self._condition.wait()
+            self.in_use += 1
+
+    def release(self):
+        with self._condition:
+            self.in_use -= 1
+            self._condition.notify()
+
+    def set_limit(self, limit):
+        with self._condition:
+            self.limit = limit
+            self._condition.notify_all()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+
+
+class ThroughputMetrics:
+    """Compteurs de la fenêtre courante : requêtes, erreurs, latences et items."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset(time.time())
+
+    def _reset(self, now):
+        self.window_start = now
+        self.requests = 0
+        self.errors = 0
+        self.items = 0
+        self.latencies = []
+
+    def record_request(self, latency, ok):
+        with self._lock:
+            self.requests += 1
+            self.latencies.append(latency)
+            if not ok:
+                self.errors += 1
+
+    def record_items(self, count):
+        with self._lock:
+            self.items += count
+
+    def snapshot(self):
+        """Renvoie les mesures de la fenêtre écoulée et en ouvre une nouvelle."""
+        with self._lock:
+            now = time.time()
+            elapsed = max(now - self.window_start, 1e-6)
+            latencies = sorted(self.latencies)
+            p95 = latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))] if latencies else None
+            stats = {
+                "items_per_sec": self.items / elapsed,
+                "requests": self.requests,
+                "error_rate": self.errors / self.requests if self.requests else 0.0,
+                "latency_p95_sec": p95,
+            }
+            self._reset(now)
+        return stats
+
+
+class ConcurrencyAutotuner:
+    """Ajuste la limite de requêtes simultanées par hill-climbing sur le débit (items/s).
+
+    Tant que le taux d'erreur reste sous `error_budget` (et la latence p95 sous
+    `latency_p95_max`), la limite avance dans la direction qui a amélioré le
+    débit et repart en sens inverse quand il baisse ; un dépassement du budget
+    provoque une réduction multiplicative.
+    """
+
+    def __init__(self, limit, metrics, min_limit=1, max_limit=32, interval=5.0, step=1,
+                 error_budget=0.05, latency_p95_max=None, tolerance=0.05, backoff=0.7):
+        self.limit = limit
+        self.metrics = metrics
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.interval = interval
+        self.step = step
+        self.error_budget = error_budget
+        self.latency_p95_max = latency_p95_max
+        self.tolerance = tolerance
+        self.backoff = backoff
+        self.direction = 1
+        self.last_throughput = None
+        self.decisions = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='autotuner', daemon=True)
+
+    def decide(self, stats):
+        current = self.limit.limit
+        throughput = stats['items_per_sec']
+
+        if stats['requests'] == 0:
+            return current, "aucune requête sur la période"
+
+        if stats['error_rate'] > self.error_budget:
+            self.direction = 1
+            self.last_throughput = None
+            return max(self.min_limit, int(current * self.backoff)), f"taux d'erreur {stats['error_rate']:.1%} > budget {self.error_budget:.1%}"
+
+        if self.latency_p95_max and stats['latency_p95_sec'] and stats['latency_p95_sec'] > self.latency_p95_max:
+            self.direction = -1
+            self.last_throughput = throughput
+            return max(self.min_limit, current - self.step), f"latence p95 {stats['latency_p95_sec']:.2f}s > {self.latency_p95_max}s"
+
+        if self.last_throughput is None:
+            reason = "première mesure"
+        elif throughput > self.last_throughput * (1 + self.tolerance):
+            reason = "débit en hausse, on continue"
+        elif throughput < self.last_throughput * (1 - self.tolerance):
+            self.direction = -self.direction
+            reason = "débit en baisse, on inverse"
+        else:
+            reason = "débit stable, on explore"
+
+        self.last_throughput = throughput
+        new_limit = min(self.max_limit, max(self.min_limit, current + self.direction * self.step))
+        if new_limit == current:
+            # Borne atteinte : on repart dans l'autre sens à la prochaine décision
+            self.direction = -self.direction
+        return new_limit, reason
+
+    def tick(self):
+        stats = self.metrics.snapshot()
+        current = self.limit.limit
+        new_limit, reason = self.decide(stats)
+        if new_limit != current:
+            self.limit.set_limit(new_limit)
+
+        p95 = f"{stats['latency_p95_sec']:.2f}s" if stats['latency_p95_sec'] is not None else "N/A"
+        logging.info(
+            f"[autotune] {stats['items_per_sec']:.1f} items/s, p95 {p95}, erreurs {stats['error_rate']:.1%} "
+            f"-> limite {current} => {new_limit} ({reason})"
+        )
+        self.decisions.append({**stats, "limit_before": current, "limit_after": new_limit, "reason": reason})
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.tick()
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
@@ -1,154 +1,74 @@
-import requests
-from bs4 import BeautifulSoup
-from urllib.parse import urljoin
-import yaml
-import json
 import time
 import logging
-import re
-from abc import ABC, abstractmethod
+import os
+import sys
+import argparse
+import multiprocessing
 from concurrent.futures import ThreadPoolExecutor, as_completed
+from sink import AggregatedSink
+from work_queue import open_queue
+from autotune import AdaptiveLimit, ThroughputMetrics, ConcurrencyAutotuner
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from common.plugins import PluginRegistry, load_object
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 
 
-class BaseScraper(ABC):
-
-    def __init__(self, name, config):
-        self.name = name
-        self.config = config
-        self.base_url = config['url']
-        self.max_pages = config.get('max_pages', 1)
-        self.session = requests.Session()
-        self.session.headers.update({"User-Agent": "MultiSourceScraper-Bot-v1.0"})
-        logging.info(f"[{self.name}] Module initialisé.")
-
-    def _get_soup(self, url):
-        try:
-            response = self.session.get(url, timeout=10)
-            response.raise_for_status()
-            return BeautifulSoup(response.content, 'lxml')
-        except requests.RequestException as e:
-            logging.error(f"[{self.name}] Erreur HTTP pour {url}: {e}")
-            return None
-
-    @abstractmethod
-    def parse_page(self, soup):
-        pass
-
-    @abstractmethod
-    def get_next_page_url(self, soup, current_url):
-        pass
-
-    def scrape(self):
-        all_data = []
-        current_page_url = self.base_url
-        pages_scraped = 0
-        
-        while current_page_url and pages_scraped < self.max_pages:
-            logging.info(f"[{self.name}] Scraping de : {current_page_url}")
-            soup = self._get_soup(current_page_url)
-            if not soup:
-                break
-                
-            page_data = self.parse_page(soup)
-            all_data.extend(page_data)
-            logging.info(f"[{self.name}] {len(page_data)} items trouvés sur la page.")
-            
-            pages_scraped += 1
-            current_page_url = self.get_next_page_url(soup, current_page_url)
-            time.sleep(0.1)
-            
-        return all_data
-
-class BooksScraper(BaseScraper):
-    
-    def parse_page(self, soup):
-        unified_data = []
-        for article in soup.find_all('article', class_='product_pod'):
-            title = article.find('h3').find('a')['title']
-            url = urljoin(self.base_url, "catalogue/" + article.find('h3').find('a')['href'].replace('../', ''))
-            price = article.find('p', class_='price_color').text.strip()
-            
-            unified_data.append({
-                "source": self.name,
-                "title": title,
-                "url": url,
-                "content": f"Prix: {price}",
-                "metadata": {"price_gbp": float(price.replace('£', ''))}
-            })
-        return unified_data
-
-    def get_next_page_url(self, soup, current_url):
-        next_tag = soup.find('li', class_='next')
-        if next_tag:
-            next_url = next_tag.find('a')['href']
-            return urljoin(self.base_url, "catalogue/" + next_url)
-        return None
+class PageScheduler:
+    """Pool de threads partagé par tous les scrapers pour le téléchargement des pages.
 
-class QuotesScraper(BaseScraper):
-
-    def parse_page(self, soup):
-        unified_data = []
-        for quote in soup.find_all('div', class_='quote'):
-            text = quote.find('span', class_='text').text.strip()
-            author = quote.find('small', class_='author').text.strip()
-            author_url = urljoin(self.base_url, quote.find('a')['href'])
-            
-            unified_data.append({
-                "source": self.name,
-                "title": f"Citation de {author}",
-                "url": author_url,
-                "content": text,
-                "metadata": {"author": author}
-            })
-        return unified_data
-
-    def get_next_page_url(self, soup, current_url):
-        next_tag = soup.find('li', class_='next')
-        if next_tag:
-            return urljoin(self.base_url, next_tag.find('a')['href'])
-        return None
+    La limite globale (`max_connections`) borne le nombre de requêtes simultanées ;
+    chaque scraper y soumet au plus `concurrency` pages à la fois, si bien qu'une
+    grosse source profite des threads laissés libres par les petites.
+    La limite est une `AdaptiveLimit` que l'autotuner peut déplacer en cours de
+    run, jusqu'à `pool_size` threads. En mode `adaptive`, la fenêtre de chaque
+    scraper suit cette limite au lieu de son `concurrency` fixe.
+    """
 
-class JobsScraper(BaseScraper):
-
-    def parse_page(self, soup):
-        unified_data = []
-        keyword = self.config.get('filter_keyword')
-        
-        for card in soup.find_all('div', class_='card-content'):
-            title = card.find('h2', class_='title').text.strip()
-            
-            if keyword and keyword.lower() not in title.lower():
-                continue
-                
-            company = card.find('h3', class_='company').text.strip()
-            location = card.find('p', class_='location').text.strip()
-            url = card.find('a', string=re.compile(r'Apply|Learn More'))['href']
-            
-            unified_data.append({
-                "source": self.name,
-                "title": title,
-                "url": url,
-                "content": f"Entreprise: {company} | Lieu: {location}",
-                "metadata": {"company": company, "location": location}
-            })
-        return unified_data
-
-    def get_next_page_url(self, soup, current_url):
-        return None
+    def __init__(self, max_connections, pool_size=None, adaptive=False):
+        self.max_connections = max_connections
+        self.adaptive = adaptive
+        self.limit = AdaptiveLimit(max_connections)
+        self.metrics = ThroughputMetrics()
+        self.executor = ThreadPoolExecutor(max_workers=pool_size or max_connections, thread_name_prefix='page')
+
+    def run(self, fn, *args):
+        with self.limit:
+            return fn(*args)
+
+    def submit(self, fn, *args):
+        return self.executor.submit(self.run, fn, *args)
 
-SCRAPER_MAP = {
-    'books': BooksScraper,
-    'quotes': QuotesScraper,
-    'jobs': JobsScraper,
-}
+    def window(self, concurrency):
+        """Pages qu'un scraper peut avoir en vol : son `concurrency`, ou la limite courante si adaptative."""
+        return self.limit.limit if self.adaptive else concurrency
+
+    def shutdown(self):
+        self.executor.shutdown(wait=True)
+
+
+# Scrapers intégrés, importés seulement s'ils sont utilisés. Une source peut aussi
+# désigner sa classe par `plugin: "module:Classe"` dans config.yaml, et un paquet
+# installé peut en ajouter via le groupe d'entry points 'exo8.scrapers'.
+SCRAPER_REGISTRY = PluginRegistry('exo8.scrapers', {
+    'books': 'scrapers:BooksScraper',
+    'quotes': 'scrapers:QuotesScraper',
+    'jobs': 'scrapers:JobsScraper',
+    'rules': 'scrapers:RuleScraper',
+})
+
+def load_config(config_path='config.yaml', offline=False):
+    import yaml
 
-def load_config(config_path='config.yaml'):
     logging.info(f"Chargement de la configuration depuis {config_path}")
     try:
         with open(config_path, 'r') as f:
-            return yaml.safe_load(f)
+            config = yaml.safe_load(f)
+        if offline:
+            # Mode hors ligne : tout est servi depuis le cache HTTP, sans aucune requête réseau
+            config['settings']['http_cache'] = {**(config['settings'].get('http_cache') or {}), 'enabled': True, 'offline': True}
+        return config
     except FileNotFoundError:
         logging.error(f"Erreur: {config_path} non trouvé.")
         return None
@@ -156,56 +76,265 @@ def load_config(config_path='config.yaml'):
         logging.error(f"Erreur lors du parsing YAML: {e}")
         return None
 
-def run_orchestrator():
-    config = load_config()
-    if not config:
-        return
+def resolve_scraper_class(key, scraper_config):
+    if scraper_config.get('plugin'):
+        return load_object(scraper_config['plugin'])
+    name = scraper_config.get('type', key)
+    if name in SCRAPER_REGISTRY:
+        return SCRAPER_REGISTRY.load(name)
+    return None
 
-    all_scraped_data = []
-    performance_report = []
-    
-    max_workers = config['settings'].get('max_workers', 3)
+def open_warc_writer(settings, suffix=None):
+    """Archive WARC des réponses brutes (settings.warc), une par processus ; None si désactivée."""
+    warc_settings = settings.get('warc') or {}
+    if not warc_settings.get('enabled', False):
+        return None
+    from common.warc import WarcWriter
+
+    path = warc_settings.get('path', 'archive.warc.gz')
+    if suffix:
+        root = path[:-len('.warc.gz')] if path.endswith('.warc.gz') else path
+        path = f"{root}.{suffix}.warc.gz"
+    logging.info(f"Archivage WARC des réponses dans {path}")
+    return WarcWriter(path)
+
+def build_scrapers(config, scheduler=None, sink=None, warc_writer=None):
+    http_cache = config['settings'].get('http_cache') or {}
+    http2 = config['settings'].get('http2', False)
+    scrapers = []
+    for key, scraper_config in config['scrapers'].items():
+        if scraper_config.get('enabled', False):
+            # settings.http2 s'applique à toutes les sources, sauf `http2` explicite dans la source
+            scraper_config = {'http2': http2, **scraper_config}
+            ScraperClass = resolve_scraper_class(key, scraper_config)
+            if ScraperClass:
+                scraper_instance = ScraperClass(scraper_config['name'], scraper_config, scheduler)
+                scraper_instance.sink = sink
+                if http_cache.get('enabled', False):
+                    scraper_instance.use_http_cache(http_cache)
+                if warc_writer:
+                    warc_writer.install(scraper_instance.session)
+                scrapers.append(scraper_instance)
+            else:
+                logging.warning(f"Clé de scraper '{key}' inconnue. Ignoré.")
+    return scrapers
+
+def _timed_scrape(scraper):
+    start_time = time.time()
+    result_data = scraper.scrape()
+    return result_data, time.time() - start_time
+
+def reachable_parallelism(scrapers):
+    """Requêtes simultanées atteignables quand toutes les sources tournent ensemble.
+
+    Une source paginée par modèle d'URL peut avoir toutes ses pages en vol ; une source
+    qui suit le lien "suivant" n'en a qu'une à la fois.
+    """
+    return max(1, sum(scraper.max_pages if scraper.page_url_pattern else 1 for scraper in scrapers))
+
+def start_autotuner(scheduler, autotune_config, max_limit):
+    autotuner = ConcurrencyAutotuner(
+        scheduler.limit,
+        scheduler.metrics,
+        min_limit=min(autotune_config.get('min_connections', 1), max_limit),
+        max_limit=max_limit,
+        interval=autotune_config.get('interval_sec', 5),
+        step=autotune_config.get('step', 1),
+        error_budget=autotune_config.get('error_budget', 0.05),
+        latency_p95_max=autotune_config.get('latency_p95_max_sec')
+    )
+    logging.info(f"Autotuning activé : limite initiale {scheduler.limit.limit}, bornes [{autotuner.min_limit}, {autotuner.max_limit}]")
+    return autotuner.start()
+
+def run_threaded_scrapers(config, sink, warc_writer=None):
+    settings = config['settings']
+    max_workers = settings.get('max_workers', 3)
+    autotune_config = settings.get('autotune') or {}
+    max_connections = settings.get('max_connections', max_workers)
+    autotune = autotune_config.get('enabled', False)
+    max_limit = autotune_config.get('max_connections', 32)
+    if autotune:
+        # Threads créés jusqu'à la borne haute ; la limite effective est pilotée par l'autotuner
+        scheduler = PageScheduler(max_connections, max(max_connections, max_limit), adaptive=True)
+    else:
+        scheduler = PageScheduler(max_connections)
+    scrapers = build_scrapers(config, scheduler, sink, warc_writer)
+    autotuner = None
+    if autotune:
+        # Toutes les sources tournent ensemble et leurs fenêtres suivent la limite : l'autotuner
+        # pilote seul le parallélisme, borné par les pages réellement disponibles
+        max_workers = max(1, len(scrapers))
+        reachable = reachable_parallelism(scrapers)
+        if reachable < max_limit:
+            logging.info(f"Autotuning : borne haute ramenée de {max_limit} à {reachable} (pages à télécharger).")
+            max_limit = reachable
+        scheduler.limit.set_limit(min(max_connections, max_limit))
+        autotuner = start_autotuner(scheduler, autotune_config, max_limit)
 
     with ThreadPoolExecutor(max_workers=max_workers) as executor:
         futures = {}
-
-        for key, scraper_config in config['scrapers'].items():
-            if scraper_config.get('enabled', False):
-                if key in SCRAPER_MAP:
-                    ScraperClass = SCRAPER_MAP[key]
-                    scraper_instance = ScraperClass(scraper_config['name'], scraper_config)
-                    future = executor.submit(scraper_instance.scrape)
-                    futures[future] = scraper_config['name']
-                else:
-                    logging.warning(f"Clé de scraper '{key}' inconnue. Ignoré.")
+        for scraper_instance in scrapers:
+            future = executor.submit(_timed_scrape, scraper_instance)
+            futures[future] = scraper_instance
 
         for future in as_completed(futures):
-            name = futures[future]
+            scraper_instance = futures[future]
             try:
-                start_time = time.time()
-                result_data = future.result()
-                duration = time.time() - start_time
-                
-                all_scraped_data.extend(result_data)
-
-                performance_report.append({
-                    "source": name,
-                    "items_trouves": len(result_data),
-                    "temps_exec_sec": round(duration, 2)
-                })
-                logging.info(f"[{name}] Tâche terminée, {len(result_data)} items récupérés.")
-                
+                _, duration = future.result()
+                yield scraper_instance, duration, None
             except Exception as e:
-                logging.error(f"[{name}] Échec de la tâche de scraping : {e}")
-                performance_report.append({"source": name, "items_trouves": 0, "error": str(e)})
+                yield scraper_instance, None, e
 
-    output_file = config['settings'].get('output_file', 'aggregated_data.json')
-    try:
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(all_scraped_data, f, indent=4, ensure_ascii=False)
-        logging.info(f"Agrégation terminée. {len(all_scraped_data)} items sauvegardés dans {output_file}")
-    except IOError as e:
-        logging.error(f"Impossible de sauvegarder le JSON agrégé : {e}")
+    if autotuner:
+        autotuner.stop()
+        logging.info(f"Autotuning : {len(autotuner.decisions)} décisions, limite finale {scheduler.limit.limit}")
+    scheduler.shutdown()
+
+def enqueue_page_tasks(config, work_queue):
+    # La déduplication vaut pour un run : les pages terminées lors d'un run précédent sont reprises
+    cleared = work_queue.clear_finished()
+    if cleared:
+        logging.info(f"{cleared} tâches d'un run précédent retirées de la file.")
+
+    enqueued = 0
+    for scraper_instance in build_scrapers(config):
+        if scraper_instance.page_url_pattern:
+            # Pages connues d'avance : toutes mises en file, réparties entre les workers
+            pages = range(1, scraper_instance.max_pages + 1)
+            tasks = [(page, scraper_instance.page_url_pattern.format(page=page)) for page in pages]
+        else:
+            # Pagination par lien "suivant" : chaque worker met en file la page suivante
+            tasks = [(1, scraper_instance.base_url)]
+        for page, url in tasks:
+            enqueued += work_queue.enqueue({"source": scraper_instance.name, "url": url, "page": page})
+    if enqueued:
+        logging.info(f"{enqueued} tâches de pages mises en file.")
+    else:
+        logging.warning("Aucune nouvelle tâche mise en file (aucune source configurée, ou pages encore en attente d'un run interrompu).")
+    return enqueued
+
+def run_worker(queue_url, worker_id, config_path='config.yaml', lease_seconds=60, poll_interval=1.0, offline=False):
+    config = load_config(config_path, offline)
+    if not config:
+        return
+
+    work_queue = open_queue(queue_url)
+    settings = config['settings']
+    output_root, _ = os.path.splitext(settings.get('output_file', 'aggregated_data.json'))
+    output_file = f"{output_root}.{worker_id}.ndjson"
+    sink = AggregatedSink(output_file, 'ndjson', settings.get('sink_queue_size', 1000)).start()
+    warc_writer = open_warc_writer(settings, worker_id)
+    scrapers = {scraper_instance.name: scraper_instance for scraper_instance in build_scrapers(config, sink=sink, warc_writer=warc_writer)}
+    pages_done = 0
+
+    while True:
+        leased = work_queue.lease(worker_id, lease_seconds)
+        if leased is None:
+            # Des tâches encore louées par d'autres workers peuvent en produire de nouvelles
+            if work_queue.remaining() == 0:
+                break
+            time.sleep(poll_interval)
+            continue
+
+        task_id, task = leased
+        scraper_instance = scrapers.get(task['source'])
+        if scraper_instance is None:
+            logging.warning(f"[{worker_id}] Source '{task['source']}' absente de la configuration. Tâche ignorée.")
+            work_queue.ack(task_id)
+            continue
+
+        logging.info(f"[{scraper_instance.name}] ({worker_id}) Scraping de : {task['url']}")
+        soup = scraper_instance._get_soup(task['url'])
+        if soup is not None:
+            page_data = scraper_instance.parse_page(soup)
+            scraper_instance.emit(page_data, None)
+            logging.info(f"[{scraper_instance.name}] ({worker_id}) {len(page_data)} items trouvés sur la page {task['page']}.")
+            if not scraper_instance.page_url_pattern and task['page'] < scraper_instance.max_pages:
+                next_url = scraper_instance.get_next_page_url(soup, task['url'])
+                if next_url:
+                    work_queue.enqueue({"source": task['source'], "url": next_url, "page": task['page'] + 1})
+
+        work_queue.ack(task_id)
+        pages_done += 1
+        time.sleep(scraper_instance.request_delay)
+
+    sink.close()
+    if warc_writer:
+        warc_writer.close()
+    logging.info(f"[{worker_id}] Worker terminé : {pages_done} pages, {sink.items_written} items sauvegardés dans {output_file}")
+
+def run_distributed(queue_url, workers, offline=False):
+    config = load_config(offline=offline)
+    if not config:
+        return
+
+    work_queue = open_queue(queue_url)
+    enqueue_page_tasks(config, work_queue)
+    if work_queue.remaining() == 0:
+        logging.error("File de tâches vide : aucun worker lancé.")
+        return
+
+    processes = [
+        multiprocessing.Process(target=run_worker, args=(queue_url, f"worker-{i}"), kwargs={'offline': offline}, name=f"worker-{i}")
+        for i in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+def run_orchestrator(offline=False):
+    config = load_config(offline=offline)
+    if not config:
+        return
+
+    performance_report = []
+
+    settings = config['settings']
+    output_file = settings.get('output_file', 'aggregated_data.json')
+    # Les items sont écrits page par page ; 'ndjson' : un item par ligne
+    sink = AggregatedSink(output_file, settings.get('output_format', 'json'), settings.get('sink_queue_size', 1000)).start()
+
+    # 'threads' : un thread par source ; 'async' : boucle asyncio et client aiohttp partagé
+    backend = config['settings'].get('backend', 'threads')
+    if backend == 'async' and (settings.get('http_cache') or {}).get('enabled', False):
+        logging.warning("Cache HTTP activé : backend 'threads' utilisé (le client aiohttp ne passe pas par le cache).")
+        backend = 'threads'
+    if backend == 'async' and (settings.get('warc') or {}).get('enabled', False):
+        logging.warning("Archive WARC activée : backend 'threads' utilisé (le client aiohttp n'est pas archivé).")
+        backend = 'threads'
+    warc_writer = None
+    if backend == 'async':
+        if (settings.get('autotune') or {}).get('enabled', False):
+            logging.warning("L'autotuning n'est disponible qu'avec le backend 'threads'. Ignoré.")
+        from async_runner import run_async_scrapers
+        results = run_async_scrapers(build_scrapers(config, sink=sink), settings)
+    else:
+        warc_writer = open_warc_writer(settings)
+        results = run_threaded_scrapers(config, sink, warc_writer)
+
+    for scraper_instance, duration, error in results:
+        name = scraper_instance.name
+        if error:
+            logging.error(f"[{name}] Échec de la tâche de scraping : {error}")
+            performance_report.append({"source": name, "items_trouves": scraper_instance.items_count, "error": str(error)})
+            continue
+
+        performance_report.append({
+            "source": name,
+            "items_trouves": scraper_instance.items_count,
+            "temps_exec_sec": round(duration, 2)
+        })
+        logging.info(f"[{name}] Tâche terminée, {scraper_instance.items_count} items récupérés ({scraper_instance.cache_hits} pages servies par le cache).")
+
+    sink.close()
+    if warc_writer:
+        warc_writer.close()
+        logging.info(f"{warc_writer.records} réponses archivées dans {warc_writer.path}")
+    if sink.error:
+        logging.error(f"Impossible de sauvegarder le JSON agrégé : {sink.error}")
+    else:
+        logging.info(f"Agrégation terminée. {sink.items_written} items sauvegardés dans {output_file}")
 
     print("\n--- Rapport de Performance ---")
     for report in performance_report:
@@ -213,4 +342,35 @@ def run_orchestrator():
     print("------------------------------")
 
 if __name__ == "__main__":
-    run_orchestrator()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Orchestrateur de scraping multi-sources.")
+    parser.add_argument(
+        '--queue',
+        type=str,
+        help="Mode distribué : URL de la file de tâches (sqlite:///work_queue.sqlite ou redis://hôte:6379/0)"
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=0,
+        help="Mode distribué : nombre de workers locaux lancés après la mise en file (défaut: 0)"
+    )
+    parser.add_argument(
+        '--worker-id',
+        type=str,
+        help="Lance uniquement un worker qui consomme la file --queue (ex: sur une autre machine)"
+    )
+    parser.add_argument(
+        '--offline',
+        action='store_true',
+        help="Aucune requête réseau : pages servies uniquement par le cache HTTP (itération sur les parsers)"
+    )
+    args = parser.parse_args()
+
+    if args.worker_id:
+        if not args.queue:
+            parser.error("--worker-id nécessite --queue")
+        run_worker(args.queue, args.worker_id, offline=args.offline)
+    elif args.queue:
+        run_distributed(args.queue, args.workers, args.offline)
+    else:
+        run_orchestrator(args.offline)
\ No newline at end of file
@@ -0,0 +1,92 @@
+import re
+from functools import lru_cache
+from urllib.parse import urljoin
+
+from lxml import etree
+
+
+@lru_cache(maxsize=None)
+def compile_selector(expression):
+    """Compile une seule fois un sélecteur XPath (ou CSS préfixé par 'css:') en objet XPath lxml."""
+    if expression.startswith('css:'):
+        from cssselect import GenericTranslator
+        expression = GenericTranslator().css_to_xpath(expression[len('css:'):].strip(), prefix='descendant-or-self::')
+    return etree.XPath(expression)
+
+def _regex(pattern, value):
+    match = re.search(pattern, value)
+    if not match:
+        return None
+    return match.group(1) if match.groups() else match.group(0)
+
+@lru_cache(maxsize=None)
+def compile_transform(spec):
+    """'strip', 'float', 'int', 'lower', 'urljoin', 'regex:<motif>', 'replace:<ancien>:<nouveau>'."""
+    name, _, argument = spec.partition(':')
+    if name == 'strip':
+        return lambda value, element: value.strip()
+    if name == 'lower':
+        return lambda value, element: value.lower()
+    if name == 'float':
+        return lambda value, element: float(value)
+    if name == 'int':
+        return lambda value, element: int(value)
+    if name == 'urljoin':
+        return lambda value, element: urljoin(element.base_url or '', value)
+    if name == 'regex':
+        pattern = re.compile(argument)
+        return lambda value, element: _regex(pattern, value)
+    if name == 'replace':
+        old, _, new = argument.partition(':')
+        return lambda value, element: value.replace(old, new)
+    raise ValueError(f"Transformation inconnue : {spec}")
+
+
+class CompiledField:
+
+    def __init__(self, name, spec):
+        if isinstance(spec, str):
+            spec = {'select': spec}
+        self.name = name
+        self.selector = compile_selector(spec['select'])
+        self.attr = spec.get('attr')
+        self.transforms = [compile_transform(t) for t in spec.get('transforms', [])]
+
+    def extract(self, element):
+        matches = self.selector(element)
+        if not matches:
+            return None
+        first = matches[0]
+        if isinstance(first, str):
+            value = str(first)
+        elif self.attr:
+            value = first.get(self.attr)
+        else:
+            value = first.text_content()
+        for transform in self.transforms:
+            if value is None:
+                break
+            value = transform(value, element)
+        return value
+
+
+class CompiledRules:
+    """Règles d'extraction déclarées dans config.yaml, compilées une fois par source."""
+
+    def __init__(self, rules):
+        self.item_selector = compile_selector(rules['item'])
+        self.fields = [CompiledField(name, spec) for name, spec in rules['fields'].items()]
+        self.next_page = compile_selector(rules['next_page']) if rules.get('next_page') else None
+
+    def extract_items(self, document):
+        for element in self.item_selector(document):
+            yield {field.name: field.extract(element) for field in self.fields}
+
+    def next_page_url(self, document, current_url):
+        if not self.next_page:
+            return None
+        matches = self.next_page(document)
+        if not matches:
+            return None
+        href = matches[0] if isinstance(matches[0], str) else matches[0].get('href')
+        return urljoin(current_url, str(href)) if href else None
@@ -0,0 +1,288 @@
+import requests
+from urllib.parse import urljoin
+import time
+import logging
+import re
+from abc import ABC, abstractmethod
+from concurrent.futures import wait, FIRST_COMPLETED
+
+
+class BaseScraper(ABC):
+
+    def __init__(self, name, config, scheduler=None):
+        self.name = name
+        self.config = config
+        self.base_url = config['url']
+        self.max_pages = config.get('max_pages', 1)
+        # Pagination concurrente : nécessite un modèle d'URL de page (ex: ".../page-{page}.html")
+        self.page_url_pattern = config.get('page_url_pattern')
+        self.concurrency = config.get('concurrency', 1)
+        self.request_delay = config.get('request_delay', 0.1)
+        self.scheduler = scheduler
+        # Sink optionnel (cf. sink.AggregatedSink) : les items y sont poussés page par page
+        self.sink = None
+        self.items_count = 0
+        self.cache_hits = 0
+        self.session = self._configure_session(requests.Session())
+        logging.info(f"[{self.name}] Module initialisé.")
+
+    def _configure_session(self, session):
+        from common.transport import configure_session
+
+        # Pool d'au moins `concurrency` connexions par hôte, timeouts et mesures partagés
+        return configure_session(session, concurrency=self.concurrency, http2=self.config.get('http2', False),
+                                 headers={"User-Agent": "MultiSourceScraper-Bot-v1.0"})
+
+    def use_http_cache(self, cache_settings):
+        """Remplace la session par une session adossée au cache HTTP partagé (settings.http_cache).
+
+        Toutes les sources (et tous les workers) lisent et écrivent le même fichier
+        SQLite ; chacune garde son propre TTL (`cache_ttl`).
+        """
+        from requests_cache import CachedSession, SQLiteCache
+
+        offline = cache_settings.get('offline', False)
+        self.session = self._configure_session(CachedSession(
+            backend=SQLiteCache(cache_settings.get('path', 'http_cache.sqlite'), wal=True),
+            # TTL quand le serveur n'envoie pas de Cache-Control/Expires ; une fois expirée,
+            # la page est revalidée (ETag/Last-Modified) plutôt que retéléchargée
+            expire_after=self.config.get('cache_ttl', cache_settings.get('expire_after', 3600)),
+            cache_control=True,
+            # Hors ligne : réponses du cache uniquement, même expirées ; page absente -> 504
+            only_if_cached=offline,
+            stale_if_error=offline
+        ))
+
+    def build_document(self, content, url):
+        from bs4 import BeautifulSoup
+        return BeautifulSoup(content, 'lxml')
+
+    def _record_request(self, start_time, ok):
+        if self.scheduler:
+            self.scheduler.metrics.record_request(time.time() - start_time, ok)
+
+    def _get_soup(self, url):
+        start_time = time.time()
+        try:
+            response = self.session.get(url, timeout=10)
+        except requests.RequestException as e:
+            self._record_request(start_time, False)
+            logging.error(f"[{self.name}] Erreur HTTP pour {url}: {e}")
+            return None
+        if getattr(response, 'from_cache', False):
+            self.cache_hits += 1
+        # Un 404 (fin de pagination) n'est pas un signe de surcharge, contrairement à 429 et 5xx
+        self._record_request(start_time, response.status_code < 500 and response.status_code != 429)
+
+        try:
+            response.raise_for_status()
+            return self.build_document(response.content, url)
+        except requests.RequestException as e:
+            logging.error(f"[{self.name}] Erreur HTTP pour {url}: {e}")
+            return None
+
+    @abstractmethod
+    def parse_page(self, soup):
+        pass
+
+    @abstractmethod
+    def get_next_page_url(self, soup, current_url):
+        pass
+
+    def emit(self, page_data, all_data):
+        self.items_count += len(page_data)
+        if self.scheduler:
+            self.scheduler.metrics.record_items(len(page_data))
+        if self.sink:
+            self.sink.put_page(page_data)
+        else:
+            all_data.extend(page_data)
+
+    def _fetch_and_parse(self, url):
+        soup = self._get_soup(url)
+        if soup is None:
+            return None
+        return self.parse_page(soup)
+
+    def _scrape_concurrent(self):
+        all_data = []
+        # Pages terminées en attente : seul le préfixe contigu est émis, dans l'ordre des pages
+        pages_data = {}
+        in_flight = {}
+        next_page = 1
+        next_to_emit = 1
+        last_page = self.max_pages
+
+        while in_flight or next_page <= last_page:
+            while next_page <= last_page and len(in_flight) < self.scheduler.window(self.concurrency):
+                page_url = self.page_url_pattern.format(page=next_page)
+                logging.info(f"[{self.name}] Scraping de : {page_url}")
+                in_flight[self.scheduler.submit(self._fetch_and_parse, page_url)] = next_page
+                next_page += 1
+                time.sleep(self.request_delay)
+
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                page = in_flight.pop(future)
+                page_data = future.result()
+                if not page_data:
+                    # Page absente ou vide : la pagination s'arrête avant elle
+                    last_page = min(last_page, page - 1)
+                    continue
+                logging.info(f"[{self.name}] {len(page_data)} items trouvés sur la page {page}.")
+                pages_data[page] = page_data
+
+            while next_to_emit <= last_page and next_to_emit in pages_data:
+                self.emit(pages_data.pop(next_to_emit), all_data)
+                next_to_emit += 1
+
+        return all_data
+
+    def scrape(self):
+        if self.page_url_pattern and self.scheduler and self.scheduler.window(self.concurrency) > 1:
+            return self._scrape_concurrent()
+
+        all_data = []
+        current_page_url = self.base_url
+        pages_scraped = 0
+        
+        while current_page_url and pages_scraped < self.max_pages:
+            logging.info(f"[{self.name}] Scraping de : {current_page_url}")
+            soup = self.scheduler.run(self._get_soup, current_page_url) if self.scheduler else self._get_soup(current_page_url)
+            if soup is None:
+                break
+                
+            page_data = self.parse_page(soup)
+            self.emit(page_data, all_data)
+            logging.info(f"[{self.name}] {len(page_data)} items trouvés sur la page.")
+            
+            pages_scraped += 1
+            current_page_url = self.get_next_page_url(soup, current_page_url)
+            time.sleep(self.request_delay)
+            
+        return all_data
+
+class BooksScraper(BaseScraper):
+    
+    def parse_page(self, soup):
+        unified_data = []
+        for article in soup.find_all('article', class_='product_pod'):
+            title = article.find('h3').find('a')['title']
+            url = urljoin(self.base_url, "catalogue/" + article.find('h3').find('a')['href'].replace('../', ''))
+            price = article.find('p', class_='price_color').text.strip()
+            
+            unified_data.append({
+                "source": self.name,
+                "title": title,
+                "url": url,
+                "content": f"Prix: {price}",
+                "metadata": {"price_gbp": float(price.replace('£', ''))}
+            })
+        return unified_data
+
+    def get_next_page_url(self, soup, current_url):
+        next_tag = soup.find('li', class_='next')
+        if next_tag:
+            next_url = next_tag.find('a')['href']
+            return urljoin(self.base_url, "catalogue/" + next_url)
+        return None
+
+class QuotesScraper(BaseScraper):
+
+    def parse_page(self, soup):
+        unified_data = []
+        for quote in soup.find_all('div', class_='quote'):
+            text = quote.find('span', class_='text').text.strip()
+            author = quote.find('small', class_='author').text.strip()
+            author_url = urljoin(self.base_url, quote.find('a')['href'])
+            
+            unified_data.append({
+                "source": self.name,
+                "title": f"Citation de {author}",
+                "url": author_url,
+                "content": text,
+                "metadata": {"author": author}
+            })
+        return unified_data
+
+    def get_next_page_url(self, soup, current_url):
+        next_tag = soup.find('li', class_='next')
+        if next_tag:
+            return urljoin(self.base_url, next_tag.find('a')['href'])
+        return None
+
+class JobsScraper(BaseScraper):
+
+    def parse_page(self, soup):
+        unified_data = []
+        keyword = self.config.get('filter_keyword')
+        
+        for card in soup.find_all('div', class_='card-content'):
+            title = card.find('h2', class_='title').text.strip()
+            
+            if keyword and keyword.lower() not in title.lower():
+                continue
+                
+            company = card.find('h3', class_='company').text.strip()
+            location = card.find('p', class_='location').text.strip()
+            url = card.find('a', string=re.compile(r'Apply|Learn More'))['href']
+            
+            unified_data.append({
+                "source": self.name,
+                "title": title,
+                "url": url,
+                "content": f"Entreprise: {company} | Lieu: {location}",
+                "metadata": {"company": company, "location": location}
+            })
+        return unified_data
+
+    def get_next_page_url(self, soup, current_url):
+        return None
+
+class RuleScraper(BaseScraper):
+    """Scraper générique piloté par le bloc `rules` de config.yaml (aucune sous-classe à écrire).
+
+    La page est parsée une seule fois avec lxml, sans arbre BeautifulSoup, et
+    les sélecteurs compilés (XPath ou 'css:') sont appliqués sur ce même arbre.
+    """
+
+    def __init__(self, name, config, scheduler=None):
+        super().__init__(name, config, scheduler)
+        from extraction_rules import CompiledRules
+        self.rules = CompiledRules(config['rules'])
+        self.output = config['rules'].get('output', {})
+
+    def build_document(self, content, url):
+        import lxml.html
+        # Sans déclaration de charset, lxml suppose du latin-1 : on tente d'abord l'UTF-8
+        try:
+            return lxml.html.fromstring(content.decode('utf-8'), base_url=url)
+        except UnicodeDecodeError:
+            return lxml.html.fromstring(content, base_url=url)
+
+    def _render(self, template, values):
+        # "{champ}" : gabarit de texte ; "champ" : valeur brute du champ (nombre, etc.)
+        if '{' in template:
+            return template.format(**values)
+        return values.get(template)
+
+    def parse_page(self, soup):
+        unified_data = []
+        keyword = self.config.get('filter_keyword')
+        filter_field = self.config.get('filter_field', 'title')
+
+        for values in self.rules.extract_items(soup):
+            if keyword and keyword.lower() not in (values.get(filter_field) or '').lower():
+                continue
+
+            unified_data.append({
+                "source": self.name,
+                "title": self._render(self.output.get('title', 'title'), values),
+                "url": self._render(self.output.get('url', 'url'), values),
+                "content": self._render(self.output.get('content', 'content'), values),
+                "metadata": {key: self._render(field, values) for key, field in self.output.get('metadata', {}).items()}
+            })
+        return unified_data
+
+    def get_next_page_url(self, soup, current_url):
+        return self.rules.next_page_url(soup, current_url)
@@ -0,0 +1,81 @@
+import json
+import logging
+import queue
+import threading
+import textwrap
+
+_FLUSH = object()
+_STOP = object()
+
+
+class AggregatedSink:
+    """File bornée vidée par un thread d'écriture.
+
+    Les scrapers y poussent les items de chaque page dès qu'elle est parsée ;
+    quand l'écriture prend du retard, la file se remplit et `put_page` bloque
+    les producteurs (back-pressure). Formats : 'json' (tableau écrit au fil de
+    l'eau, identique à json.dump(indent=4)) ou 'ndjson' (un item par ligne).
+    """
+
+    def __init__(self, output_file, output_format='json', queue_size=1000):
+        if output_format not in ('json', 'ndjson'):
+            raise ValueError(f"Format de sortie non supporté : {output_format}. Utilisez 'json' ou 'ndjson'.")
+        self.output_file = output_file
+        self.output_format = output_format
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.items_written = 0
+        self.error = None
+        self._writer = threading.Thread(target=self._drain, name='sink-writer', daemon=True)
+
+    def start(self):
+        self._writer.start()
+        return self
+
+    def put_page(self, items):
+        for item in items:
+            self.queue.put(item)
+        self.queue.put(_FLUSH)
+
+    def close(self):
+        self.queue.put(_STOP)
+        self._writer.join()
+
+    def _write_item(self, f, item):
+        if self.output_format == 'ndjson':
+            f.write(json.dumps(item, ensure_ascii=False))
+            f.write('\n')
+            return
+        f.write('[\n' if self.items_written == 0 else ',\n')
+        f.write(textwrap.indent(json.dumps(item, indent=4, ensure_ascii=False), '    '))
+
+    def _drain(self):
+        f = None
+        try:
+            f = open(self.output_file, 'w', encoding='utf-8')
+        except IOError as e:
+            self.error = e
+            logging.error(f"Impossible d'ouvrir {self.output_file} : {e}")
+
+        while True:
+            item = self.queue.get()
+            if item is _STOP:
+                break
+            if f is None:
+                # On continue de vider la file pour ne pas bloquer les producteurs
+                continue
+            try:
+                if item is _FLUSH:
+                    f.flush()
+                else:
+                    self._write_item(f, item)
+                    self.items_written += 1
+            except IOError as e:
+                self.error = e
+                logging.error(f"Erreur d'écriture dans {self.output_file} : {e}")
+                f.close()
+                f = None
+
+        if f is not None:
+            if self.output_format == 'json':
+                f.write('\n]' if self.items_written else '[]')
+            f.close()
@@ -0,0 +1,183 @@
+import json
+import sqlite3
+import threading
+import time
+
+
+def task_key(task):
+    return f"{task['source']}|{task['url']}"
+
+
+class SQLiteWorkQueue:
+    """File de tâches locale (plusieurs processus d'une même machine).
+
+    Une tâche louée (`lease`) dont le bail expire sans `ack` redevient
+    disponible : le travail d'un worker planté est repris par un autre.
+    """
+
+    def __init__(self, path, max_attempts=3):
+        self.path = path
+        self.max_attempts = max_attempts
+        self._local = threading.local()
+        with self._connection() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS tasks (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    key TEXT UNIQUE,
+                    payload TEXT NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    lease_until REAL,
+                    worker TEXT,
+                    attempts INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return _Transaction(conn)
+
+    def enqueue(self, task):
+        with self._connection() as conn:
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO tasks (key, payload) VALUES (?, ?)",
+                (task_key(task), json.dumps(task, ensure_ascii=False))
+            )
+            return cursor.rowcount == 1
+
+    def clear_finished(self):
+        """Oublie les tâches terminées ou abandonnées d'un run précédent : elles peuvent être remises en file.
+
+        Les tâches encore en attente ou louées (run interrompu) sont conservées et restent dédupliquées.
+        """
+        with self._connection() as conn:
+            return conn.execute("DELETE FROM tasks WHERE status IN ('done', 'failed')").rowcount
+
+    def lease(self, worker_id, lease_seconds=60):
+        now = time.time()
+        with self._connection() as conn:
+            conn.execute(
+                "UPDATE tasks SET status = 'failed' WHERE status = 'leased' AND lease_until < ? AND attempts >= ?",
+                (now, self.max_attempts)
+            )
+            row = conn.execute(
+                """SELECT id, payload FROM tasks
+                   WHERE status = 'pending' OR (status = 'leased' AND lease_until < ?)
+                   ORDER BY id LIMIT 1""",
+                (now,)
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE tasks SET status = 'leased', lease_until = ?, worker = ?, attempts = attempts + 1 WHERE id = ?",
+                (now + lease_seconds, worker_id, row[0])
+            )
+        return row[0], json.loads(row[1])
+
+    def ack(self, task_id):
+        with self._connection() as conn:
+            conn.execute("UPDATE tasks SET status = 'done', lease_until = NULL WHERE id = ?", (task_id,))
+
+    def remaining(self):
+        with self._connection() as conn:
+            return conn.execute("SELECT COUNT(*) FROM tasks WHERE status IN ('pending', 'leased')").fetchone()[0]
+
+
+class _Transaction:
+    """Transaction BEGIN IMMEDIATE : un seul processus à la fois peut louer une tâche."""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        self.conn.execute("BEGIN IMMEDIATE")
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+
+
+# Location atomique : dépile une tâche et enregistre son bail dans la même opération
+_LEASE_SCRIPT = """
+local payload = redis.call('RPOP', KEYS[1])
+if not payload then
+    return nil
+end
+local task = cjson.decode(payload)
+redis.call('ZADD', KEYS[2], ARGV[1], task['key'])
+redis.call('HSET', KEYS[3], task['key'], payload)
+return payload
+"""
+
+
+class RedisWorkQueue:
+    """File de tâches partagée entre machines, sur tout serveur compatible Redis."""
+
+    def __init__(self, url, name='exo8', max_attempts=3):
+        import redis
+
+        self.client = redis.Redis.from_url(url)
+        self.max_attempts = max_attempts
+        self.pending_key = f"{name}:pending"
+        self.leases_key = f"{name}:leases"
+        self.inflight_key = f"{name}:inflight"
+        self.seen_key = f"{name}:seen"
+        self.attempts_key = f"{name}:attempts"
+        self._lease = self.client.register_script(_LEASE_SCRIPT)
+
+    def enqueue(self, task):
+        key = task_key(task)
+        if not self.client.sadd(self.seen_key, key):
+            return False
+        self.client.lpush(self.pending_key, json.dumps({**task, 'key': key}, ensure_ascii=False))
+        return True
+
+    def clear_finished(self):
+        """Vide l'ensemble des tâches vues, sauf celles encore en attente ou louées (run interrompu)."""
+        live = {json.loads(payload)['key'] for payload in self.client.lrange(self.pending_key, 0, -1)}
+        live.update(key.decode('utf-8') for key in self.client.hkeys(self.inflight_key))
+        finished = {key.decode('utf-8') for key in self.client.smembers(self.seen_key)} - live
+        if finished:
+            pipeline = self.client.pipeline()
+            pipeline.srem(self.seen_key, *finished)
+            pipeline.hdel(self.attempts_key, *finished)
+            pipeline.execute()
+        return len(finished)
+
+    def _requeue_expired(self, now):
+        for key in self.client.zrangebyscore(self.leases_key, '-inf', now):
+            # zrem fait office de verrou : un seul worker remet la tâche en file
+            if not self.client.zrem(self.leases_key, key):
+                continue
+            payload = self.client.hget(self.inflight_key, key)
+            self.client.hdel(self.inflight_key, key)
+            if payload and self.client.hincrby(self.attempts_key, key, 1) < self.max_attempts:
+                self.client.rpush(self.pending_key, payload)
+
+    def lease(self, worker_id, lease_seconds=60):
+        now = time.time()
+        self._requeue_expired(now)
+        payload = self._lease(keys=[self.pending_key, self.leases_key, self.inflight_key], args=[now + lease_seconds])
+        if payload is None:
+            return None
+        task = json.loads(payload)
+        return task['key'], task
+
+    def ack(self, task_id):
+        self.client.zrem(self.leases_key, task_id)
+        self.client.hdel(self.inflight_key, task_id)
+
+    def remaining(self):
+        return self.client.llen(self.pending_key) + self.client.zcard(self.leases_key)
+
+
+def open_queue(queue_url):
+    """'sqlite:///chemin/vers/file.sqlite' ou 'redis://hôte:port/db'."""
+    if queue_url.startswith('sqlite:///'):
+        return SQLiteWorkQueue(queue_url[len('sqlite:///'):])
+    if queue_url.startswith(('redis://', 'rediss://')):
+        return RedisWorkQueue(queue_url)
+    raise ValueError(f"URL de file non supportée : {queue_url}. Utilisez sqlite:/// ou redis://")
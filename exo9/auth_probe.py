@@ -0,0 +1,78 @@
+import re
+from collections import namedtuple
+
+from session_pool import is_login_redirect
+
+# Motifs appliqués directement aux octets de la page : aucun arbre HTML n'est construit
+INPUT_TAG = re.compile(rb'<input\b[^>]*\bname\s*=\s*["\']csrf_token["\'][^>]*>', re.IGNORECASE)
+VALUE_ATTR = re.compile(rb'\bvalue\s*=\s*["\']([^"\']*)["\']', re.IGNORECASE)
+LOGOUT_LINK = re.compile(rb'<a\b[^>]*\bhref\s*=\s*["\']/logout["\']', re.IGNORECASE)
+LOGIN_LINK = re.compile(rb'<a\b[^>]*\bhref\s*=\s*["\']/login["\']', re.IGNORECASE)
+
+# Octets conservés d'un bloc à l'autre pour ne pas rater une balise à cheval sur deux blocs
+CHUNK_OVERLAP = 1024
+CHUNK_SIZE = 8192
+
+# logged_in : True (lien Logout), False (lien Login), None (aucun des deux dans la page)
+AuthState = namedtuple('AuthState', ['csrf_token', 'logged_in'])
+
+
+def _scan(data, csrf_token, logged_in):
+    if csrf_token is None:
+        match = INPUT_TAG.search(data)
+        if match:
+            value = VALUE_ATTR.search(match.group(0))
+            if value:
+                csrf_token = value.group(1).decode('utf-8', 'replace')
+    if logged_in is None:
+        if LOGOUT_LINK.search(data):
+            logged_in = True
+        elif LOGIN_LINK.search(data):
+            logged_in = False
+    return csrf_token, logged_in
+
+
+def probe_bytes(data):
+    return AuthState(*_scan(data, None, None))
+
+
+def probe_chunks(chunks, want_csrf=True):
+    """Parcourt les blocs et s'arrête dès que l'état (et le token, si demandé) est connu."""
+    csrf_token, logged_in = None, None
+    tail = b''
+    for chunk in chunks:
+        window = tail + chunk
+        csrf_token, logged_in = _scan(window, csrf_token, logged_in)
+        if logged_in is not None and (csrf_token is not None or not want_csrf):
+            break
+        tail = window[-CHUNK_OVERLAP:]
+    return AuthState(csrf_token, logged_in)
+
+
+def probe_response(response, want_csrf=True):
+    """Sonde une réponse ; obtenue avec stream=True, seul le début du corps est téléchargé."""
+    if response._content_consumed:
+        return probe_bytes(response.content)
+    try:
+        return probe_chunks(response.iter_content(CHUNK_SIZE), want_csrf)
+    finally:
+        response.close()
+
+
+def auth_state_hook(response, *args, **kwargs):
+    """Hook requests ('response') : attache `response.auth_state` à chaque réponse de la session."""
+    response.auth_state = probe_bytes(response.content)
+    return response
+
+
+def install(session):
+    session.hooks['response'].append(auth_state_hook)
+    return session
+
+
+def is_session_expired(response, login_path='/login'):
+    """Expirée si redirigée vers le login, ou si la page affiche le lien Login au lieu de Logout."""
+    if is_login_redirect(response, login_path):
+        return True
+    state = getattr(response, 'auth_state', None)
+    return state is not None and state.logged_in is False
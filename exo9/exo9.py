@@ -2,6 +2,10 @@ import requests
 from bs4 import BeautifulSoup
 import logging
 import sys
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from session_pool import AuthenticatedSessionPool
+from auth_probe import auth_state_hook, is_session_expired, probe_bytes, probe_response
 
 SITE_URL = "http://quotes.toscrape.com/"
 LOGIN_URL = "http://quotes.toscrape.com/login"
@@ -10,87 +14,118 @@ LOGOUT_URL = "http://quotes.toscrape.com/logout"
 USERNAME = "admin"
 PASSWORD = "admin"
 
+# Cookies des sessions du pool, réutilisés d'un lancement à l'autre
+COOKIE_DIR = "sessions"
+
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+def login(session, username=USERNAME, password=PASSWORD):
+    """GET login -> token CSRF -> POST des identifiants dans `session`.
+
+    Renvoie la réponse du POST si la connexion a réussi (session authentifiée), sinon None.
+    """
+    logging.info(f"Accès à la page de login : {LOGIN_URL}")
+    try:
+        # stream=True : la lecture s'arrête dès que le token CSRF est trouvé
+        response_get = session.get(LOGIN_URL, timeout=10, stream=True)
+        response_get.raise_for_status()
+        csrf_token = probe_response(response_get).csrf_token
+    except requests.RequestException as e:
+        logging.error(f"Impossible de joindre la page de login : {e}")
+        return None
+
+    if csrf_token is None:
+        logging.error("Impossible de trouver le token CSRF. La structure de la page a peut-être changé.")
+        return None
+    logging.info(f"Token CSRF récupéré : {csrf_token[:10]}...")
+
+    login_payload = {
+        'username': username,
+        'password': password,
+        'csrf_token': csrf_token
+    }
+
+    logging.info(f"Tentative de connexion en tant que '{username}'...")
+    try:
+        headers = {'Referer': LOGIN_URL}
+        response_post = session.post(LOGIN_URL, data=login_payload, headers=headers, timeout=10)
+        response_post.raise_for_status()
+    except requests.RequestException as e:
+        logging.error(f"La requête POST de login a échoué : {e}")
+        return None
+
+    if response_post.url == LOGIN_URL:
+        # Cas d'échec, rare : on peut se permettre de parser la page pour le message d'erreur
+        soup_error = BeautifulSoup(response_post.content, 'lxml')
+        error_msg = soup_error.find('p', class_='error')
+        if error_msg:
+            logging.error(f"ÉCHEC : Connexion échouée. Message du site : {error_msg.text.strip()}")
+        else:
+            logging.error("ÉCHEC : Connexion échouée pour une raison inconnue.")
+        return None
+
+    if not probe_bytes(response_post.content).logged_in:
+        logging.error("ÉCHEC : Connexion échouée. Bouton 'Logout' non trouvé.")
+        return None
+    return response_post
+
 def perform_login():
     with requests.Session() as session:
-        logging.info(f"Accès à la page de login : {LOGIN_URL}")
-        try:
-            response_get = session.get(LOGIN_URL, timeout=10)
-            response_get.raise_for_status()
-        except requests.RequestException as e:
-            logging.error(f"Impossible de joindre la page de login : {e}")
+        if login(session) is None:
             return False
 
-        soup = BeautifulSoup(response_get.content, 'lxml')
-        
-        try:
-            csrf_token = soup.find('input', {'name': 'csrf_token'})['value']
-            logging.info(f"Token CSRF récupéré : {csrf_token[:10]}...")
-        except TypeError:
-            logging.error("Impossible de trouver le token CSRF. La structure de la page a peut-être changé.")
-            return False
-        
-        login_payload = {
-            'username': USERNAME,
-            'password': PASSWORD,
-            'csrf_token': csrf_token
-        }
-        
-        logging.info(f"Tentative de connexion en tant que '{USERNAME}'...")
-        try:
-            headers = {'Referer': LOGIN_URL}
-            response_post = session.post(LOGIN_URL, data=login_payload, headers=headers)
-            response_post.raise_for_status()
-        except requests.RequestException as e:
-            logging.error(f"La requête POST de login a échoué : {e}")
-            return False
-        if response_post.url != LOGIN_URL:
-            soup_post_login = BeautifulSoup(response_post.content, 'lxml')
-            logout_link = soup_post_login.find('a', href='/logout')
-            
-            if logout_link:
-                user_greet_elem = (
-                    soup_post_login.find('p', class_='login')
-                    or soup_post_login.find('p', class_='navbar-text')
-                    or soup_post_login.find('div', class_='alert')
-                    or soup_post_login.find('small')
-                )
-
-                if user_greet_elem and user_greet_elem.text:
-                    user_greet = user_greet_elem.text.strip()
-                else:
-                    parent = logout_link.find_parent()
-                    user_greet = parent.get_text(separator=' ', strip=True) if parent else 'Utilisateur connecté'
-
-                logging.info(f"SUCCÈS : Connexion réussie. {user_greet}")
-
-                logging.info("Test de la déconnexion...")
-                response_logout = session.get(LOGOUT_URL, headers={'Referer': SITE_URL})
-
-                soup_logout = BeautifulSoup(response_logout.content, 'lxml')
-                login_link = soup_logout.find('a', href='/login')
-                
-                if login_link:
-                    logging.info("SUCCÈS : Déconnexion réussie.")
-                    return True
-                else:
-                    logging.warning("ÉCHEC : La déconnexion semble avoir échoué.")
-                    return False
-            else:
-                logging.error("ÉCHEC : Connexion échouée. Bouton 'Logout' non trouvé.")
-                return False
+        logging.info(f"SUCCÈS : Connexion réussie en tant que '{USERNAME}'.")
+
+        logging.info("Test de la déconnexion...")
+        response_logout = session.get(LOGOUT_URL, headers={'Referer': SITE_URL}, stream=True)
+
+        if probe_response(response_logout, want_csrf=False).logged_in is False:
+            logging.info("SUCCÈS : Déconnexion réussie.")
+            return True
         else:
-            soup_error = BeautifulSoup(response_post.content, 'lxml')
-            error_msg = soup_error.find('p', class_='error')
-            if error_msg:
-                logging.error(f"ÉCHEC : Connexion échouée. Message du site : {error_msg.text.strip()}")
-            else:
-                logging.error("ÉCHEC : Connexion échouée pour une raison inconnue.")
+            logging.warning("ÉCHEC : La déconnexion semble avoir échoué.")
             return False
 
+def scrape_authenticated(pool_size, pages):
+    """Scrape `pages` pages de citations en parallèle avec un pool de sessions connectées."""
+    # Chaque réponse est sondée (auth_state) : une page affichée en visiteur déclenche une reconnexion
+    pool = AuthenticatedSessionPool(
+        pool_size, login, cookie_dir=COOKIE_DIR,
+        is_expired=is_session_expired, response_hooks=[auth_state_hook]
+    )
+    with pool:
+
+        def fetch(page):
+            response = pool.get(f"{SITE_URL}page/{page}/")
+            soup = BeautifulSoup(response.content, 'lxml')
+            return page, len(soup.find_all('div', class_='quote')), response.auth_state.logged_in
+
+        with ThreadPoolExecutor(max_workers=pool_size) as executor:
+            for page, quotes_count, authenticated in executor.map(fetch, range(1, pages + 1)):
+                state = "connecté" if authenticated else "NON connecté"
+                logging.info(f"Page {page} : {quotes_count} citations ({state})")
+        logging.info(f"{pages} pages scrapées avec {pool_size} sessions, {pool.logins} login(s) effectué(s).")
+
 if __name__ == "__main__":
-    
+    parser = argparse.ArgumentParser(description="Flux d'authentification sur quotes.toscrape.com.")
+    parser.add_argument(
+        '--pool',
+        type=int,
+        default=0,
+        help="Scrape authentifié avec un pool de N sessions connectées (cookies conservés dans sessions/)"
+    )
+    parser.add_argument(
+        '--pages',
+        type=int,
+        default=10,
+        help="Avec --pool : nombre de pages de citations à scraper (défaut: 10)"
+    )
+    args = parser.parse_args()
+
+    if args.pool:
+        scrape_authenticated(args.pool, args.pages)
+        sys.exit(0)
+
     success = perform_login()
     
     if success:
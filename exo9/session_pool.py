@@ -0,0 +1,144 @@
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+import requests
+
+
+def is_login_redirect(response, login_path='/login'):
+    """Session expirée : la requête a été redirigée vers la page de login."""
+    return bool(response.history) and urlparse(response.url).path.rstrip('/') == login_path
+
+
+class AuthenticatedSessionPool:
+    """Pool de sessions déjà connectées, partagé entre workers concurrents.
+
+    Les cookies de chaque session sont sauvegardés dans `cookie_dir` et rechargés
+    au démarrage suivant (pas de login si la session est encore valide). Une
+    session expirée est reconnectée à la volée ; les logins passent par un
+    sémaphore et sont espacés d'au moins `min_login_interval` secondes, pour ne
+    pas saturer la page de login quand toutes les sessions expirent ensemble.
+    """
+
+    def __init__(self, size, login_fn, cookie_dir='sessions', is_expired=is_login_redirect,
+                 max_concurrent_logins=1, min_login_interval=0.5, headers=None, response_hooks=()):
+        self.size = size
+        self.login_fn = login_fn
+        self.cookie_dir = cookie_dir
+        self.is_expired = is_expired
+        self.min_login_interval = min_login_interval
+        self.headers = headers or {}
+        # Hooks requests ajoutés à chaque session (ex: auth_probe.auth_state_hook)
+        self.response_hooks = list(response_hooks)
+        self.logins = 0
+        self._available = queue.Queue()
+        self._sessions = []
+        self._login_gate = threading.Semaphore(max_concurrent_logins)
+        self._last_login = 0.0
+        self._last_login_lock = threading.Lock()
+
+    def _cookie_file(self, index):
+        return os.path.join(self.cookie_dir, f"session-{index}.json")
+
+    def _save_cookies(self, index, session):
+        os.makedirs(self.cookie_dir, exist_ok=True)
+        cookies = [
+            {"name": c.name, "value": c.value, "domain": c.domain, "path": c.path,
+             "expires": c.expires, "secure": c.secure}
+            for c in session.cookies
+        ]
+        tmp_path = self._cookie_file(index) + '.tmp'
+        # Cookies de session = identifiants : fichier lisible par son seul propriétaire dès sa création
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(cookies, f)
+        os.replace(tmp_path, self._cookie_file(index))
+
+    def _load_cookies(self, index, session):
+        try:
+            with open(self._cookie_file(index), 'r', encoding='utf-8') as f:
+                cookies = json.load(f)
+        except (IOError, ValueError):
+            return False
+        now = time.time()
+        for c in cookies:
+            if c.get('expires') and c['expires'] < now:
+                continue
+            session.cookies.set(c['name'], c['value'], domain=c['domain'], path=c['path'],
+                                expires=c.get('expires'), secure=c.get('secure', False))
+        return len(session.cookies) > 0
+
+    def _login(self, index, session):
+        with self._login_gate:
+            with self._last_login_lock:
+                wait = self._last_login + self.min_login_interval - time.time()
+                self._last_login = max(time.time(), self._last_login + self.min_login_interval)
+            if wait > 0:
+                time.sleep(wait)
+
+            session.cookies.clear()
+            logging.info(f"[pool] Connexion de la session {index}...")
+            if not self.login_fn(session):
+                raise RuntimeError(f"Échec de la connexion de la session {index}.")
+            self.logins += 1
+        self._save_cookies(index, session)
+
+    def start(self):
+        """Crée les sessions : cookies sauvegardés s'il y en a, sinon login immédiat."""
+        try:
+            for index in range(self.size):
+                session = requests.Session()
+                session.headers.update(self.headers)
+                session.hooks['response'].extend(self.response_hooks)
+                session.pool_index = index
+                self._sessions.append(session)
+                if self._load_cookies(index, session):
+                    logging.info(f"[pool] Session {index} restaurée depuis {self._cookie_file(index)}")
+                else:
+                    self._login(index, session)
+                self._available.put(session)
+        except BaseException:
+            # Login impossible : les sessions déjà ouvertes ne doivent pas fuir leurs connexions
+            for session in self._sessions:
+                session.close()
+            self._sessions = []
+            self._available = queue.Queue()
+            raise
+        return self
+
+    @contextmanager
+    def session(self):
+        """Emprunte une session (bloque si toutes sont utilisées)."""
+        session = self._available.get()
+        try:
+            yield session
+        finally:
+            self._available.put(session)
+
+    def get(self, url, **kwargs):
+        """GET authentifié : en cas d'expiration, reconnecte la session et rejoue la requête une fois."""
+        kwargs.setdefault('timeout', 10)
+        with self.session() as session:
+            response = session.get(url, **kwargs)
+            if self.is_expired(response):
+                logging.warning(f"[pool] Session {session.pool_index} expirée ({url}). Reconnexion...")
+                self._login(session.pool_index, session)
+                response = session.get(url, **kwargs)
+            return response
+
+    def close(self):
+        # Les cookies ont pu être renouvelés par le serveur depuis le login
+        for session in self._sessions:
+            self._save_cookies(session.pool_index, session)
+            session.close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
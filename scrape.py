@@ -0,0 +1,141 @@
+"""Point d'entrée unique des scrapers : `python scrape.py <outil> [arguments de l'outil]`.
+
+Aucun outil n'est importé avant d'être lancé : `list`, `--help` et `startup`
+ne chargent que la bibliothèque standard.
+"""
+import argparse
+import os
+import re
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(ROOT_DIR)
+from common.plugins import PluginRegistry
+
+# Outils intégrés : chemin du script (relatif à la racine) et description.
+# Chaque script est exécuté depuis son propre dossier, comme lancé à la main.
+BUILTIN_TOOLS = {
+    'exo1': ('exo1/exo1.py', "Livres de books.toscrape.com (détails) vers JSON"),
+    'exo2': ('exo2/exo2.py', "Graphe auteurs/tags de quotes.toscrape.com (cache HTTP)"),
+    'exo3': ('exo3/exo3.py', "Offres Fake Jobs filtrées vers CSV/Parquet"),
+    'exo4': ('exo4/exo4.py', "Rapport de prix par catégorie de livres"),
+    'exo5': ('exo5/exo5.py', "Arbre des catégories de livres"),
+    'exo6': ('exo6/exo6.py', "Scraper résilient (retries, reprise) vers JSONL"),
+    'exo7': ('exo7/exo7.py', "Validation et rapport qualité des données"),
+    'exo7-bench': ('exo7/benchmark_validation.py', "Benchmark de la validation par lot"),
+    'exo8': ('exo8/exo8.py', "Orchestrateur multi-sources (config.yaml)"),
+    'exo9': ('exo9/exo9.py', "Session authentifiée sur quotes.toscrape.com"),
+    'reparse': ('common/reparse.py', "Re-parse hors ligne d'une archive WARC (exo1, exo6, exo8:<source>)"),
+    'snapshots': ('common/snapshots.py', "Historique des runs : changements et reconstruction d'un snapshot"),
+    'images': ('common/images.py', "Téléchargement des couvertures (url_image_hd) par hash SHA-256, avec reprise"),
+    'search': ('common/search_index.py', "Index plein texte (BM25, phrases, filtres prix/note/tag) des livres et citations"),
+    'analytics': ('common/analytics.py', "Entrepôt SQLite des sorties de crawl et rapports exo3/exo4 hors ligne"),
+    'transport': ('common/transport.py', "Réutilisation des connexions et latences du transport HTTP partagé"),
+    'records-bench': ('common/records.py', "Empreinte mémoire (tracemalloc) du stockage en colonnes vs. liste de dicts"),
+    'bench': ('bench/bench.py', "Benchmark des outils sur des réponses enregistrées (rejeu local)"),
+    'chaos': ('bench/chaos.py', "Scénarios de pannes (5xx, 429, lenteur, reset, 403) contre exo6 et exo8"),
+}
+
+# Les outils intégrés sont des scripts ('dossier/script.py') ; un paquet installé peut en
+# ajouter via le groupe d'entry points 'scrape.tools', sous forme de 'module:fonction'
+# appelée avec les arguments de l'outil.
+TOOLS = PluginRegistry('scrape.tools', {name: path for name, (path, _) in BUILTIN_TOOLS.items()})
+
+# Budget d'imports au démarrage (`-X importtime`) pour `list` et les `--help`
+STARTUP_BUDGET_MS = 150
+# Commandes mesurées par `startup` : outils dont le `--help` ne charge pas les dépendances lourdes
+STARTUP_COMMANDS = [
+    ['list'],
+    ['exo3', '--help'],
+    ['exo4', '--help'],
+    ['exo7', '--help'],
+    ['exo8', '--help'],
+]
+
+IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)')
+
+
+def tool_script(name):
+    """Chemin absolu du script d'un outil intégré, None pour un outil fourni par un plugin."""
+    spec = TOOLS.spec(name)
+    return os.path.join(ROOT_DIR, spec) if spec.endswith('.py') else None
+
+
+def run_tool(name, tool_args):
+    import runpy
+
+    script = tool_script(name)
+    if script is None:
+        sys.exit(TOOLS.load(name)(tool_args))
+    script_dir = os.path.dirname(script)
+    os.chdir(script_dir)
+    # Même environnement qu'un `python exoN.py` : dossier du script en tête du path
+    sys.path.insert(0, script_dir)
+    sys.argv = [script] + tool_args
+    runpy.run_path(script, run_name='__main__')
+
+
+def list_tools():
+    names = TOOLS.names()
+    width = max(len(name) for name in names)
+    for name in names:
+        description = BUILTIN_TOOLS[name][1] if name in BUILTIN_TOOLS else f"Plugin {TOOLS.spec(name)}"
+        print(f"{name.ljust(width)}  {description}")
+
+
+def measure_imports(command):
+    """Temps d'import cumulé (ms) et modules les plus coûteux pour `scrape.py <command>`."""
+    import subprocess
+
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', os.path.join(ROOT_DIR, 'scrape.py')] + command,
+        capture_output=True, text=True, cwd=ROOT_DIR
+    )
+    top_level = []
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        # Seuls les imports de premier niveau (non indentés) : leur cumul inclut les sous-imports
+        if match and not match.group(3):
+            top_level.append((int(match.group(2)) / 1000, match.group(4)))
+    return sum(ms for ms, _ in top_level), sorted(top_level, reverse=True)[:5]
+
+
+def check_startup(budget_ms):
+    over_budget = False
+    for command in STARTUP_COMMANDS:
+        total_ms, heaviest = measure_imports(command)
+        status = "OK" if total_ms <= budget_ms else "DÉPASSEMENT"
+        over_budget = over_budget or total_ms > budget_ms
+        print(f"[{status}] scrape.py {' '.join(command)} : {total_ms:.1f} ms d'imports (budget {budget_ms} ms)")
+        for ms, module in heaviest:
+            print(f"    {ms:8.1f} ms  {module}")
+    return 1 if over_budget else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Lance un des scrapers du dépôt. Les arguments après le nom de l'outil lui sont transmis.",
+        usage="%(prog)s {list,startup,<outil>} [arguments de l'outil]"
+    )
+    parser.add_argument('command', help=f"list, startup ou un outil : {', '.join(BUILTIN_TOOLS)}")
+    parser.add_argument('tool_args', nargs=argparse.REMAINDER, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.command == 'list':
+        list_tools()
+    elif args.command == 'startup':
+        startup_parser = argparse.ArgumentParser(
+            prog="scrape.py startup",
+            description="Mesure les imports au démarrage (-X importtime) et les compare au budget."
+        )
+        startup_parser.add_argument(
+            '--budget-ms',
+            type=float,
+            default=STARTUP_BUDGET_MS,
+            help=f"Budget d'imports par commande en ms (défaut: {STARTUP_BUDGET_MS})"
+        )
+        sys.exit(check_startup(startup_parser.parse_args(args.tool_args).budget_ms))
+    elif args.command in TOOLS:
+        run_tool(args.command, args.tool_args)
+    else:
+        parser.error(f"Outil inconnu : {args.command}. Voir `scrape.py list`.")